@@ -4,14 +4,15 @@
 # import needed libraries
 import argparse
 import datetime
+import glob
 import os
 import psutil  # type: ignore
-import ray
 import time
 
 from pkt_kg.downloads import OntData, LinkedData
 from pkt_kg.edge_list import CreatesEdgeList
-from pkt_kg.knowledge_graph import FullBuild, PartialBuild, PostClosureBuild
+from pkt_kg.knowledge_graph import FullBuild, MatrixBuild, PartialBuild, PostClosureBuild
+from pkt_kg.utils import gets_executor, merges_profiles
 
 
 def main():
@@ -23,13 +24,27 @@ def main():
     parser.add_argument('-e', '--edg', help='name/path to text file containing edge sources', required=True)
     parser.add_argument('-a', '--app', help='construction approach to use (i.e. instance or subclass)', required=True)
     parser.add_argument('-t', '--res', help='name/path to text file containing resource_info', required=True)
-    parser.add_argument('-b', '--kg', help='build type: "partial", "full", or "post-closure"', required=True)
+    parser.add_argument('-b', '--kg', help='build type: "partial", "full", "post-closure", or "matrix"', required=True)
     parser.add_argument('-r', '--rel', help='yes/no - adding inverse relations to knowledge graph', required=True)
     parser.add_argument('-s', '--owl', help='yes/no - removing OWL Semantics from knowledge graph', required=True)
     parser.add_argument('-m', '--nde', help='yes/no - adding node metadata to knowledge graph', required=True)
     parser.add_argument('-o', '--out', help='name/path to directory where to write knowledge graph', required=True)
+    parser.add_argument('-i', '--inc', help='yes/no - only rebuild edge lists whose inputs changed', default='no')
+    parser.add_argument('-l', '--mem', help='max MB of memory to use per edge list; defaults to no limit', default=None)
+    parser.add_argument('-u', '--memory-budget', help='max MB of memory used to plan the # of workers of each stage; '
+                                                      'defaults to no limit', default=None)
+    parser.add_argument('-c', '--resume', help='yes/no - checkpoint the build and resume it from its last checkpoint',
+                        default='no')
+    parser.add_argument('-x', '--par', help='max # of matrix variants to build at once; defaults to # cores / --cpus',
+                        default=None)
+    parser.add_argument('-j', '--exe', help='parallel executor: "ray" or "local" (single-node)', default='ray')
+    parser.add_argument('-f', '--profile', help='name/path to directory where to write hot path profiles', default=None)
     args = parser.parse_args()
 
+    # profile the build hot paths in the driver and the Ray workers (see profiles_function)
+    if args.profile is not None: os.environ['PKT_PROFILE_DIR'] = os.path.abspath(args.profile)
+    os.environ['PKT_EXECUTOR'] = str(args.exe).lower()  # inherited by the actors (see gets_executor)
+
     ######################
     #### READ IN DATA ####
     ######################
@@ -63,14 +78,18 @@ def main():
     #####################
 
     # set-up environment
-    cpus = psutil.cpu_count(logical=True) if args.cpus is None else args.cpus; ray.init(ignore_reinit_error=True)
+    cpus = psutil.cpu_count(logical=True) if args.cpus is None else int(args.cpus); gets_executor().starts()
+    budget = None if args.memory_budget is None else float(args.memory_budget)  # caps the workers (see --cpus)
 
     print('\n' + '=' * 28 + '\nPKT: CONSTRUCT EDGE LISTS\n' + '=' * 28 + '\n')
     start = time.time()
     combined_edges = dict(ent.data_files, **ont.data_files)
     # master_edges = CreatesEdgeList(data_files=combined_edges, source_file='resources/resource_info.txt')
     master_edges = CreatesEdgeList(data_files=combined_edges, source_file=args.res)
-    master_edges.runs_creates_knowledge_graph_edges(source_file=args.res, data_files=combined_edges, cpus=cpus)
+    master_edges.runs_creates_knowledge_graph_edges(source_file=args.res, data_files=combined_edges, cpus=cpus,
+                                                  incremental=str(args.inc).lower() == 'yes',
+                                                  memory_limit=None if args.mem is None else float(args.mem),
+                                                  memory_budget=budget)
     end = time.time(); timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print('\nPKT: TOTAL SECONDS TO BUILD THE MASTER EDGE LIST: {} @ {}'.format(end - start, timestamp))
 
@@ -89,27 +108,47 @@ def main():
                           inverse_relations=args.rel,
                           decode_owl=args.owl,
                           cpus=cpus,
-                          write_location=args.out)
+                          write_location=args.out,
+                          resume=str(args.resume).lower() == 'yes',
+                          memory_budget=budget,
+                          checkpoint=str(args.resume).lower() == 'yes')
     elif args.kg == 'post-closure':
         kg = PostClosureBuild(construction=args.app,
                               node_data=args.nde,
                               inverse_relations=args.rel,
                               decode_owl=args.owl,
                               cpus=cpus,
-                              write_location=args.out)
+                              write_location=args.out,
+                              memory_budget=budget)
+    elif args.kg == 'matrix':  # comma-separated --app and --rel values, e.g. "--app instance,subclass --rel yes,no"
+        kg = MatrixBuild(constructions=args.app.split(','),
+                         node_data=args.nde,
+                         inverse_relations=args.rel.split(','),
+                         decode_owl=args.owl,
+                         cpus=cpus,
+                         write_location=args.out,
+                         max_parallel=None if args.par is None else int(args.par),
+                         memory_budget=budget)
     else:
         kg = FullBuild(construction=args.app,
                        node_data=args.nde,
                        inverse_relations=args.rel,
                        decode_owl=args.owl,
                        cpus=cpus,
-                       write_location=args.out)
+                       write_location=args.out,
+                       resume=str(args.resume).lower() == 'yes',
+                       memory_budget=budget,
+                       checkpoint=str(args.resume).lower() == 'yes')
     kg.construct_knowledge_graph()
 
-    # ray.shutdown()  # uncomment if running this independently of the CI/CD builds
+    # gets_executor().shutdown()  # uncomment if running this independently of the CI/CD builds
     end = time.time(); timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print('\nPKT: TOTAL SECONDS TO CONSTRUCT A KG: {} @ {}'.format(end - start, timestamp))
 
+    if args.profile is not None and len(glob.glob(os.path.abspath(args.profile) + '/*.prof')) > 0:
+        merged_file, collapsed_file = merges_profiles(os.path.abspath(args.profile))
+        print('\nPKT: PROFILES MERGED TO {} AND {}'.format(merged_file, collapsed_file))
+
 
 if __name__ == '__main__':
     main()
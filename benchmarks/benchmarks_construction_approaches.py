@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Throughput benchmarks for the KGConstructionApproach edge construction methods.
+
+Each benchmark builds a synthetic edge list and subclass map, constructs the edges once per edge (instance_constructor
+and subclass_constructor) and once per edge list (instance_constructor_batch and subclass_constructor_batch), checks
+that both return the same triples, and reports the throughput in edges per second. A regression benchmark times
+maps_node_to_class for edge types with many unmapped entities against the previous list-based miss tracking, which is
+quadratic in the number of misses and is therefore only run on a subset of the entities. Usage:
+
+    python -m benchmarks.benchmarks_construction_approaches [--edges 100000] [--repeat 3] [--misses 1000000]
+"""
+
+# import needed libraries
+import argparse
+import os
+import pickle
+import random
+import tempfile
+import timeit
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pkt_kg.construction_approaches import KGConstructionApproach
+
+
+def legacy_maps_node_to_class(kg: KGConstructionApproach, edge_type: str, entity: str) -> Optional[List]:
+    """Previous implementation of KGConstructionApproach.maps_node_to_class (misses are tracked in a list)."""
+
+    if entity not in kg.subclass_dict.keys():
+        if kg.subclass_error and edge_type in kg.subclass_error.keys():
+            if entity not in kg.subclass_error[edge_type]: kg.subclass_error[edge_type] += [entity]
+        else: kg.subclass_error[edge_type] = [entity]
+        subclass_map = None
+    else: subclass_map = kg.subclass_dict[entity]
+
+    return subclass_map
+
+
+def creates_edge_shapes(edges: int) -> Dict[str, Tuple[Dict, List]]:
+    """Creates synthetic edge lists that mimic the node type combinations of the knowledge graph edge types.
+
+    Args:
+        edges: An integer specifying the number of edges in each edge list.
+
+    Returns:
+        A dictionary keyed by edge type, where each value is a tuple of (edge_info, edge_list).
+    """
+
+    random.seed(1); genes = [str(x) for x in range(1, 20000)]; uri = ['https://www.ncbi.nlm.nih.gov/gene/',
+                                                                     'http://purl.obolibrary.org/obo/']
+    shapes = {
+        'chemical-disease': ({'n1': 'class', 'n2': 'class', 'rel': 'RO_0002606', 'inv_rel': None, 'uri': [uri[1]] * 2},
+                             [['CHEBI_{}'.format(random.randint(1, 50000)), 'MONDO_{}'.format(random.randint(1, 20000))]
+                              for _ in range(edges)]),
+        'gene-phenotype': ({'n1': 'entity', 'n2': 'class', 'rel': 'RO_0003302', 'inv_rel': None, 'uri': uri},
+                           [[random.choice(genes), 'HP_{}'.format(random.randint(1, 15000))] for _ in range(edges)]),
+        'gene-gene': ({'n1': 'entity', 'n2': 'entity', 'rel': 'RO_0002435', 'inv_rel': 'RO_0002435',
+                       'uri': [uri[0]] * 2}, [[random.choice(genes), random.choice(genes)] for _ in range(edges)])}
+
+    return shapes
+
+
+def times_function(func: Callable, args: List, repeat: int) -> Tuple[float, List]:
+    """Returns the best run time of a function over several runs."""
+
+    times, result = [], None
+    for _ in range(repeat):
+        start = timeit.default_timer(); result = func(*args); times.append(timeit.default_timer() - start)
+
+    return min(times), result
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='KGConstructionApproach edge construction throughput benchmarks')
+    parser.add_argument('-e', '--edges', help='number of edges per synthetic edge list', type=int, default=100000)
+    parser.add_argument('-n', '--repeat', help='number of runs per benchmark', type=int, default=3)
+    parser.add_argument('-m', '--misses', help='number of unmapped entities', type=int, default=1000000)
+    parser.add_argument('-l', '--legacy', help='number of unmapped entities (legacy method)', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as write_location:
+        os.mkdir(write_location + '/construction_approach')
+        subclass_map = {str(x): ['SO_0001217'] for x in range(1, 20000)}
+        with open(write_location + '/construction_approach/subclass_construction_map.pkl', 'wb') as f:
+            pickle.dump(subclass_map, f, protocol=4)
+        kg = KGConstructionApproach(write_location)
+
+        print('{:<18} {:<10} {:>16} {:>16} {:>9}'.format('edge type', 'approach', 'per-edge (e/s)', 'batch (e/s)',
+                                                        'speedup'))
+        for edge_type, (edge_info, edge_list) in creates_edge_shapes(args.edges).items():
+            for approach in ['instance', 'subclass']:
+                constructor = getattr(kg, approach + '_constructor')
+                per_edge = lambda: [constructor({**edge_info, 'edges': x}, edge_type) for x in edge_list]
+                edge_time, edge_res = times_function(per_edge, [], args.repeat)
+                batch_time, batch_res = times_function(getattr(kg, approach + '_constructor_batch'),
+                                                       [edge_info, edge_type, edge_list], args.repeat)
+                if kg.decodes_edge_batch(batch_res) != [x for y in edge_res for x in y]:
+                    raise ValueError('{} triples differ for {}'.format(approach, edge_type))
+                edge_rate, batch_rate = len(edge_list) / edge_time, len(edge_list) / batch_time
+                print('{:<18} {:<10} {:>16,.0f} {:>16,.0f} {:>8.1f}x'.format(edge_type, approach, edge_rate, batch_rate,
+                                                                            batch_rate / edge_rate))
+
+        # regression benchmark: edge types where most entities are missing from the subclass map
+        print('\n{:<18} {:>12} {:>16} {:>16}'.format('method', 'misses', 'time (s)', 'misses/s'))
+        for method, count in [('legacy', min(args.legacy, args.misses)), ('current', args.misses)]:
+            entities = ['non-human-{}'.format(x) for x in range(count)]; kg.subclass_error = dict()
+            if method == 'legacy': func = lambda: [legacy_maps_node_to_class(kg, 'gene-gene', x) for x in entities]
+            else: func = lambda: [kg.maps_node_to_class('gene-gene', x) for x in entities]
+            miss_time, _ = times_function(func, [], 1)
+            if len(kg.subclass_error['gene-gene']) != count: raise ValueError('{} misses differ'.format(method))
+            print('{:<18} {:>12,} {:>16.3f} {:>16,.0f}'.format(method, count, miss_time, count / miss_time))
+
+
+if __name__ == '__main__':
+    main()
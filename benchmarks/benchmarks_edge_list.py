@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmarks for the CreatesEdgeList data preparation methods.
+
+Each benchmark runs the current implementation of a method and a copy of the previous (row-wise) implementation on
+synthetic data frames shaped like the edge sources that use it, checks that both return the same data, and reports
+the best time of several runs. Usage:
+
+    python -m benchmarks.benchmarks_edge_list [--rows 1000000] [--repeat 3]
+"""
+
+# import needed libraries
+import argparse
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+import random
+import timeit
+
+from typing import Callable, Dict, List, Tuple
+
+from pkt_kg.edge_list import CreatesEdgeList
+
+
+def legacy_data_reducer(cols: str, edge_data: pd.DataFrame) -> pd.DataFrame:
+    """Previous implementation of CreatesEdgeList.data_reducer (dedup and float conversion in separate passes)."""
+
+    edge_data = edge_data[[list(edge_data)[int(cols.split(';')[0])], list(edge_data)[int(cols.split(';')[1])]]]
+    edge_data = edge_data.drop_duplicates(subset=None, keep='first', inplace=False)
+    for x in list(edge_data):
+        if 'float' in str(edge_data[x].dtype): edge_data[x] = edge_data[x].astype(int)
+
+    return edge_data
+
+
+def legacy_label_formatter(edge_data: pd.DataFrame, label_criteria: str) -> pd.DataFrame:
+    """Previous implementation of CreatesEdgeList.label_formatter (row-wise apply and generator column scan)."""
+
+    cut = label_criteria.split(';')[0]
+    for col in range(0, len(label_criteria.split(';')[1:])):
+        formatter, col_to_check = label_criteria.split(';')[col + 1], edge_data[list(edge_data)[col]].astype(str)
+        if (cut == '' and formatter != '') or not any(i for i in list(col_to_check) if cut in i):
+            edge_data[list(edge_data)[col]] = edge_data[list(edge_data)[col]].apply(lambda x: formatter + str(x))
+        elif cut != '':
+            edge_data[list(edge_data)[col]].replace('(^.*{})'.format(cut), formatter, inplace=True, regex=True)
+
+    return edge_data
+
+
+def creates_source_shapes(rows: int) -> Dict[str, Tuple[pd.DataFrame, str, str]]:
+    """Creates synthetic data frames that mimic the shapes of representative edge sources.
+
+    Args:
+        rows: An integer specifying the number of rows in each data frame.
+
+    Returns:
+        A dictionary keyed by shape name, where each value is a tuple of (data frame, column_idx, source_labels).
+    """
+
+    random.seed(1); np.random.seed(1)
+    chems, genes = ['D{:06d}'.format(x) for x in range(20000)], np.random.randint(1, 60000, rows)
+    shapes = {
+        # CTD chemical-disease: prefixed MeSH identifiers with heavy repetition
+        'ctd_chemical_disease': (pd.DataFrame({'ChemicalName': 'name', 'ChemicalID': np.random.choice(chems, rows),
+                                               'CasRN': 'None', 'DiseaseName': 'disease',
+                                               'DiseaseID': ['MESH:D{:06d}'.format(x) for x in
+                                                             np.random.randint(0, 5000, rows)]}), '1;4', ':;MESH_;'),
+        # DisGeNET gene-disease: integer gene identifiers and UMLS identifiers
+        'disgenet_gene_disease': (pd.DataFrame({'geneId': genes, 'geneSymbol': 'SYMBOL',
+                                                'score': np.random.random(rows).round(2),
+                                                'diseaseId': ['C{:07d}'.format(x) for x in
+                                                              np.random.randint(0, 30000, rows)]}), '0;3', ';;'),
+        # STRING protein-protein: float-typed identifiers after numeric filtering
+        'string_protein_protein': (pd.DataFrame({'protein1': np.random.randint(1, 20000, rows).astype(float),
+                                                 'protein2': np.random.randint(1, 20000, rows).astype(float),
+                                                 'combined_score': np.random.randint(150, 999, rows)}), '0;1',
+                                   ';9606.;9606.'),
+        # Reactome gene-pathway: mostly unique identifiers with a prefix to strip
+        'reactome_gene_pathway': (pd.DataFrame({'uniprot': ['P{:05d}'.format(x) for x in range(rows)],
+                                                'pathway': ['REACT:R-HSA-{}'.format(x) for x in
+                                                            np.random.randint(0, 2500, rows)]}), '0;1', 'REACT:;;')}
+
+    return shapes
+
+
+def times_function(func: Callable, args: List, repeat: int) -> Tuple[float, pd.DataFrame]:
+    """Returns the best run time of a function over several runs (each run receives fresh copies of the inputs)."""
+
+    times, result = [], None
+    for _ in range(repeat):
+        inputs = [x.copy() if isinstance(x, pd.DataFrame) else x for x in args]
+        start = timeit.default_timer(); result = func(*inputs); times.append(timeit.default_timer() - start)
+
+    return min(times), result
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='CreatesEdgeList data preparation micro-benchmarks')
+    parser.add_argument('-r', '--rows', help='number of rows per synthetic source', type=int, default=1000000)
+    parser.add_argument('-n', '--repeat', help='number of runs per benchmark', type=int, default=3)
+    args = parser.parse_args()
+
+    print('{:<24} {:<16} {:>12} {:>12} {:>9}'.format('source', 'method', 'legacy (s)', 'current (s)', 'speedup'))
+    for name, (df, cols, labels) in creates_source_shapes(args.rows).items():
+        benchmarks = [('data_reducer', legacy_data_reducer, CreatesEdgeList.data_reducer, [cols, df]),
+                      ('label_formatter', legacy_label_formatter, CreatesEdgeList.label_formatter,
+                       [df[[list(df)[int(i)] for i in cols.split(';')]], labels])]
+        for method, legacy, current, inputs in benchmarks:
+            legacy_time, legacy_res = times_function(legacy, inputs, args.repeat)
+            current_time, current_res = times_function(current, inputs, args.repeat)
+            if not legacy_res.astype(str).equals(current_res.astype(str)):
+                raise ValueError('{} results differ for {}'.format(method, name))
+            speedup = legacy_time / current_time if current_time > 0 else float('inf')
+            print('{:<24} {:<16} {:>12.3f} {:>12.3f} {:>8.1f}x'.format(name, method, legacy_time, current_time, speedup))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Executor benchmarks for the KGBuilder and OWL-NETS actors.
+
+The benchmark compares the wall-clock time, CPU time, and peak memory (see tracks_build_stage) of the Ray and the local
+executors (see gets_executor) on three workloads: (1) constructing the edges of the test fixtures; (2) decoding the
+closed test knowledge graph with OWL-NETS; and (3) constructing the edges of a synthetic mid-size master edge list.
+Each workload includes starting its actors, so the fixtures mostly measure the executor's overhead. The results are
+written to a JSON (and CSV) report (see writes_build_report).
+Usage:
+
+    python -m benchmarks.benchmarks_executor [--cpus 2] [--edges 500000] [--executors ray,local]
+        [--out executor_benchmark.json]
+"""
+
+# import needed libraries
+import argparse
+import json
+import os
+import pickle
+import random
+import ray  # type: ignore
+import shutil
+import tempfile
+
+from rdflib import Graph  # type: ignore
+from typing import Dict, List
+
+from pkt_kg.construction_approaches import KGConstructionApproach
+from pkt_kg.knowledge_graph import FullBuild
+from pkt_kg.metadata import Metadata
+from pkt_kg.owlnets import OwlNets
+from pkt_kg.utils import *
+
+# test fixtures
+data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../tests/data'))
+fixture_edges = {
+    'gene-phenotype': {'data_type': 'entity-class', 'edge_relation': 'RO_0003302',
+                       'uri': ['http://www.ncbi.nlm.nih.gov/gene/', 'http://purl.obolibrary.org/obo/'],
+                       'edge_list': [['2', 'SO_0000162'], ['2', 'SO_0000196'], ['3', 'SO_0000323'],
+                                     ['9', 'SO_0001490'], ['10', 'SO_0000301'], ['11', 'SO_0001560']]},
+    'gene-gene': {'data_type': 'entity-entity', 'edge_relation': 'RO_0002435',
+                  'uri': ['http://www.ncbi.nlm.nih.gov/gene/', 'http://www.ncbi.nlm.nih.gov/gene/'],
+                  'edge_list': [['1', '2'], ['2', '3'], ['3', '18'], ['17', '19'], ['4', '17'], ['5', '11']]}}
+
+
+def creates_synthetic_edges(edges: int, edge_types: int = 8, nodes: int = 50000, seed: int = 1) -> Dict:
+    """Creates a master edge list of random gene-gene edges, which is split across several edge types of decreasing
+    size (i.e. like the skewed edge types of a real build).
+
+    Args:
+        edges: An integer specifying the total number of edges.
+        edge_types: An integer specifying the number of edge types (default=8).
+        nodes: An integer specifying the number of gene identifiers to sample the edges from (default=50000).
+        seed: An integer used to seed the random number generator (default=1).
+
+    Returns:
+        A master edge list dictionary (see CreatesEdgeList).
+    """
+
+    random.seed(seed); weights = [2 ** -i for i in range(edge_types)]; genes = [str(x) for x in range(nodes)]
+    sizes = [int(edges * x / sum(weights)) for x in weights]; uri = 'http://www.ncbi.nlm.nih.gov/gene/'
+
+    return {'gene-gene-{}'.format(i): {'data_type': 'entity-entity', 'edge_relation': 'RO_0002435', 'uri': [uri, uri],
+                                       'edge_list': [[random.choice(genes), random.choice(genes)] for _ in range(n)]}
+            for i, n in enumerate(sizes)}
+
+
+def creates_resources(res_dir: str, edge_dict: Dict) -> str:
+    """Creates the resources directory needed to instantiate a FullBuild (i.e. ontologies, relations data, a master
+    edge list, and a subclass map of every gene).
+
+    Args:
+        res_dir: A string pointing to an empty directory.
+        edge_dict: A master edge list dictionary.
+
+    Returns:
+        A string pointing to the knowledge graph write location.
+    """
+
+    for x in ['knowledge_graphs', 'ontologies', 'relations_data', 'construction_approach', 'node_data']:
+        os.mkdir(res_dir + '/' + x)
+    shutil.copyfile(data_dir + '/ontologies/empty_hp_with_imports.owl', res_dir + '/ontologies/hp_with_imports.owl')
+    shutil.copyfile(data_dir + '/RELATIONS_LABELS.txt', res_dir + '/relations_data/RELATIONS_LABELS.txt')
+    shutil.copyfile(data_dir + '/INVERSE_RELATIONS.txt', res_dir + '/relations_data/INVERSE_RELATIONS.txt')
+    with open(res_dir + '/Master_Edge_List_Dict.json', 'w') as out: json.dump(edge_dict, out)
+    genes = set(x for v in edge_dict.values() if v['data_type'].startswith('entity') for x, _ in v['edge_list'])
+    genes |= set(x for v in edge_dict.values() if v['data_type'] == 'entity-entity' for _, x in v['edge_list'])
+    with open(res_dir + '/construction_approach/subclass_construction_map.pkl', 'wb') as out:
+        pickle.dump({x: ['SO_0001217'] for x in genes}, out, protocol=4)
+
+    return res_dir + '/knowledge_graphs'
+
+
+def runs_edge_construction(write_location: str, cpus: int) -> int:
+    """Constructs the edges of a master edge list with one EdgeConstructor actor per cpu (see runs_edge_constructors).
+
+    Args:
+        write_location: A string pointing to the knowledge graph write location (see creates_resources).
+        cpus: An integer specifying the number of actors.
+
+    Returns:
+        An integer specifying the number of logic triples that were written.
+    """
+
+    kg = FullBuild('subclass', 'no', 'yes', 'no', cpus, write_location); kg.reverse_relation_processor()
+    meta = Metadata(kg.kg_version, write_location, kg.full_kg, None, None)
+    kg_owl = '_'.join(kg.full_kg.split('_')[0:-1]) + '_OWL.owl'; KGConstructionApproach.indexes_subclass_map(kg.res_dir)
+    args = {'construction': kg.construct_approach, 'node_data': None, 'rel_dict': kg.relations_dict,
+            'inverse_dict': kg.inverse_relations_dict, 'kg_owl': kg_owl, 'ont_cls': set(), 'obj_props': set(),
+            'metadata': meta.creates_node_metadata, 'write_loc': write_location}
+    actors = kg.runs_edge_constructors(args, meta); del actors
+    with open(kg.EdgeConstructor.gets_output_files(write_location, kg_owl)[0], 'r') as f: triples = sum(1 for _ in f)
+
+    return triples
+
+
+def runs_owlnets(write_location: str, cpus: int) -> int:
+    """Decodes the OWL-encoded classes of the closed test knowledge graph with one OwlNets actor per cpu.
+
+    Args:
+        write_location: A string pointing to a directory to write the OWL-NETS output to.
+        cpus: An integer specifying the number of actors.
+
+    Returns:
+        An integer specifying the number of OWL-NETS triples.
+    """
+
+    graph = Graph().parse(data_dir + '/PheKnowLator_Closed.owl', format='xml')
+    owlnets = OwlNets(graph, write_location, '/PheKnowLator_Benchmark.owl', 'subclass')
+
+    return len(owlnets.runs_owlnets(cpus)[0])
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Ray and local executor benchmarks')
+    parser.add_argument('-p', '--cpus', help='number of actors used by each workload', type=int, default=2)
+    parser.add_argument('-e', '--edges', help='number of synthetic edges', type=int, default=500000)
+    parser.add_argument('-x', '--executors', help='comma-separated executors to compare', default='ray,local')
+    parser.add_argument('-o', '--out', help='name/path of the JSON (and CSV) report', default='executor_benchmark.json')
+    args = parser.parse_args(); cpus = args.cpus
+
+    report: List[Dict] = []; synthetic = creates_synthetic_edges(args.edges)
+    workloads = [('fixture_edges', lambda x: runs_edge_construction(creates_resources(x, fixture_edges), cpus)),
+                 ('fixture_owlnets', lambda x: runs_owlnets(x, cpus)),
+                 ('synthetic_edges', lambda x: runs_edge_construction(creates_resources(x, synthetic), cpus))]
+    for executor in args.executors.split(','):
+        os.environ['PKT_EXECUTOR'] = executor
+        with tracks_build_stage(report, 'start_' + executor):
+            if executor == 'ray': ray.init(num_cpus=cpus, include_dashboard=False)
+            else: gets_executor().starts()
+        for name, workload in workloads:
+            temp_dir = tempfile.mkdtemp()
+            with tracks_build_stage(report, name + '_' + executor) as counts: counts['triples'] = workload(temp_dir)
+            shutil.rmtree(temp_dir)
+        gets_executor().shutdown()
+
+    writes_build_report(report, args.out)
+    print('\n{:<24}{:>12}{:>12}{:>14}{:>12}'.format('stage', 'wall (s)', 'cpu (s)', 'peak rss (mb)', 'triples'))
+    for x in report:
+        print('{:<24}{:>12.2f}{:>12.2f}{:>14.1f}{:>12}'.format(x['stage'], x['wall_seconds'], x['cpu_seconds'],
+                                                               x['peak_rss_mb'], x.get('triples', '')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Memory benchmarks for the KGBuilder EdgeConstructor Ray actors.
+
+The benchmark creates synthetic build inputs (ontology classes, object properties, node metadata, and an edge list
+split into several edge types), starts one probe actor per CPU, and measures how much each actor's resident memory
+grows when it creates an EdgeConstructor from (1) the previous inputs (full Python sets and the complete node
+metadata dictionary passed by value) and (2) the inputs created by KGBuilder.creates_edge_constructor_params (hash
+sets and per-actor metadata shards passed through the object store). It also compares the size of the results
+returned by each actor and the driver's peak memory when merging them, for (1) the previous approach (both RDFLib
+graphs pickled and all actor graphs held while taking their union) and (2) integer-encoded triples merged one actor at
+a time (see encodes_triples and merges_encoded_triples).
+
+With --scaling, the benchmark instead builds a skewed set of edge types (one edge type holds most of the edges) with 1
+to --cpus actors and compares the wall-clock time and the largest number of edges assigned to a single actor when
+(1) whole edge types are assigned to actors and (2) large edge types are split into shards (see shards_edge_lists).
+With --writes, the benchmark instead has --cpus actors append --triples N-Triples lines each to one shared file and
+compares the write throughput and the number of corrupted (interleaved) lines when (1) every actor appends to the
+file itself and (2) the lines are sent to a single KGBuilder.TriplesWriter actor.
+Usage:
+
+    python -m benchmarks.benchmarks_knowledge_graph [--classes 500000] [--nodes 200000] [--edges 200000] [--cpus 4]
+        [--triples 100000] [--scaling] [--writes]
+"""
+
+# import needed libraries
+import argparse
+import gc
+import os
+import pickle
+import psutil  # type: ignore
+import random
+import re
+import ray  # type: ignore
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from rdflib import BNode, Graph, URIRef  # type: ignore
+from rdflib.namespace import RDF  # type: ignore
+from typing import Any, Callable, Dict, List, Tuple
+
+from pkt_kg.construction_approaches import KGConstructionApproach
+from pkt_kg.knowledge_graph import KGBuilder
+from pkt_kg.metadata import Metadata
+from pkt_kg.utils import *
+
+
+@ray.remote
+class MemoryProbe(object):
+    """Ray actor that reports how much its resident memory grows when an EdgeConstructor is created. The parameters
+    are passed as an object reference wrapped in a list, so they are deserialized inside the measured method."""
+
+    def __init__(self) -> None:
+        self.edge_constructor = None
+
+    def rss(self) -> int:
+        gc.collect()
+
+        return psutil.Process().memory_info().rss
+
+    def creates_edge_constructor(self, params: List) -> int:
+        start = self.rss(); self.edge_constructor = KGBuilder.EdgeConstructor(ray.get(params[0]))
+
+        return self.rss() - start
+
+
+@ray.remote
+class WriteProbe(object):
+    """Ray actor that appends batches of N-Triples lines to a file, either itself or through a TriplesWriter actor."""
+
+    def writes(self, out: Any, batches: List[str]) -> None:
+        if isinstance(out, str):
+            with open(out, 'a', newline='') as f:
+                for batch in batches: f.write(batch)
+        else: ray.get([out.writes_lines.remote(batch) for batch in batches])
+
+        return None
+
+
+def creates_build_inputs(classes: int, nodes: int, edges: int, edge_types: int) -> Dict:
+    """Creates synthetic knowledge graph build inputs.
+
+    Args:
+        classes: An integer specifying the number of ontology classes.
+        nodes: An integer specifying the number of non-ontology nodes with metadata.
+        edges: An integer specifying the total number of edges.
+        edge_types: An integer specifying the number of edge types.
+
+    Returns:
+        A dictionary of build inputs.
+    """
+
+    random.seed(1); obo, gene = 'http://purl.obolibrary.org/obo/', 'https://www.ncbi.nlm.nih.gov/gene/'
+    ont_cls = {URIRef(obo + 'HP_{:07d}'.format(x)) for x in range(classes)}
+    obj_props = {URIRef(obo + 'RO_{:07d}'.format(x)) for x in range(2000)}
+    node_dict = {'nodes': {gene + str(x): {'Label': 'GENE{}'.format(x), 'Description': 'Gene {} is a gene.'.format(x),
+                                           'Synonym': 'G{}|GENE-{}'.format(x, x)} for x in range(nodes)},
+                 'relations': {}}
+    edge_dict = {'gene-phenotype-{}'.format(i): {
+        'data_type': 'entity-class', 'edge_relation': 'RO_0003302', 'uri': [gene, obo],
+        'edge_list': [[str(random.randint(0, nodes - 1)), 'HP_{:07d}'.format(random.randint(0, classes - 1))]
+                      for _ in range(edges // edge_types)]} for i in range(edge_types)}
+
+    return {'ont_cls': ont_cls, 'obj_props': obj_props, 'node_dict': node_dict, 'edge_dict': edge_dict}
+
+
+def creates_actor_graphs(actors: int, triples: int) -> List:
+    """Creates synthetic EdgeConstructor results, where a fifth of the triples are shared by all actors (e.g. class
+    declarations) and the rest are unique to an actor.
+
+    Args:
+        actors: An integer specifying the number of actors.
+        triples: An integer specifying the number of triples per actor.
+
+    Returns:
+        A list with one (graph, clean graph) tuple of RDFLib Graph objects per actor.
+    """
+
+    obo, pkt = 'http://purl.obolibrary.org/obo/', 'https://github.com/callahantiff/PheKnowLator/pkt/'
+    rel = URIRef(obo + 'RO_0003302'); results = []
+    for i in range(actors):
+        graph, clean_graph = Graph(), Graph()
+        for j in range(triples):
+            node = 'HP_{:07d}'.format(j) if j % 5 == 0 else 'N{}_{}'.format(i, j)
+            graph.add((URIRef(pkt + node), rel, URIRef(obo + 'HP_{:07d}'.format(j % 1000))))
+            clean_graph.add((BNode(node), RDF.type, URIRef(obo + 'HP_{:07d}'.format(j % 1000))))
+        results += [(graph, clean_graph)]
+
+    return results
+
+
+def measures_peak_memory(func: Callable) -> Tuple:
+    """Runs a function and measures the peak memory allocated while it runs.
+
+    Args:
+        func: A function that takes no arguments.
+
+    Returns:
+        A tuple of the function's result and the peak memory allocated in bytes.
+    """
+
+    gc.collect(); tracemalloc.start(); result = func(); peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+
+    return result, peak
+
+
+def legacy_merges_actor_graphs(payloads: List[bytes]) -> Tuple:
+    """Merges actor results the way the builds did before: every actor's pair of graphs is fetched at once and the
+    union is taken afterwards."""
+
+    res = [pickle.loads(x) for x in payloads]; g1 = [x[0] for x in res]; g2 = [x[1] for x in res]
+    results = set(x for y in [set(x) for x in g1] for x in y)
+
+    return results, g2
+
+
+def legacy_runs_edge_constructors(builder: KGBuilder, args: Dict) -> List:
+    """Runs the EdgeConstructor actors the way the builds did before edge types could be split into shards: whole
+    edge types are assigned to the actors."""
+
+    edges = sublist_creator({k: len(v['edge_list']) for k, v in builder.edge_dict.items()}, builder.cpus)
+    actors = [ray.remote(KGBuilder.EdgeConstructor).remote({**args, 'edge_dict': {k: builder.edge_dict[k] for k in x}})
+              for x in edges]
+    for i in range(0, len(edges)): [actors[i].creates_new_edges.remote(j) for j in edges[i]]
+    _ = ray.wait([x.counters_getter.remote() for x in actors], num_returns=len(actors))
+
+    return actors
+
+
+def measures_build_scaling(edges: int, cpus: int) -> None:
+    """Builds a skewed set of edge types with 1 to cpus actors, once assigning whole edge types to the actors and once
+    splitting the large edge types into shards, and prints the wall-clock time and the largest number of edges that
+    were assigned to a single actor.
+
+    Args:
+        edges: An integer specifying the total number of edges.
+        cpus: An integer specifying the largest number of actors.
+
+    Returns:
+        None.
+    """
+
+    random.seed(1); obo, gene = 'http://purl.obolibrary.org/obo/', 'https://www.ncbi.nlm.nih.gov/gene/'
+    res_dir = tempfile.mkdtemp(); write_loc = res_dir + '/knowledge_graphs'; os.mkdir(write_loc)
+    os.mkdir(res_dir + '/construction_approach'); genes = [str(x) for x in range(10000)]
+    with open(res_dir + '/construction_approach/subclass_construction_map.pkl', 'wb') as f:
+        pickle.dump({x: ['SO_0001217'] for x in genes}, f, protocol=4)
+    sizes = {'chemical-gene': int(edges * 0.7), 'variant-disease': int(edges * 0.2), 'gene-pathway': edges // 20,
+             'gene-gene': edges // 20}
+    edge_dict = {k: {'data_type': 'entity-entity', 'edge_relation': 'RO_0002434', 'uri': [gene, gene],
+                     'edge_list': [[random.choice(genes), random.choice(genes)] for _ in range(v)]}
+                 for k, v in sizes.items()}
+    meta = Metadata('v2.0.0', write_loc, 'KG.owl', None, None); KGConstructionApproach.indexes_subclass_map(res_dir)
+    args = {'construction': 'instance', 'write_loc': write_loc, 'kg_owl': '/KG_OWL.owl', 'rel_dict': None,
+            'inverse_dict': None, 'node_data': None, 'ont_cls': set(), 'obj_props': set(),
+            'metadata': meta.creates_node_metadata}
+
+    ray.init(num_cpus=cpus, ignore_reinit_error=True)
+    print('\n{:<10} {:>6} {:>16} {:>16}'.format('edges', 'cpus', 'seconds', 'max actor edges'))
+    for n in range(1, cpus + 1):
+        builder = KGBuilder.__new__(KGBuilder); builder.edge_dict, builder.cpus = edge_dict, n
+        whole = max(sum(sizes[x] for x in y) for y in sublist_creator(sizes, n))
+        load_sharded = max(sum(x[2] - x[1] for x in y) for y in sublist_creator(shards_edge_lists(sizes, n), n))
+        for name, func, load in [('whole', lambda: legacy_runs_edge_constructors(builder, args), whole),
+                                 ('sharded', lambda: builder.runs_edge_constructors(args, meta), load_sharded)]:
+            start = time.perf_counter(); actors = func(); seconds = time.perf_counter() - start
+            print('{:<10} {:>6} {:>16.2f} {:>16}'.format(name, n, seconds, load))
+            for actor in actors: ray.kill(actor)
+    ray.shutdown(); shutil.rmtree(res_dir)
+
+    return None
+
+
+def measures_write_throughput(triples: int, cpus: int) -> None:
+    """Has several actors append N-Triples lines to one shared file, directly or through a TriplesWriter actor, and
+    prints the write throughput and the number of corrupted lines.
+
+    Args:
+        triples: An integer specifying the number of lines written by each actor.
+        cpus: An integer specifying the number of actors.
+
+    Returns:
+        None.
+    """
+
+    obo, pkt = 'http://purl.obolibrary.org/obo/', 'https://github.com/callahantiff/PheKnowLator/pkt/'
+    line = '<' + pkt + '{}_{:09d}> <' + obo + 'RO_0002434> <' + obo + 'HP_{:07d}> .\n'
+    batches = [[''.join(line.format(i, j, j % 1000) for j in range(k, min(k + 10000, triples)))
+                for k in range(0, triples, 10000)] for i in range(cpus)]
+    valid = re.compile(r'^<[^<>]+> <[^<>]+> <[^<>]+> \.$'); write_dir = tempfile.mkdtemp()
+    ray.init(num_cpus=cpus, ignore_reinit_error=True)
+    print('\n{:<16} {:>8} {:>16} {:>20} {:>16}'.format('writes', 'actors', 'seconds', 'lines/second', 'corrupted'))
+    for name in ['direct', 'writer']:
+        filepath = write_dir + '/{}.nt'.format(name)
+        probes = [WriteProbe.remote() for _ in range(cpus)]
+        writer = ray.remote(KGBuilder.TriplesWriter).remote(filepath) if name != 'direct' else None
+        ray.get([x.writes.remote(writer or filepath, []) for x in probes])  # start the actors before timing
+        start = time.perf_counter()
+        ray.get([probes[i].writes.remote(writer or filepath, batches[i]) for i in range(cpus)])
+        if writer is not None: ray.get(writer.closes.remote())
+        seconds = time.perf_counter() - start
+        with open(filepath) as f: lines = f.read().splitlines()
+        corrupted = sum(1 for x in lines if not valid.match(x)) + abs(cpus * triples - len(lines))
+        print('{:<16} {:>8} {:>16.2f} {:>20,.0f} {:>16}'.format(name, cpus, seconds, cpus * triples / seconds,
+                                                                corrupted))
+        for probe in probes: ray.kill(probe)
+    ray.shutdown(); shutil.rmtree(write_dir)
+
+    return None
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='EdgeConstructor actor memory benchmarks')
+    parser.add_argument('-c', '--classes', help='number of ontology classes', type=int, default=500000)
+    parser.add_argument('-n', '--nodes', help='number of nodes with metadata', type=int, default=200000)
+    parser.add_argument('-e', '--edges', help='number of edges', type=int, default=200000)
+    parser.add_argument('-p', '--cpus', help='number of actors', type=int, default=4)
+    parser.add_argument('-t', '--triples', help='number of result triples per actor', type=int, default=100000)
+    parser.add_argument('-s', '--scaling', help='run the 1 to --cpus scaling benchmark', action='store_true')
+    parser.add_argument('-w', '--writes', help='run the shared file write benchmark', action='store_true')
+    args = parser.parse_args()
+    if args.scaling: return measures_build_scaling(args.edges, args.cpus)
+    if args.writes: return measures_write_throughput(args.triples, args.cpus)
+
+    inputs = creates_build_inputs(args.classes, args.nodes, args.edges, 2 * args.cpus)
+    meta = Metadata('v2.0.0', 'resources/knowledge_graphs', 'KG.owl', None, inputs['node_dict'])
+    builder = KGBuilder.__new__(KGBuilder); builder.edge_dict, builder.cpus = inputs['edge_dict'], args.cpus
+    base_args = {'construction': 'instance', 'write_loc': 'resources/knowledge_graphs/', 'kg_owl': 'KG_OWL.owl',
+                 'rel_dict': None, 'inverse_dict': None, 'node_data': 'yes', 'ont_cls': inputs['ont_cls'],
+                 'obj_props': inputs['obj_props'], 'metadata': meta.creates_node_metadata}
+
+    ray.init(num_cpus=args.cpus, ignore_reinit_error=True)
+    edges, params = builder.creates_edge_constructor_params(base_args, meta)
+    legacy = [{**base_args, 'edge_dict': {k: inputs['edge_dict'][k] for k in edges[i]}} for i in range(args.cpus)]
+    print('{:<10} {:>8} {:>20} {:>20}'.format('inputs', 'actors', 'mean actor MB', 'total actor MB'))
+    for name, actor_params in [('legacy', legacy), ('current', params)]:
+        probes = [MemoryProbe.remote() for _ in range(args.cpus)]
+        refs = [[ray.put(x)] for x in actor_params]  # wrapped so that the inputs are resolved inside the actor
+        growth: List = ray.get([probes[i].creates_edge_constructor.remote(refs[i]) for i in range(args.cpus)])
+        print('{:<10} {:>8} {:>20.1f} {:>20.1f}'.format(name, args.cpus, sum(growth) / len(growth) / 2**20,
+                                                       sum(growth) / 2**20))
+        for probe in probes: ray.kill(probe)
+    ray.shutdown()
+
+    actor_graphs = creates_actor_graphs(args.cpus, args.triples)
+    legacy_payloads = [pickle.dumps(x) for x in actor_graphs]
+    current_payloads = [pickle.dumps(encodes_triples(list(x))) for x in actor_graphs]; del actor_graphs
+    legacy_res, legacy_peak = measures_peak_memory(lambda: legacy_merges_actor_graphs(legacy_payloads))
+    current_res, current_peak = measures_peak_memory(
+        lambda: merges_encoded_triples((pickle.loads(x) for x in current_payloads), [set(), Graph()]))
+    assert legacy_res[0] == current_res[0]
+    assert set(x for y in legacy_res[1] for x in y) == set(current_res[1])
+    print('\n{:<10} {:>20} {:>20}'.format('results', 'total payload MB', 'driver peak MB'))
+    for name, payloads, peak in [('legacy', legacy_payloads, legacy_peak), ('current', current_payloads, current_peak)]:
+        print('{:<10} {:>20.1f} {:>20.1f}'.format(name, sum(len(x) for x in payloads) / 2**20, peak / 2**20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Memory benchmarks for the OWL-NETS actors.
+
+The benchmark decodes a graph made of several disjoint copies of the closed test knowledge graph with an increasing
+number of OwlNets actors and compares the run time and memory when (1) each actor receives a copy of the graph (i.e. a
+pickled RDFLib Graph, or the graph inherited copy-on-write by the actors that the local executor forks) and (2) all of
+the actors share one read-only IndexedGraph. The peak RSS (see tracks_build_stage) counts the shared graph once per
+actor, so the PSS of the processes and the USS of the actors once they have finished decoding are reported as well
+(see measures_process_tree).
+Usage:
+
+    python -m benchmarks.benchmarks_owlnets [--cpus 1,2,4] [--copies 10] [--executors local,ray]
+        [--out owlnets_benchmark.json]
+"""
+
+# import needed libraries
+import argparse
+import os
+import psutil  # type: ignore
+import ray  # type: ignore
+
+from random import shuffle
+from rdflib import BNode, Graph, URIRef  # type: ignore
+from rdflib.namespace import OWL, RDF  # type: ignore
+from typing import Dict, List, Tuple
+
+from pkt_kg.owlnets import OwlNets
+from pkt_kg.utils import *
+
+# test fixtures
+data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../tests/data'))
+
+
+def creates_graph(copies: int) -> Graph:
+    """Creates a graph from several copies of the closed test knowledge graph, where the URIs (except for the W3C
+    vocabularies) and the blank nodes of each copy are renamed so that the copies are disjoint.
+
+    Args:
+        copies: An integer specifying the number of copies.
+
+    Returns:
+        An RDFLib Graph object.
+    """
+
+    def renames(node, suffix):
+        if not isinstance(node, (URIRef, BNode)) or 'www.w3.org' in str(node): return node
+        else: return type(node)(str(node) + suffix)
+
+    graph, fixture = Graph(), Graph().parse(data_dir + '/PheKnowLator_Closed.owl', format='xml')
+    for i in range(copies):
+        suffix = '' if i == 0 else 'x' + str(i)
+        graph.addN((renames(s, suffix), p, renames(o, suffix), graph) for s, p, o in fixture)
+
+    return graph
+
+
+def measures_process_tree() -> Tuple[float, float, float]:
+    """Measures the memory of the current process and all of its child processes (i.e. the actors), both as the sum of
+    their resident set sizes (RSS), which counts the shared memory once per process, and as the sum of their
+    proportional set sizes (PSS), which divides the shared memory between the processes that use it. The unique set
+    size (USS) of the child processes measures the memory that is private to the actors (i.e. not shared).
+
+    Returns:
+        A tuple of the RSS, the PSS, and the USS of the child processes in MB.
+    """
+
+    rss, pss, uss, parent = 0, 0, 0, psutil.Process()
+    for process in [parent] + parent.children(recursive=True):
+        try: info = process.memory_full_info(); rss += info.rss; pss += info.pss
+        except (psutil.NoSuchProcess, psutil.AccessDenied): continue
+        uss += info.uss if process.pid != parent.pid else 0
+
+    return round(rss / 2 ** 20, 1), round(pss / 2 ** 20, 1), round(uss / 2 ** 20, 1)
+
+
+def runs_decoding(graph: Graph, entities: List, actors: int, shared: bool) -> Tuple[int, float, float, float]:
+    """Decodes the OWL-encoded entities of a graph with several OwlNets actors (see OwlNets.runs_owlnets), which either
+    receive a copy of the graph or share a read-only IndexedGraph of it.
+
+    Args:
+        graph: An RDFLib Graph object.
+        entities: A list of the entities to decode.
+        actors: An integer specifying the number of actors.
+        shared: A bool indicating whether the actors share an IndexedGraph (True) or get a graph copy (False).
+
+    Returns:
+        A tuple of the number of decoded triples and the memory (see measures_process_tree) once the actors have
+        finished.
+    """
+
+    executor = gets_executor(); graph_ref = executor.puts(IndexedGraph(graph)) if shared else graph
+    acts = [executor.creates_actor(OwlNets, graph_ref, '/tmp/owlnets', '/benchmark.owl') for _ in range(actors)]
+    executor.gets([acts[i].cleans_owl_encoded_entities.remote(entities[i::actors], False) for i in range(actors)])
+    triples = sum(len(x) for x in executor.gets([x.gets_owlnets_graph.remote() for x in acts]))
+    rss, pss, uss = measures_process_tree()
+    if executor.name == 'ray': [ray.kill(x) for x in acts]
+    else: [x.shutdown() for x in acts]
+    del acts, graph_ref
+
+    return triples, rss, pss, uss
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='OWL-NETS actor memory benchmarks')
+    parser.add_argument('-p', '--cpus', help='comma-separated numbers of actors to compare', default='1,2,4')
+    parser.add_argument('-c', '--copies', help='number of copies of the closed test graph', type=int, default=10)
+    parser.add_argument('-x', '--executors', help='comma-separated executors to compare', default='local,ray')
+    parser.add_argument('-o', '--out', help='name/path of the JSON (and CSV) report', default='owlnets_benchmark.json')
+    args = parser.parse_args(); cpus = args.cpus
+
+    graph = creates_graph(args.copies); report: List[Dict] = []
+    entities = list(gets_ontology_classes(graph) | set(graph.subjects(RDF.type, OWL.Axiom))); shuffle(entities)
+    print('Decoding {} entities of a graph of {} triples'.format(len(entities), len(graph)))
+    for executor in args.executors.split(','):
+        os.environ['PKT_EXECUTOR'] = executor; max_cpus = max(int(x) for x in cpus.split(','))
+        if executor == 'ray': ray.init(num_cpus=max_cpus, include_dashboard=False)
+        for actors in [int(x) for x in cpus.split(',')]:
+            for shared in [False, True]:
+                stage = '{}_{}_{}'.format(executor, 'shared' if shared else 'copied', actors)
+                with tracks_build_stage(report, stage) as counts:
+                    counts['triples'], rss, pss, uss = runs_decoding(graph, entities, actors, shared)
+                report[-1].update({'actors': actors, 'rss_mb': rss, 'pss_mb': pss, 'actor_uss_mb': uss})
+        gets_executor().shutdown()
+
+    writes_build_report(report, args.out)
+    print('\n{:<20}{:>10}{:>14}{:>10}{:>10}{:>16}{:>10}'.format('stage', 'wall (s)', 'peak rss (mb)', 'rss (mb)',
+                                                               'pss (mb)', 'actor uss (mb)', 'triples'))
+    for x in report:
+        print('{:<20}{:>10.2f}{:>14.1f}{:>10.1f}{:>10.1f}{:>16.1f}{:>10}'.format(
+            x['stage'], x['wall_seconds'], x['peak_rss_mb'], x['rss_mb'], x['pss_mb'], x['actor_uss_mb'],
+            x['triples']))
+
+
+if __name__ == '__main__':
+    main()
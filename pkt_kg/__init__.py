@@ -28,6 +28,7 @@ __all__ = [
     'PartialBuild',
     'PostClosureBuild',
     'FullBuild',
+    'MatrixBuild',
 
     'Metadata',
     'OwlNets'
@@ -36,6 +37,6 @@ __all__ = [
 from pkt_kg.construction_approaches import KGConstructionApproach
 from pkt_kg.downloads import LinkedData, OntData
 from pkt_kg.edge_list import CreatesEdgeList
-from pkt_kg.knowledge_graph import PartialBuild, PostClosureBuild, FullBuild
+from pkt_kg.knowledge_graph import PartialBuild, PostClosureBuild, FullBuild, MatrixBuild
 from pkt_kg.metadata import Metadata
 from pkt_kg.owlnets import OwlNets
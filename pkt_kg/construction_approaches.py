@@ -4,15 +4,22 @@
 # import needed libraries
 import glob
 import hashlib
+import json
 import logging.config
 import os
 import os.path
+import numpy as np  # type: ignore
 import pickle
+import shutil
+import tempfile
+
+from collections import Counter
+from collections.abc import Mapping
 
 from rdflib import Graph, Namespace, BNode, Literal, URIRef  # type: ignore
 from rdflib.namespace import RDF, RDFS, OWL  # type: ignore
 from tqdm import tqdm  # type: ignore
-from typing import Any, Dict, IO, List, Optional, Tuple, Union
+from typing import Any, Dict, IO, Iterable, List, Optional, Set, Tuple, Union
 
 from pkt_kg.utils import *
 
@@ -29,6 +36,117 @@ except FileNotFoundError:
     if not os.path.exists(log_dir): os.mkdir(log_dir)
 logger = logging.getLogger(__name__)
 logging.config.fileConfig(log_config[0], disable_existing_loggers=False, defaults={'log_file': log_dir + '/' + log})
+# subclass maps loaded by the current process, keyed by (file path, size, modification time)
+subclass_maps: Dict = dict()
+
+
+class SubclassMap(Mapping):
+    """Class provides a compact, read-only view of the subclass_construction_map. The map is stored as four flat
+    numpy arrays: (1) the sorted keys; (2) the offsets of each key's values; (3) the values, grouped by key in their
+    original order; and (4) whether each key's values were stored as a set. The arrays are written to a directory
+    next to the pickled map the first time it is loaded and are memory-mapped afterwards, so the pickled dictionary is
+    only unpickled when it changes and every process that loads the map (e.g. each Ray actor) reads the same pages from
+    the operating system's file cache.
+
+    Attributes:
+        index: A dictionary with four keys: 'keys', 'offsets', 'values', and 'sets'. The values mapped to keys[i] are
+            stored in values[offsets[i]:offsets[i + 1]] and are returned as a set if sets[i] is True, otherwise as a
+            list (i.e. the same container type as the pickled map).
+    """
+
+    def __init__(self, index: Dict[str, np.ndarray]) -> None:
+        self.index = index
+
+    def __getitem__(self, entity: str) -> Union[List, Set]:
+        i = self.finds_key(entity)
+        if i is None: raise KeyError(entity)
+        start, end = self.index['offsets'][i:i + 2].tolist(); values = self.index['values'][start:end].tolist()
+
+        return set(values) if self.index['sets'][i] else values
+
+    def __contains__(self, entity: Any) -> bool:
+        return self.finds_key(entity) is not None
+
+    def __iter__(self):
+        return iter(self.index['keys'].tolist())
+
+    def __len__(self) -> int:
+        return len(self.index['keys'])
+
+    def finds_key(self, entity: Any) -> Optional[int]:
+        """Finds the position of an entity in the sorted key array using a binary search.
+
+        Args:
+            entity: A string containing a node identifier (e.g. "R-HSA-5601843").
+
+        Returns:
+            An integer containing the position of the entity in the key array or None if the entity is not a key.
+        """
+
+        keys = self.index['keys']  # entities longer than the key width can't match (and would force an array cast)
+        if not isinstance(entity, str) or len(keys) == 0 or len(entity) > keys.dtype.itemsize // 4: return None
+        i = int(keys.searchsorted(np.array(entity, dtype=keys.dtype)))
+
+        return i if i < len(keys) and keys[i] == entity else None
+
+    @staticmethod
+    def builds_index(subclass_dict: Dict) -> Dict[str, np.ndarray]:
+        """Converts a subclass_construction_map dictionary into sorted key, offset, and value arrays. Keys that map
+        to an empty list of values are kept.
+
+        Args:
+            subclass_dict: A dictionary keyed by non-class entity identifiers, where values are lists or sets of
+                ontology class identifiers (e.g. {'R-HSA-5601843': {'PW_0000001'}}).
+
+        Returns:
+            A dictionary with four keys: 'keys', 'offsets', 'values', and 'sets'.
+        """
+
+        keys, values = np.array([str(x) for x in subclass_dict.keys()], dtype=str), list(subclass_dict.values())
+        order = np.argsort(keys, kind='stable'); counts = [len(values[i]) for i in order]
+        values_arr = np.array([str(x) for i in order for x in values[i]], dtype=str)
+        offsets = np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]).astype(np.int64)
+
+        sets = np.array([isinstance(values[i], (set, frozenset)) for i in order], dtype=bool)
+
+        return {'keys': keys[order], 'offsets': offsets, 'values': values_arr, 'sets': sets}
+
+    @classmethod
+    def loads(cls, file_name: str) -> 'SubclassMap':
+        """Loads a pickled subclass_construction_map as a SubclassMap. The map is loaded once per process; its arrays
+        are stored in a directory named after the pickled file (e.g. subclass_construction_map_index) and are rebuilt
+        whenever the size or modification time of the pickled file changes.
+
+        Args:
+            file_name: A string containing the filepath to a pickled subclass_construction_map.
+
+        Returns:
+            A SubclassMap instance.
+        """
+
+        stats = os.stat(file_name); source = {'file': os.path.abspath(file_name), 'size': stats.st_size,
+                                              'mtime_ns': stats.st_mtime_ns}
+        key = (source['file'], source['size'], source['mtime_ns'])
+        if key in subclass_maps: return subclass_maps[key]
+        store_dir = os.path.splitext(file_name)[0] + '_index'; arrays = ['keys', 'offsets', 'values', 'sets']
+        try:
+            with open(store_dir + '/source.json', 'r') as f: current = json.load(f) == source
+            current = current and all(os.path.exists(store_dir + '/{}.npy'.format(k)) for k in arrays)
+        except (OSError, ValueError): current = False
+        if not current:  # write to a temporary directory so that concurrent processes never read a partial index
+            with open(file_name, 'rb') as filepath:  # type: IO[Any]
+                index = cls.builds_index(pickle.load(filepath, encoding='bytes'))
+            temp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(file_name)))
+            for k, v in index.items(): np.save(temp_dir + '/{}.npy'.format(k), v)
+            with open(temp_dir + '/source.json', 'w') as f: json.dump(source, f)
+            shutil.rmtree(store_dir, ignore_errors=True)
+            try: os.rename(temp_dir, store_dir)
+            except OSError: shutil.rmtree(temp_dir, ignore_errors=True)  # another process wrote the index first
+        index = {k: np.load(store_dir + '/{}.npy'.format(k), mmap_mode='r').view(np.ndarray)  # mmap-backed arrays
+                 for k in arrays}
+        subclass_maps[key] = cls(index)
+
+        return subclass_maps[key]
 
 
 class KGConstructionApproach(object):
@@ -51,8 +169,8 @@ class KGConstructionApproach(object):
     """
 
     def __init__(self, write_location: str) -> None:
-        self.subclass_dict: Dict = dict()
-        self.subclass_error: Dict = dict()
+        self.subclass_dict: Mapping = dict()
+        self.subclass_error: Dict[str, Counter] = dict()
 
         # WRITE LOCATION
         if write_location is None:
@@ -61,18 +179,35 @@ class KGConstructionApproach(object):
         else: self.write_location = write_location
 
         # LOADING SUBCLASS DICTIONARY
-        file_name = self.write_location + '/construction_*/*.pkl'
-        if len(glob.glob(file_name)) == 0:
+        self.subclass_dict = self.indexes_subclass_map(self.write_location)
+
+    @staticmethod
+    def indexes_subclass_map(write_location: str) -> SubclassMap:
+        """Finds the pickled subclass_construction_map in the resources/construction_approach directory and loads it
+        as a SubclassMap, writing its memory-mapped index if it does not exist or is out of date. Builds call this once
+        before starting their workers so that the workers only ever read the index.
+
+        Args:
+            write_location: A string pointing to the 'resources' directory.
+
+        Returns:
+            A SubclassMap instance.
+
+        Raises:
+            OSError: If there is no subclass_dict file in the resources/construction_approach directory.
+            TypeError: If the subclass_dict file is empty.
+        """
+
+        file_name = glob.glob(write_location + '/construction_*/*.pkl')
+        if len(file_name) == 0:
             log_str = 'subclass_construction_map.pkl does not exist!'; logger.error('OSError: ' + log_str)
             raise OSError(log_str)
-        elif os.stat(glob.glob(file_name)[0]).st_size == 0:
-            log_str = 'The input file: {} is empty'.format(glob.glob(file_name)[0])
+        elif os.stat(file_name[0]).st_size == 0:
+            log_str = 'The input file: {} is empty'.format(file_name[0])
             logger.error('TypeError: ' + log_str); raise TypeError(log_str)
-        else:
-            with open(glob.glob(file_name)[0], 'rb') as filepath:  # type: IO[Any]
-                self.subclass_dict = pickle.load(filepath, encoding='bytes')
+        else: return SubclassMap.loads(file_name[0])
 
-    def maps_node_to_class(self, edge_type: str, entity: str) -> Optional[List]:
+    def maps_node_to_class(self, edge_type: str, entity: str) -> Optional[Union[List, Set]]:
         """Takes an entity and checks whether or not it exists in a dictionary of subclass content, such that keys
         are non-class entity identifiers (e.g. Reactome identifiers) and values are sets of ontology class identifiers
         mapped to that non-class entity. For example:
@@ -81,26 +216,70 @@ class KGConstructionApproach(object):
         The motivation for verifying whether a non-ontology node identifier is not in the subclass_map is to try and
         catch errors in the edge sources used to generate the edges. For example, there were genes taken from CTD
         that were tagged in the downloaded data as being human, that were not actually human and the way that we
-        caught that error was by checking against the identifiers included in the subclass_map dict.
+        caught that error was by checking against the identifiers included in the subclass_map dict. Misses are
+        counted per edge type in subclass_error, which maps each edge type to a Counter keyed by the unmapped
+        entities in the order they were first seen.
 
         Args:
             edge_type: A string containing the edge_type (e.g. "gene-pathway").
             entity: A string containing a node identifier (e.g. "R-HSA-5601843").
 
         Returns:
-            None if the non-class entity is not in the subclass_dict, otherwise a list of mappings between the
-            non-class entity node is returned.
+            None if the non-class entity is not in the subclass_dict, otherwise the mappings of the non-class entity
+            node are returned as a list or a set (i.e. the container type used in the pickled subclass_dict).
         """
 
-        if entity not in self.subclass_dict.keys():
-            if self.subclass_error and edge_type in self.subclass_error.keys():
-                if entity not in self.subclass_error[edge_type]: self.subclass_error[edge_type] += [entity]
-            else: self.subclass_error[edge_type] = [entity]
-            subclass_map = None
-        else: subclass_map = self.subclass_dict[entity]
+        subclass_map = self.subclass_dict.get(entity)
+        if subclass_map is None:
+            if edge_type not in self.subclass_error.keys(): self.subclass_error[edge_type] = Counter()
+            self.subclass_error[edge_type][entity] += 1
 
         return subclass_map
 
+    @staticmethod
+    def summarizes_subclass_errors(subclass_error: Dict, top_n: int = 25) -> Dict:
+        """Aggregates the entities that could not be mapped to an ontology class into the per-edge type statistics
+        that are written to subclass_map_log.json.
+
+        Args:
+            subclass_error: A dictionary keyed by edge type, where values are Counters (or lists) of unmapped entities.
+            top_n: An integer specifying the number of most frequently missed entities to report (default=25).
+
+        Returns:
+            A dictionary keyed by edge type, for example:
+                {'chemical-gene': {'unmapped_entities': 2, 'misses': 3, 'top_unmapped': [['9', 2], ['10', 1]],
+                                   'entities': ['9', '10']}}
+        """
+
+        summary: Dict = dict()
+        for edge_type, misses in subclass_error.items():
+            misses = misses if isinstance(misses, Counter) else Counter(misses)
+            summary[edge_type] = {'unmapped_entities': len(misses), 'misses': sum(misses.values()),
+                                  'top_unmapped': [[k, v] for k, v in misses.most_common(top_n)],
+                                  'entities': list(misses.keys())}
+
+        return summary
+
+    @staticmethod
+    def merges_subclass_errors(subclass_errors: List[Dict]) -> Dict:
+        """Merges subclass_error dictionaries (e.g. from several workers or from several shards of one edge type) by
+        adding up the misses of each edge type.
+
+        Args:
+            subclass_errors: A list of dictionaries keyed by edge type, where values are Counters (or lists) of
+                unmapped entities.
+
+        Returns:
+            A dictionary keyed by edge type, where values are Counters of unmapped entities.
+        """
+
+        merged: Dict = dict()
+        for subclass_error in subclass_errors:
+            for edge_type, misses in subclass_error.items():
+                merged.setdefault(edge_type, Counter()).update(misses)
+
+        return merged
+
     @staticmethod
     def subclass_core_constructor(node1: URIRef, node2: URIRef, relation: URIRef, inv_relation: URIRef) -> Tuple:
         """Core subclass-based edge construction method. Constructs a single edge between to ontology classes as well as
@@ -274,3 +453,141 @@ class KGConstructionApproach(object):
                 edges += self.instance_core_constructor(URIRef(res['ent1']), URIRef(res['ent2']), rel, irel)
 
         return edges
+
+    def constructs_edge_batch(self, edge_info: Dict, edge_type: str, edges: Iterable, approach: str) -> Dict:
+        """Adds edges for an entire edge list using either the instance or the subclass construction approach. The
+        method returns the same triples, in the same order, as calling instance_constructor or subclass_constructor
+        once per edge, but resolves node mappings once per unique entity, creates each node term once, and computes
+        the pkt hashes over lists of strings. The triples are integer-encoded, such that each value in the triples
+        array is an index into the list of node terms.
+
+        Args:
+            edge_info: A dict of information needed to add the edges to graph (the "edges" key is not used), for
+                example: {'n1': 'subclass', 'n2': 'class', 'rel': 'RO_0003302', 'inv_rel': None,
+                          'uri': ['https://www.ncbi.nlm.nih.gov/gene/', 'http://purl.obolibrary.org/obo/']}
+            edge_type: A string containing the name of the edge_type (e.g. "gene-disease", "chemical-gene").
+            edges: A list of edges, where each edge is a list or array of two node identifiers.
+            approach: A string containing the construction approach (i.e. "instance" or "subclass").
+
+        Returns:
+            A dict with three keys: "terms" (a list of URIRef node terms), "triples" (a numpy array with three
+            columns of term indices), and "offsets" (a numpy array such that the triples for the ith edge are stored
+            in triples[offsets[i]:offsets[i + 1]]).
+
+        Raises:
+            ValueError: If approach is not "instance" or "subclass".
+        """
+
+        if approach not in ['instance', 'subclass']:
+            log_str = 'approach must be "instance" or "subclass".'; logger.error('ValueError: ' + log_str)
+            raise ValueError(log_str)
+        uri1, uri2 = edge_info['uri']; n1, n2 = edge_info['n1'] == 'class', edge_info['n2'] == 'class'
+        rel = URIRef(obo + edge_info['rel'])
+        irel = URIRef(obo + edge_info['inv_rel']) if edge_info['inv_rel'] is not None else None
+        ids: Dict[str, int] = {}  # interned node terms, ids are assigned in order of first appearance
+        typ, cls, sub, named, prop, restr, some, on_prop, r, ir = [
+            ids.setdefault(str(x), len(ids)) for x in [RDF.type, OWL.Class, RDFS.subClassOf, OWL.NamedIndividual,
+                                                       OWL.ObjectProperty, OWL.Restriction, OWL.someValuesFrom,
+                                                       OWL.onProperty, rel, irel if irel is not None else rel]]
+        # resolve mappings and node terms for each edge
+        side = None if n1 == n2 else (1 if n1 else 0)  # index of the entity node in class-entity/entity-class edges
+        mapped: Dict = {}; prefixes: Dict = {}; pairs: List = []; edge_prefixes: List = []
+        for edge in edges:
+            nodes = (uri1 + edge[0], uri2 + edge[1]); mapped_nodes: List = []
+            if not (n1 and n2):  # resolve non-class entities to ontology classes
+                for i in ([side] if side is not None else [0, 1]):
+                    x = nodes[i].replace(uri2 if i == 1 else uri1, '')
+                    if mapped.get(x) is None: mapped[x] = self.maps_node_to_class(edge_type, x)  # count misses
+                    mapped_nodes += [(i, x)]
+            if not all(mapped[x] for i, x in mapped_nodes): pairs += [None]; edge_prefixes += [None]; continue
+            pairs += [(ids.setdefault(nodes[0], len(ids)), ids.setdefault(nodes[1], len(ids)))]; prefix: List = []
+            for i, x in mapped_nodes:
+                if (i, nodes[i]) not in prefixes:
+                    e = ids[nodes[i]]; cls_ids = [ids.setdefault(obo + j, len(ids)) for j in mapped[x]]
+                    prefixes[(i, nodes[i])] = [y for c in cls_ids for y in ((e, sub, c), (c, typ, cls)) +
+                                               (((e, typ, cls),) if approach == 'instance' else ())]
+                prefix += prefixes[(i, nodes[i])]
+            edge_prefixes += [prefix]
+        # compute pkt hashes for all edges at once
+        n3s = {i: n3(URIRef(k)) for k, i in ids.items()}; keep = [p for p in pairs if p is not None]
+        if approach == 'instance':
+            rel_n3 = n3(sorted([rel, irel])[0]) if irel is not None else n3(rel)
+            cores = [n3s[a] + rel_n3 + n3s[b] for a, b in keep]
+            hashes = [(pkt + 'N' + hashlib.md5((c + 'subject').encode()).hexdigest(),
+                       pkt + 'N' + hashlib.md5((c + 'object').encode()).hexdigest()) for c in cores]
+        else:
+            rel_n3, irel_n3, res_n3 = n3(rel), n3(irel) if irel is not None else None, n3(OWL.Restriction)
+            cores = [(n3s[a] + rel_n3 + n3s[b], n3s[b] + irel_n3 + n3s[a] if irel_n3 else None) for a, b in keep]
+            hashes = [(pkt + 'N' + hashlib.md5(c.encode()).hexdigest(),
+                       pkt_bnode + 'N' + hashlib.md5((c + res_n3).encode()).hexdigest()) +
+                      ((pkt + 'N' + hashlib.md5(ic.encode()).hexdigest(),
+                        pkt_bnode + 'N' + hashlib.md5((ic + res_n3).encode()).hexdigest()) if ic else ())
+                      for c, ic in cores]
+        # assemble integer-encoded triples
+        triples: List = []; offsets: List = [0]; hash_iter = iter(hashes)
+        for pair, prefix in zip(pairs, edge_prefixes):
+            if pair is not None:
+                a, b = pair; u = [ids.setdefault(h, len(ids)) for h in next(hash_iter)]; triples += prefix
+                if approach == 'instance':
+                    triples += [(u[0], typ, a), (u[0], typ, named), (u[1], typ, b), (u[1], typ, named),
+                                (u[0], r, u[1]), (r, typ, prop)]
+                    if irel is not None: triples += [(u[1], ir, u[0]), (ir, typ, prop)]
+                else:
+                    triples += [(a, typ, cls), (u[0], sub, a), (u[0], typ, cls), (u[0], sub, u[1]),
+                                (u[1], typ, restr), (u[1], some, b), (b, typ, cls), (u[1], on_prop, r), (r, typ, prop)]
+                    if irel is not None:
+                        triples += [(b, typ, cls), (u[2], sub, b), (u[2], typ, cls), (u[2], sub, u[3]),
+                                    (u[3], typ, restr), (u[3], some, a), (a, typ, cls), (u[3], on_prop, ir),
+                                    (ir, typ, prop)]
+            offsets += [len(triples)]
+
+        return {'terms': [URIRef(x) for x in ids.keys()],
+                'triples': np.array(triples, dtype=np.int64).reshape(-1, 3),
+                'offsets': np.array(offsets, dtype=np.int64)}
+
+    def instance_constructor_batch(self, edge_info: Dict, edge_type: str, edges: Iterable) -> Dict:
+        """Adds edges for an entire edge list using the instance construction approach. See constructs_edge_batch for
+        details.
+
+        Args:
+            edge_info: A dict of information needed to add the edges to graph (see constructs_edge_batch).
+            edge_type: A string containing the name of the edge_type (e.g. "gene-disease", "chemical-gene").
+            edges: A list of edges, where each edge is a list or array of two node identifiers.
+
+        Returns:
+            A dict containing the node terms, integer-encoded triples, and per-edge triple offsets.
+        """
+
+        return self.constructs_edge_batch(edge_info, edge_type, edges, 'instance')
+
+    def subclass_constructor_batch(self, edge_info: Dict, edge_type: str, edges: Iterable) -> Dict:
+        """Adds edges for an entire edge list using the subclass construction approach. See constructs_edge_batch for
+        details.
+
+        Args:
+            edge_info: A dict of information needed to add the edges to graph (see constructs_edge_batch).
+            edge_type: A string containing the name of the edge_type (e.g. "gene-disease", "chemical-gene").
+            edges: A list of edges, where each edge is a list or array of two node identifiers.
+
+        Returns:
+            A dict containing the node terms, integer-encoded triples, and per-edge triple offsets.
+        """
+
+        return self.constructs_edge_batch(edge_info, edge_type, edges, 'subclass')
+
+    @staticmethod
+    def decodes_edge_batch(batch: Dict, edge_index: Optional[int] = None) -> List:
+        """Converts integer-encoded triples returned by constructs_edge_batch back into tuples of node terms.
+
+        Args:
+            batch: A dict returned by constructs_edge_batch.
+            edge_index: An integer specifying a single edge to decode (default=None, which decodes all edges).
+
+        Returns:
+            A list of tuples representing new edges to add to the knowledge graph.
+        """
+
+        terms, triples = batch['terms'], batch['triples']
+        if edge_index is not None: triples = triples[batch['offsets'][edge_index]:batch['offsets'][edge_index + 1]]
+
+        return [(terms[s], terms[p], terms[o]) for s, p, o in triples.tolist()]
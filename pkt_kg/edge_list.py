@@ -4,17 +4,23 @@
 # import needed libraries
 import csv
 import glob
+import hashlib
 import json
 import logging.config
+import numpy as np  # type: ignore
 import os
 import pandas as pd  # type: ignore
-import ray  # type: ignore
 import re
+import shutil
+import tempfile
 
 from collections import ChainMap
 from difflib import SequenceMatcher
 from tqdm import tqdm  # type: ignore
-from typing import Any, Dict, IO, List, Optional, TextIO, Tuple, Union
+from typing import Any, Dict, Generator, IO, Iterable, List, Optional, TextIO, Tuple, Union
+
+from pkt_kg.utils import *
+from pkt_kg.utils.data_utils import worker_base_mb
 
 # logging
 log_dir, log, log_config = 'builds/logs', 'pkt_build_log.log', glob.glob('**/logging.ini', recursive=True)
@@ -26,6 +32,9 @@ except FileNotFoundError:
 logger = logging.getLogger(__name__)
 logging.config.fileConfig(log_config[0], disable_existing_loggers=False, defaults={'log_file': log_dir + '/' + log})
 
+# approximate ratio between the memory used by a parsed Pandas DataFrame and the size of its source file
+parse_ratio = 10
+
 # TODO:
 #  (1) using eval() to handle filtering of downloaded data, should consider replacing this in a future release.
 
@@ -42,13 +51,21 @@ class CreatesEdgeList(object):
     Attributes:
         data_files: A list that contains the full file path and name of each downloaded data source.
         source_file: A string containing the filepath to resource information.
+        mapping_cache: An optional dictionary keyed by identifier mapping filepath, where each value is an index
+            created by pkt_kg.utils.builds_sorted_index. Mapping files that are not in the cache are parsed on first
+            use and then added to it.
+        memory_limit: An optional float specifying the approximate peak memory (in MB) to use when processing a
+            single edge type. Sources that would not fit are streamed in chunks (see streams_edge_data).
     """
 
-    def __init__(self, data_files: Dict[str, str], source_file: str) -> None:
+    def __init__(self, data_files: Dict[str, str], source_file: str, mapping_cache: Optional[Dict] = None,
+                 memory_limit: Optional[float] = None) -> None:
 
         self.data_files = data_files
         self.source_file = source_file
+        self.memory_limit = memory_limit
         self.source_info: Dict[str, Dict[str, Any]] = dict()
+        self.mapping_cache: Dict[str, Dict[str, np.ndarray]] = dict(mapping_cache) if mapping_cache else dict()
 
         with open(source_file, 'r') as source_file_data:
             for row in source_file_data.read().splitlines():
@@ -125,6 +142,67 @@ class CreatesEdgeList(object):
 
         return df.fillna('None', inplace=False)
 
+    @staticmethod
+    def gets_column_types(reader: Iterable) -> Dict[Any, Tuple[str, bool]]:
+        """Determines the type that Pandas would infer for each column of a data source if it were read in at once,
+        by scanning the source as strings one chunk at a time. This is used to read every chunk of a streamed source
+        with the same column types, even when a chunk on its own would be inferred differently.
+
+        Args:
+            reader: An iterable of Pandas DataFrames containing the data source read in as strings.
+
+        Returns:
+            A dictionary keyed by column label, where each value is a tuple of (1) the inferred type ("int64",
+            "float64", "bool", or "object") and (2) a bool indicating whether or not the column has missing values.
+        """
+
+        types: Dict = dict()
+        for chunk in reader:
+            for col in list(chunk):
+                values = chunk[col].dropna(); col_na = bool(chunk[col].isna().any()); prior = types.get(col, set())
+                if len(values) == 0: types[col] = prior | ({'na'} if col_na else set()); continue
+                if values.isin(['True', 'False', 'TRUE', 'FALSE', 'true', 'false']).all(): kind = 'bool'
+                elif values.str.match(r'\s*[+-]?\d+\s*$').all(): kind = 'int64'
+                elif pd.to_numeric(values, errors='coerce').notna().all(): kind = 'float64'
+                else: kind = 'object'
+                types[col] = prior | {kind} | ({'na'} if col_na else set())
+        col_types: Dict = dict()
+        for col, kinds in types.items():
+            na, kinds = 'na' in kinds, kinds - {'na'}
+            if kinds == {'bool'} and not na: col_types[col] = ('bool', na)
+            elif kinds == {'int64'} and not na: col_types[col] = ('int64', na)
+            elif len(kinds) == 0 or kinds <= {'int64', 'float64'}: col_types[col] = ('float64', na)
+            else: col_types[col] = ('object', na)
+
+        return col_types
+
+    def data_chunk_reader(self, file_path: str, delim: str = 't', chunk_size: int = 100000) -> Generator:
+        """Streaming version of data_reader that yields a data source as a series of Pandas DataFrames with at most
+        chunk_size rows. The rows to skip, the header, and the column types (see gets_column_types) are determined
+        for the whole source, so that each chunk contains the same values as the corresponding rows of data_reader.
+        The index of each chunk holds the row's position in the source, which is used to preserve the original row
+        order across chunks.
+
+        Args:
+            file_path: A Filepath to data.
+            delim: A Character used to split rows into columns.
+            chunk_size: An integer specifying the maximum number of rows per chunk (default=100000).
+
+        Returns:
+            A generator of Pandas DataFrames.
+        """
+
+        spt = '\t' if 't' in delim else r"\s+" if '' in delim else delim; sep = delim if delim in ['', ' '] else spt
+        with open(file_path, 'r') as input_data_r:  # type: IO[Any]
+            skip = [row for row, line in enumerate(input_data_r) if sep not in line.rstrip('\n').rstrip('\r')]
+        input_data_r.close()
+        head = self.identify_header(file_path, spt, skip); args = {'header': head, 'delimiter': spt, 'skiprows': skip}
+        col_types = self.gets_column_types(pd.read_csv(file_path, dtype=str, chunksize=chunk_size, **args))
+        dtypes = {k: (str if v[0] == 'object' else v[0]) for k, v in col_types.items()}
+        for chunk in pd.read_csv(file_path, dtype=dtypes, chunksize=chunk_size, **args):
+            for col in [k for k, v in col_types.items() if v[1]]: chunk[col] = chunk[col].astype(object)
+            yield chunk.fillna('None', inplace=False)
+
     @staticmethod
     def filter_fixer(criteria):
         """Processes empty strings by converting them to None.
@@ -165,7 +243,8 @@ class CreatesEdgeList(object):
             map_filter_criteria = self.filter_fixer(filter_criteria) + '::' + self.filter_fixer(evidence_criteria)
             criteria = [x for x in map_filter_criteria.split('::') if x != 'None']
             for crit in criteria:
-                if crit.split(';')[1] == 'dedup':
+                if len(df) == 0: break  # nothing left to filter (e.g. an empty chunk of a streamed source)
+                elif crit.split(';')[1] == 'dedup':
                     sort_col = list(df)[int(crit.split(';')[0].split('-')[0])]
                     filter_col = list(df)[int(crit.split(';')[0].split('-')[1])]
                     sort_dir = [True if crit.split(';')[-1].lower() == 'asc' else False][0]
@@ -195,9 +274,8 @@ class CreatesEdgeList(object):
 
     @staticmethod
     def data_reducer(cols: str, edge_data: pd.DataFrame) -> pd.DataFrame:
-        """Reduces a Pandas DataFrame to the 2 columns specified by resource_info.txt. Prior to returning the data, the
-        function checks the data type of each column in the reduced Pandas DataFrame to make sure that neither column is
-        of type float.
+        """Reduces a Pandas DataFrame to the 2 columns specified by resource_info.txt. Float columns are converted to
+        integers before duplicate rows are removed, so that both steps are done in a single pass over the reduced data.
 
         Args:
             cols: A ';'-delimited string containing column indices (e.g. 0;3 - which maps to columns 0 and 3).
@@ -208,16 +286,17 @@ class CreatesEdgeList(object):
         """
 
         edge_data = edge_data[[list(edge_data)[int(cols.split(';')[0])], list(edge_data)[int(cols.split(';')[1])]]]
-        edge_data = edge_data.drop_duplicates(subset=None, keep='first', inplace=False)
-        # make sure neither column is float
-        for x in list(edge_data):
-            if 'float' in str(edge_data[x].dtype): edge_data[x] = edge_data[x].astype(int)
+        float_cols = {x: int for x in list(edge_data) if 'float' in str(edge_data[x].dtype)}
+        if len(float_cols) > 0: edge_data = edge_data.astype(float_cols)  # make sure neither column is float
 
-        return edge_data
+        return edge_data.drop_duplicates(subset=None, keep='first', inplace=False)
 
     @staticmethod
     def label_formatter(edge_data: pd.DataFrame, label_criteria: str) -> pd.DataFrame:
-        """Applies criteria to reformat edge data labels.
+        """Applies criteria to reformat edge data labels. For each node column, if the splitter is empty (and there is
+        a string to append) or if no value in the column contains the splitter, the string is prepended to every
+        value; otherwise everything up to and including the last occurrence of the splitter is replaced by it. Each
+        column is factorized first, so that the formatting is only applied once per unique identifier.
 
         Args:
             edge_data: A Pandas DataFrame containing a column for each node in the edge
@@ -230,25 +309,167 @@ class CreatesEdgeList(object):
             edge_data: A Pandas DataFrame with updated value labels.
         """
 
-        cut = label_criteria.split(';')[0]
+        cut = label_criteria.split(';')[0]; cut_pattern = re.compile('(^.*{})'.format(cut))
         for col in range(0, len(label_criteria.split(';')[1:])):
-            formatter, col_to_check = label_criteria.split(';')[col + 1], edge_data[list(edge_data)[col]].astype(str)
-            if (cut == '' and formatter != '') or not any(i for i in list(col_to_check) if cut in i):
-                edge_data[list(edge_data)[col]] = edge_data[list(edge_data)[col]].apply(lambda x: formatter + str(x))
-            elif cut != '' and formatter != '':
-                edge_data[list(edge_data)[col]].replace('(^.*{})'.format(cut), formatter, inplace=True, regex=True)
-            elif cut != '' and formatter == '':
-                edge_data[list(edge_data)[col]].replace('(^.*{})'.format(cut), formatter, inplace=True, regex=True)
-            else:
-                pass
+            formatter, col_name = label_criteria.split(';')[col + 1], list(edge_data)[col]
+            codes, uniques = pd.factorize(edge_data[col_name])
+            if (codes == -1).any(): codes, uniques = np.arange(len(edge_data)), edge_data[col_name].values
+            uniques = pd.Series(uniques, dtype=object); unique_str = uniques.astype(str)
+            has_cut = (unique_str.str.contains(cut, regex=False) & (unique_str != '')).any()
+            if (cut == '' and formatter != '') or not has_cut:
+                edge_data[col_name] = (formatter + unique_str).values[codes]
+            elif cut != '':  # only string values are updated, matching Series.replace
+                is_str = uniques.map(lambda x: isinstance(x, str)).astype(bool)
+                if is_str.any(): uniques[is_str] = uniques[is_str].str.replace(cut_pattern, formatter, regex=True)
+                edge_data[col_name] = uniques.values[codes]
 
         return edge_data
 
+    @staticmethod
+    def gets_dedup_keys(df: pd.DataFrame, sorts: List[str]) -> pd.DataFrame:
+        """Returns the sort column of each "dedup" criterion, as read with the column types of the whole source (see
+        data_chunk_reader) and without being converted, so that they sort the same way as in the in-memory path.
+
+        Args:
+            df: A Pandas DataFrame, indexed by source row position.
+            sorts: A list of dedup criteria, starting with the last one that was applied (e.g. "8-9;dedup;desc").
+
+        Returns:
+            A Pandas DataFrame with the same index as df and one column per criterion, labeled by its position in sorts.
+        """
+
+        return pd.DataFrame({j: df[list(df)[int(x.split(';')[0].split('-')[0])]] for j, x in enumerate(sorts)},
+                            index=df.index)
+
+    @staticmethod
+    def orders_dedup_rows(keys: pd.DataFrame, sorts: List[str]) -> pd.Index:
+        """Orders rows the way that sequential stable sorts of the full data by a list of "dedup" criteria would, i.e.
+        by the sort column of each criterion, with ties broken by the criteria that follow it and then by source row
+        order.
+
+        Args:
+            keys: A Pandas DataFrame of sort columns returned by gets_dedup_keys.
+            sorts: A list of dedup criteria, starting with the last one that was applied (e.g. "8-9;dedup;desc").
+
+        Returns:
+            A Pandas Index of the rows in sorted order.
+        """
+
+        keys = keys.sort_index()
+        if len(sorts) == 0: return keys.index
+        else: return keys.sort_values(list(keys), ascending=[x.split(';')[-1].lower() == 'asc' for x in sorts],
+                                      kind='mergesort').index
+
+    def dedups_partitioned_data(self, frames: Iterable, criteria: List[str], partitions: int, spill_dir: str,
+                                prior_sorts: Optional[List[str]] = None) -> Generator:
+        """Applies a "dedup" criterion, and the row-level criteria that follow it, to a stream of Pandas DataFrames
+        without holding the full data in memory. Rows are hash-partitioned on the deduplicated column and spilled to
+        disk, which guarantees that all duplicates of a value are in the same partition. Each partition is then read
+        back, sorted and deduplicated on its own. Ties are broken by the sort columns of the previous dedup criteria and
+        then by source row order, which reproduces the order that sequential stable sorts of the full data would give
+        (see orders_dedup_rows).
+
+        Args:
+            frames: An iterable of Pandas DataFrames, indexed by source row position.
+            criteria: A list of criteria, where the first item is a dedup criterion (e.g. "8-9;dedup;desc").
+            partitions: An integer specifying the number of partitions to spill to.
+            spill_dir: A string containing a directory path to write the partitions to.
+            prior_sorts: An optional list of the dedup criteria that were applied before this one (default=None).
+
+        Returns:
+            A generator of Pandas DataFrames, one per non-empty partition.
+        """
+
+        filter_idx = int(criteria[0].split(';')[0].split('-')[1]); sorts = [criteria[0]] + (prior_sorts or [])[::-1]
+        spill_dir = tempfile.mkdtemp(dir=spill_dir); pieces: Dict[int, List[str]] = {i: [] for i in range(partitions)}
+        for i, df in enumerate(frames):
+            if len(df) == 0: continue
+            part = pd.util.hash_pandas_object(df[list(df)[filter_idx]].astype(str), index=False).values % partitions
+            for p in np.unique(part):
+                pieces[p].append(spill_dir + '/{}_{}.pkl'.format(p, i)); df[part == p].to_pickle(pieces[p][-1])
+        for p in [x for x in range(partitions) if len(pieces[x]) > 0]:
+            df = pd.concat([pd.read_pickle(x) for x in pieces[p]])
+            for x in pieces[p]: os.remove(x)
+            df = df.loc[self.orders_dedup_rows(self.gets_dedup_keys(df, sorts), sorts)]
+            df = df.drop_duplicates(subset=list(df)[filter_idx], keep='first', inplace=False)
+            yield self.filter_data(df, '::'.join(criteria[1:]) if len(criteria) > 1 else 'None', 'None')
+        shutil.rmtree(spill_dir)
+
+    def streams_edge_data(self, x: str, chunk_size: Optional[int] = None) -> pd.DataFrame:
+        """Bounded-memory version of STEP 1 of creates_knowledge_graph_edges (filtering/evidence criteria, column
+        reduction and duplicate removal) for data sources that are too large to be loaded at once. The source is read in
+        row chunks sized from memory_limit: (1) row-level criteria are applied to each chunk; (2) each "dedup" criterion
+        is applied with a spill-to-disk hash partition on the deduplicated column (see dedups_partitioned_data); and
+        (3) each chunk or partition is reduced to the two edge columns, which are then put back in the order of the
+        in-memory path (i.e. source row order, or the order of the dedup sorts, see orders_dedup_rows) and
+        deduplicated. The result contains the same edges, in the same order, as the in-memory path.
+
+        Args:
+            x: A string containing an edge type (e.g. "gene-gene").
+            chunk_size: An optional integer specifying the number of rows per chunk (default=None, which derives it
+                from memory_limit).
+
+        Returns:
+            A Pandas DataFrame with the two columns specified by the edge type's column_idx.
+        """
+
+        file_path, info = self.data_files[x], self.source_info[x]; file_size = max(os.path.getsize(file_path), 1)
+        limit = self.memory_limit * 2 ** 20 if self.memory_limit else file_size * parse_ratio
+        with open(file_path, 'rb') as f: row_count = max(sum(1 for _ in f), 1)
+        chunk_size = chunk_size or max(int(limit / (parse_ratio * file_size / row_count)), 1000)
+        partitions = int(min(np.ceil(file_size * parse_ratio / limit), 1024))
+        criteria = [i for i in (self.filter_fixer(info['filter_criteria']) + '::' +
+                                self.filter_fixer(info['evidence_criteria'])).split('::') if i != 'None']
+        stages = [i for i in range(len(criteria)) if criteria[i].split(';')[1] == 'dedup'] + [len(criteria)]
+        log_str = 'Streaming {} in chunks of {} rows ({} partitions)'.format(x, chunk_size, partitions)
+        print(log_str); logger.info(log_str)
+
+        # STEP 1: apply row-level criteria that precede the first dedup to each chunk
+        pre = '::'.join(criteria[:stages[0]]) if stages[0] > 0 else 'None'
+        chunks = self.data_chunk_reader(file_path, info['delimiter'], chunk_size)
+        frames: Iterable = (self.filter_data(df, pre, 'None') for df in chunks)
+        # STEP 2: apply each dedup criterion (and the row-level criteria that follow it) over spilled partitions
+        spill_dir = os.path.dirname(os.path.abspath(file_path))
+        for i in range(len(stages) - 1):
+            prior_sorts = [criteria[j] for j in stages[:i]]
+            stage = criteria[stages[i]:stages[i + 1]]
+            frames = self.dedups_partitioned_data(frames, stage, partitions, spill_dir, prior_sorts)
+        # STEP 3: reduce columns per chunk/partition and remove duplicates in the order of the in-memory path
+        sorts, reduced, keys = [criteria[j] for j in stages[:-1]][::-1], [], []
+        for df in (x for x in frames if len(x) > 0):
+            reduced += [self.data_reducer(info['column_idx'], df)]
+            keys += [self.gets_dedup_keys(df.loc[reduced[-1].index], sorts)]
+        if len(reduced) == 0: return pd.DataFrame(columns=[0, 1])
+        order = self.orders_dedup_rows(pd.concat(keys), sorts)
+        return pd.concat(reduced).loc[order].drop_duplicates(subset=None, keep='first', inplace=False)
+
+    def gets_mapping_index(self, file_path: str) -> Dict[str, np.ndarray]:
+        """Returns the index of an identifier mapping file, keyed by the file's first column (i.e. the identifier
+        to be mapped) with the second column (i.e. the identifier to map to) stored as values. Each mapping file is
+        only read and parsed once per process, after which the index is served from the mapping_cache.
+
+        Args:
+            file_path: A filepath to an identifier mapping data set.
+
+        Returns:
+            A dictionary of numpy arrays created by pkt_kg.utils.builds_sorted_index, plus a 'name' key storing the
+            label of the mapping file's first column.
+        """
+
+        if file_path not in self.mapping_cache:
+            map_data = self.data_reader(file_path).astype(str)
+            map_index = builds_sorted_index(map_data[list(map_data)[0]], map_data[list(map_data)[1]])
+            map_index['name'] = np.array(str(list(map_data)[0])); self.mapping_cache[file_path] = map_index
+
+        return self.mapping_cache[file_path]
+
     def data_merger(self, node: int, mapping_data: str, edge_data: pd.DataFrame) -> List[Union[str, pd.DataFrame]]:
         """Processes a string that contains instructions for mapping a column in the edge_data Pandas DataFrame. This
         function assumes that the mapping data pointed to contains two columns: (1) identifier in edge_data to be
         mapped and (2) the desired identifier to map to. If one of the columns does not need to be mapped to an
-        identifier then the original node's column is used for the final merge.
+        identifier then the original node's column is used for the final merge. The mapping is performed as a join
+        against the cached index of the mapping file (see gets_mapping_index), which matches the result of an inner
+        merge on the string representation of the identifiers.
 
         Args:
             node: A column integer.
@@ -266,19 +487,14 @@ class CreatesEdgeList(object):
         # check if node needs to be mapped to an outside data source
         if str(node) in re.sub('(?:(?!:)\\D)*', '', mapping_data).split(':'):  # MAPPING TO OUTSIDE DATA SOURCE
             node2map = list(edge_data)[node]
-            try: map_data = self.data_reader(mapping_data.split(';')[node].split(':')[1]).astype(str)
-            except IndexError: map_data = self.data_reader(mapping_data.split(';')[0].split(':')[1]).astype(str)
-            # process mapping data
-            map_col = list(map_data)[0]
-            col_to_map = str(node2map) + '_' + str(map_col) + '_mapped'
-            map_data.rename(columns={list(map_data)[1]: str(col_to_map)}, inplace=True)
-            try: merged_data = pd.merge(edge_data, map_data, left_on=node2map, right_on=map_col, how='inner')
-            except ValueError:
-                # update map_data merge col to match edge_data merge col type
-                edge_data[node2map], map_data[map_col] = edge_data[node2map].astype(str), map_data[map_col].astype(str)
-                merged_data = pd.merge(edge_data, map_data, left_on=node2map, right_on=map_col, how='inner')
-            # drop all columns but merge key and value columns
-            merged_data = merged_data[[list(edge_data)[0], list(edge_data)[1], col_to_map]]
+            try: map_file = mapping_data.split(';')[node].split(':')[1]
+            except IndexError: map_file = mapping_data.split(';')[0].split(':')[1]
+            map_index = self.gets_mapping_index(map_file)
+            # join node column against the mapping index
+            col_to_map = str(node2map) + '_' + str(map_index['name']) + '_mapped'
+            edge_idx, map_idx = searches_sorted_index(map_index, edge_data[node2map].astype(str).values)
+            merged_data = edge_data[[list(edge_data)[0], list(edge_data)[1]]].iloc[edge_idx].reset_index(drop=True)
+            merged_data[col_to_map] = map_index['values'][map_idx]
         else:   # NOT MAPPING TO OUTSIDE DATA SOURCE
             col_to_map = str(list(edge_data)[node]) + '_mapped'
             edge_data[col_to_map] = edge_data[[list(edge_data)[node]]]
@@ -363,9 +579,13 @@ class CreatesEdgeList(object):
         """
 
         # STEP 1: Apply filtering/evidence criteria, reduce columns, and remove duplicates
-        df = self.data_reader(self.data_files[x], self.source_info[x]['delimiter']); n1, n2 = x.split('-')
-        df = self.filter_data(df, self.source_info[x]['filter_criteria'], self.source_info[x]['evidence_criteria'])
-        df = self.data_reducer(self.source_info[x]['column_idx'], df)
+        n1, n2 = x.split('-')
+        if self.memory_limit and os.path.getsize(self.data_files[x]) * parse_ratio > self.memory_limit * 2 ** 20:
+            df = self.streams_edge_data(x)
+        else:
+            df = self.data_reader(self.data_files[x], self.source_info[x]['delimiter'])
+            df = self.filter_data(df, self.source_info[x]['filter_criteria'], self.source_info[x]['evidence_criteria'])
+            df = self.data_reducer(self.source_info[x]['column_idx'], df)
 
         # STEP 2: Update node column values and rename columns
         df = self.label_formatter(df, self.source_info[x]['source_labels'])
@@ -384,15 +604,95 @@ class CreatesEdgeList(object):
 
         return None
 
+    def creates_mapping_cache(self, edge_types: List[str]) -> Dict[str, Dict[str, np.ndarray]]:
+        """Parses every identifier mapping file referenced by the input edge types into the mapping_cache. Mapping
+        files that do not exist are skipped, they are left for data_merger to handle when the edge type is processed.
+
+        Args:
+            edge_types: A list of strings containing edge types (e.g. ["chemical-disease", "gene-disease"]).
+
+        Returns:
+            The mapping_cache dictionary, keyed by mapping filepath.
+        """
+
+        map_files = set(x.split(':')[1] for k in edge_types if k in self.source_info
+                        for x in self.source_info[k]['identifier_maps'].split(';') if ':' in x)
+        for map_file in sorted(map_files):
+            if os.path.exists(map_file): self.gets_mapping_index(map_file)
+
+        return self.mapping_cache
+
+    def gets_edge_type_fingerprint(self, x: str) -> str:
+        """Creates a fingerprint for an edge type from everything that determines its edge list: (1) the md5 checksum
+        of the edge type's source data file; (2) the md5 checksum of each identifier mapping file it uses; and (3) its
+        row in resource_info.txt. If any of these change, the fingerprint changes.
+
+        Args:
+            x: A string containing an edge type (e.g. "gene-gene").
+
+        Returns:
+            A string containing the hexadecimal md5 digest of the edge type's inputs.
+        """
+
+        row = {k: v for k, v in self.source_info[x].items() if k not in ['edge_list', 'entity_namespaces']}
+        map_files = sorted(set(i.split(':')[1] for i in row['identifier_maps'].split(';') if ':' in i))
+        files = {f: gets_file_md5(f) for f in [self.data_files[x]] + map_files if os.path.exists(f)}
+        fingerprint = json.dumps({'resource_info': row, 'files': files}, sort_keys=True)
+
+        return hashlib.md5(fingerprint.encode()).hexdigest()
+
     @staticmethod
-    def runs_creates_knowledge_graph_edges(source_file: str, data_files: Dict, cpus: int = 1) -> None:
+    def gets_previous_edges(res_dir: str) -> Dict:
+        """Reads the master edge list created by a previous run, preferring the columnar store when it is at least as
+        recent as Master_Edge_List_Dict.json.
+
+        Args:
+            res_dir: A string containing the directory that the master edge list was written to.
+
+        Returns:
+            A nested dictionary keyed by edge type (empty if no previous master edge list exists).
+        """
+
+        edge_data, edge_store = res_dir + '/Master_Edge_List_Dict.json', res_dir + '/Master_Edge_List_Store'
+        if os.path.exists(edge_store + '/manifest.json') and (not os.path.exists(edge_data) or os.path.getmtime(
+                edge_store + '/manifest.json') >= os.path.getmtime(edge_data)):
+            edges = reads_edge_list_store(edge_store)
+            for v in edges.values(): v['edge_list'] = v['edge_list'].tolist()
+        elif os.path.exists(edge_data) and os.stat(edge_data).st_size > 0:
+            with open(edge_data, 'r') as f: edges = json.load(f)
+        else: edges = dict()
+
+        return edges
+
+    @staticmethod
+    def runs_creates_knowledge_graph_edges(source_file: str, data_files: Dict, cpus: int = 1,
+                                           incremental: bool = False, memory_limit: Optional[float] = None,
+                                           memory_budget: Optional[float] = None) -> None:
         """Method facilitates the parallel processing, using whatever cpus are available, of the master edge list
-        construction.
+        construction. Identifier mapping files are parsed once and placed in the executor's object store (see
+        gets_executor), so that every actor shares a single read-only copy of each mapping index. The results are
+        written to Master_Edge_List_Dict.json and to a columnar store (Master_Edge_List_Store), which allows the
+        knowledge graph build to memory-map each edge list instead of parsing the full JSON file.
+
+        A fingerprint of each edge type's inputs (see gets_edge_type_fingerprint) is written to
+        Master_Edge_List_Fingerprints.json. When incremental is True, edge types whose fingerprint matches the one
+        recorded by the previous run are reused from the previous master edge list and only the stale edge types are
+        reprocessed. The timing, peak memory, and throughput of each step are written to
+        Master_Edge_List_Build_Report.json and Master_Edge_List_Build_Report.csv (see tracks_build_stage).
+
+        The number of actors is planned under memory_budget (see plans_stage_workers). Each actor is estimated to parse
+        the largest stale source (capped by memory_limit, see streams_edge_data) and to keep the edge lists of its
+        share of the stale sources, which are also merged by the driver.
 
         Args:
             data_files: A list that contains the full file path and name of each downloaded data source.
             source_file: A string containing the filepath to resource information.
             cpus: An integer specifying the number of cores to use when processing the edge data (default=1).
+            incremental: A bool indicating whether or not to reuse unchanged edge types from the previous run
+                (default=False).
+            memory_limit: An optional float specifying the approximate peak memory (in MB) each actor should use
+                when processing a single edge type; larger sources are streamed in chunks (default=None).
+            memory_budget: An optional float specifying the peak memory (in MB) of all of the actors (default=None).
 
         Returns:
              None.
@@ -400,19 +700,63 @@ class CreatesEdgeList(object):
 
         logger.info('*' * 10 + 'PKT STEP: GENERATING KNOWLEDGE GRAPH MASTER EDGE LIST' + '*' * 10)
 
-        try: ray.init()
-        except RuntimeError: pass
-        actors = [ray.remote(CreatesEdgeList).remote(data_files, source_file) for _ in range(cpus)]  # type: ignore
-        edge_types = [x for x in data_files.keys() if '-' in x]
-        for i in range(0, len(edge_types)):
-            actors[i % cpus].creates_knowledge_graph_edges.remote(edge_types[i])  # type: ignore
-
-        # extract results, aggregate actor dictionaries into single dictionary, and write data to json file
-        _ = ray.wait([x.gets_source_info.remote() for x in actors], num_returns=len(actors))  # type: ignore
-        results = ray.get([x.gets_source_info.remote() for x in actors]); del actors  # type: ignore
-        actor_result_dicts = [{k: v for k, v in x.items() if len(v['edge_list']) > 0} for x in results]
-        with open('/'.join(source_file.split('/')[:-1]) + '/Master_Edge_List_Dict.json', 'w') as filepath:
-            json.dump(dict(ChainMap(*actor_result_dicts)), filepath)
-        filepath.close()
+        edge_list, edge_types = CreatesEdgeList(data_files, source_file), [x for x in data_files.keys() if '-' in x]
+        res_dir = '/'.join(source_file.split('/')[:-1]); build_report: List[Dict] = list()
+        fingerprint_file = res_dir + '/Master_Edge_List_Fingerprints.json'
+        with tracks_build_stage(build_report, 'edge_type_fingerprints') as counts:
+            fingerprints = {x: edge_list.gets_edge_type_fingerprint(x) for x in edge_types
+                            if x in edge_list.source_info}
+            counts['edge_types'] = len(fingerprints)
+
+        # identify edge types that can be reused from the previous run
+        master_edges: Dict = dict()
+        if incremental and os.path.exists(fingerprint_file):
+            with tracks_build_stage(build_report, 'reuse_previous_edges') as counts:
+                with open(fingerprint_file, 'r') as f: previous = json.load(f)
+                prior_edges = CreatesEdgeList.gets_previous_edges(res_dir)
+                fresh = [x for x in fingerprints.keys() if previous.get(x) == fingerprints[x]]
+                master_edges = {x: prior_edges[x] for x in fresh if x in prior_edges}
+                stale = [x for x in edge_types if x not in master_edges]; del prior_edges
+                counts['edge_types'] = len(master_edges)
+            log_str = 'Reusing {} unchanged edge types; rebuilding: {}'.format(
+                len(master_edges), ', '.join(stale) or 'None')
+            print(log_str); logger.info(log_str)
+        else: stale = edge_types
+
+        if len(stale) > 0:
+            with tracks_build_stage(build_report, 'edge_construction') as counts:
+                executor = gets_executor(); executor.starts()
+                mapping_cache = executor.puts(edge_list.creates_mapping_cache(stale))
+                args = (data_files, source_file, mapping_cache, memory_limit)
+                sizes = [os.path.getsize(data_files[x]) / 2 ** 20 for x in stale if os.path.exists(data_files[x])]
+                parse_mb = max(sizes or [0]) * parse_ratio; parse_mb = min(parse_mb, memory_limit or parse_mb)
+                plan = plans_stage_workers('edge_construction', cpus, lambda n: (
+                    sum(sizes), worker_base_mb + parse_mb + sum(sizes) / n), memory_budget)
+                log_str = 'Planned {} Edge List Actors: {}'.format(plan['planned_workers'], plan)
+                print(log_str); logger.info(log_str); workers = plan['planned_workers']
+                actors = [executor.creates_actor(CreatesEdgeList, *args) for _ in range(workers)]
+                for i in range(0, len(stale)):
+                    actors[i % workers].creates_knowledge_graph_edges.remote(stale[i])
+
+                # extract results, aggregate actor dictionaries into single dictionary
+                _ = executor.waits([x.gets_source_info.remote() for x in actors], num_returns=len(actors))
+                results = executor.gets([x.gets_source_info.remote() for x in actors]); del actors
+                actor_result_dicts = [{k: v for k, v in x.items() if len(v['edge_list']) > 0} for x in results]
+                built = dict(ChainMap(*actor_result_dicts)); master_edges.update(built)
+                counts.update({'edge_types': len(built), 'edges': sum(len(v['edge_list']) for v in built.values())})
+
+        # write data to json file, columnar store, and fingerprint manifest
+        with tracks_build_stage(build_report, 'write_master_edge_list') as counts:
+            with open(res_dir + '/Master_Edge_List_Dict.json', 'w') as filepath:
+                json.dump(master_edges, filepath)
+            filepath.close()
+            writes_edge_list_store(master_edges, res_dir + '/Master_Edge_List_Store')
+            with open(fingerprint_file, 'w') as filepath:
+                json.dump(fingerprints, filepath, indent=2)
+            filepath.close()
+            counts['edges'] = sum(len(v['edge_list']) for v in master_edges.values() if isinstance(v, Dict))
+        for log_str in merges_memory_plans(build_report, [plan] if len(stale) > 0 else []):
+            print(log_str); logger.info(log_str)
+        writes_build_report(build_report, res_dir + '/Master_Edge_List_Build_Report.json')
 
         return None
@@ -4,6 +4,7 @@
 # import needed libraries
 import copy
 import glob
+import hashlib
 import json
 import logging.config
 import networkx  # type: ignore
@@ -12,12 +13,13 @@ import os
 import os.path
 import pandas  # type: ignore
 import pickle
-import ray  # type: ignore
 import shutil
 import subprocess
+import time
 
 from abc import ABCMeta, abstractmethod
-from collections import ChainMap, Counter  # type: ignore
+from collections import Counter  # type: ignore
+from contextlib import ExitStack
 from rdflib import Graph, Namespace, URIRef, BNode  # type: ignore
 from rdflib.namespace import RDF, RDFS, OWL  # type: ignore
 from tqdm import tqdm  # type: ignore
@@ -28,9 +30,11 @@ from pkt_kg.construction_approaches import KGConstructionApproach
 from pkt_kg.metadata import Metadata
 from pkt_kg.owlnets import OwlNets
 from pkt_kg.utils import *
+from pkt_kg.utils.data_utils import edge_mb, pickle_ratio, triple_mb, worker_base_mb
 
 # set global attributes
 obo = Namespace('http://purl.obolibrary.org/obo/')
+edge_triples = 8  # approximate number of triples constructed per edge (see plans_edge_construction)
 
 # logging
 log_dir, f_log, log_config = 'builds/logs', 'pkt_build_log.log', glob.glob('**/logging.ini', recursive=True)
@@ -56,6 +60,11 @@ class KGBuilder(object):
         decode_owl: A string containing "yes" or "no" indicating whether owl semantics should be removed.
         cpus: An integer indicating the number of workers to use.
         write_location: An optional string passed to specify the primary directory to write to.
+        resume: A bool indicating whether to resume the build from its last valid checkpoint (default=False).
+        checkpoint: A bool indicating whether to checkpoint the build after each stage, so that it can be resumed
+            (default=False). The input files are only fingerprinted when the build is checkpointed or resumed.
+        memory_budget: An optional float specifying the peak memory (in MB) of the parallel build stages, which is
+            used to plan the number of workers of each stage (default=None, cpus workers are used).
 
     Raises:
         ValueError: If the formatting of kg_version is incorrect (i.e. not "v.#.#.#").
@@ -71,9 +80,11 @@ class KGBuilder(object):
     __metaclass__ = ABCMeta
 
     def __init__(self, construction: str, node_data: str, inverse_relations: str, decode_owl: str, cpus: int = 1,
-                 write_location: str = os.path.abspath('./resources/knowledge_graphs')) -> None:
+                 write_location: str = os.path.abspath('./resources/knowledge_graphs'), resume: bool = False,
+                 memory_budget: Optional[float] = None, checkpoint: bool = False) -> None:
 
         self.cpus: int = cpus
+        self.memory_budget: Optional[float] = memory_budget
         self.build: str = self.gets_build_type().lower().split()[0]
         self.graph: Graph = Graph()
         self.kg_version: str = 'v' + __version__
@@ -98,14 +109,17 @@ class KGBuilder(object):
         elif len(onts) == 0: log = 'Ontologies dir is empty'; logger.error('TypeError: ' + log); raise TypeError(log)
         else: self.ontologies: List[str] = onts
 
-        # GRAPH EDGE DATA
-        edge_data = self.res_dir + '/Master_Edge_List_Dict.json'
-        if not os.path.exists(edge_data):
+        # GRAPH EDGE DATA (memory-map the columnar store when it is at least as recent as the json file)
+        edge_data, edge_store = self.res_dir + '/Master_Edge_List_Dict.json', self.res_dir + '/Master_Edge_List_Store'
+        if os.path.exists(edge_store + '/manifest.json') and (not os.path.exists(edge_data) or os.path.getmtime(
+                edge_store + '/manifest.json') >= os.path.getmtime(edge_data)):
+            self.edge_data: str = edge_store
+        elif not os.path.exists(edge_data):
             log = '{} file does not exist!'.format(edge_data); logger.error('OSError: ' + log); raise OSError(log)
         elif os.stat(edge_data).st_size == 0:
             log = '{} is empty'.format(edge_data); logger.error('TypeError: ' + log); raise TypeError(log)
-        else:
-            with(open(edge_data, 'r')) as _file: self.edge_dict: Dict = json.load(_file)
+        else: self.edge_data = edge_data
+        self._edge_dict: Optional[Dict] = None  # loaded the first time it is used (see edge_dict)
 
         # RELATIONS DATA
         inv, rel_dir = str(inverse_relations).lower(), glob.glob(self.res_dir + '/relations_data/*.txt')
@@ -138,6 +152,37 @@ class KGBuilder(object):
         # KG FILE NAME
         self.full_kg: str = '/PheKnowLator_' + self.kg_version + '_' + self.build + '_' + const + rel + owl_kg + '.owl'
 
+        # SUBCLASS MAP LOG (written to the construction_approach directory)
+        self.subclass_log: str = 'subclass_map_log.json'
+
+        # BUILD CHECKPOINTS
+        self.resume: bool = resume
+        self.checkpoint: bool = checkpoint
+        self.checkpoint_dir: str = self.write_location + '/checkpoints' + self.full_kg[:-4]
+        self.input_fingerprint: Optional[str] = None
+
+        # BUILD REPORT
+        self.build_report: List[Dict] = list()
+        self.memory_plans: List[Dict] = list()
+
+    @property
+    def edge_dict(self) -> Dict:
+        """The master edge list dictionary, which is only loaded the first time it is used, so that builds that do not
+        construct edges themselves (e.g. MatrixBuild) never load it. Edge lists are memory-mapped from the edge list
+        store when it is at least as recent as Master_Edge_List_Dict.json (see reads_edge_list_store)."""
+
+        if self._edge_dict is None:
+            if not self.edge_data.endswith('.json'): self._edge_dict = reads_edge_list_store(self.edge_data)
+            else:
+                with open(self.edge_data, 'r') as _file: self._edge_dict = json.load(_file)
+
+        return self._edge_dict
+
+    @edge_dict.setter
+    def edge_dict(self, edge_dict: Dict) -> None:
+
+        self._edge_dict = edge_dict
+
     def reverse_relation_processor(self) -> None:
         """Creates and converts a Pandas DataFrame to a specific dictionary depending on whether it contains inverse
         relation data or relation data identifiers and labels. Examples of each dictionary are provided below:
@@ -158,6 +203,266 @@ class KGBuilder(object):
 
         return None
 
+    def creates_edge_constructor_params(self, args: Dict, meta: Metadata,
+                                        workers: Optional[int] = None) -> Tuple[List, List]:
+        """Assigns the edge types to the EdgeConstructor actors and prepares the inputs of each actor. Edge types that
+        are too large to be balanced across the actors are split into shards (see shards_edge_lists), so that several
+        actors can construct the edges of a single edge type. The inputs that are the same for every actor are put into
+        the executor's object store once (see gets_executor): the ontology classes as a hash set (see builds_hash_set),
+        the object properties as a set, and each edge type. Each actor also receives the node metadata for only the
+        nodes in its shards and the inverse relations of its edge types, which are determined once per edge type.
+
+        Args:
+            args: A dictionary of the EdgeConstructor parameters (see EdgeConstructor), without an edge_dict.
+            meta: An instance of the Metadata class.
+            workers: An optional integer specifying the number of actors (default=None, one actor per CPU).
+
+        Returns:
+            A tuple of two lists with one item per actor: (1) the (edge type, start, stop) shards assigned to the
+                actor; and (2) the actor's EdgeConstructor parameters, where the large inputs are object references.
+        """
+
+        sizes, executor = {k: len(v['edge_list']) for k, v in self.edge_dict.items()}, gets_executor()
+        workers = workers or self.cpus; edges = sublist_creator(shards_edge_lists(sizes, workers), workers)
+        shared = {'ont_cls': executor.puts(builds_hash_set(args['ont_cls'])),
+                  'obj_props': executor.puts(args['obj_props'])}
+        edge_refs = {k: executor.puts(self.edge_dict[k]) for k in sorted(set(x[0] for y in edges for x in y))}
+        inverse_rels, batch_size = dict(), args.get('batch_size') or 10000
+        for k in edge_refs if args.get('inverse_dict') is not None else []:  # once per edge type, not per shard
+            x = self.edge_dict[k]; inverse_rels[k] = self.EdgeConstructor.gets_inverse_relation(
+                x['edge_relation'], x['edge_list'], args['inverse_dict'], args.get('rel_dict'), batch_size)
+        params = []
+        for shards in edges:
+            edge_dict, nodes = {x[0]: edge_refs[x[0]] for x in shards}, set()
+            if meta.node_dict:  # only the node metadata used by the shards is sent
+                for edge_type, start, stop in shards:
+                    x = self.edge_dict[edge_type]; edge_list = np.array(x['edge_list'][start:stop])
+                    for i in range(edge_list.shape[1] if len(edge_list) > 0 else 0):
+                        nodes |= set(np.char.add(x['uri'][i], edge_list[:, i].astype(str)).tolist())
+            params += [{**args, **shared, 'edge_dict': edge_dict,
+                        'inverse_rels': {x: inverse_rels[x] for x in edge_dict if x in inverse_rels},
+                        'metadata': executor.puts(meta.shards_node_metadata(nodes).creates_node_metadata)}]
+
+        return edges, params
+
+    def plans_edge_construction(self, args: Dict) -> Dict:
+        """Plans the number of EdgeConstructor actors under the memory budget (see plans_stage_workers). Each actor is
+        estimated to hold the ontology classes hash set, its share of the edges (plus, at most, the whole of the largest
+        edge type, because the actors receive whole edge types), its share of the node metadata, and two graphs of the
+        triples it constructs (i.e. about edge_triples per edge, twice as many with inverse relations). The driver
+        additionally merges the constructed triples of all of the actors.
+
+        Args:
+            args: A dictionary of the EdgeConstructor parameters (see EdgeConstructor).
+
+        Returns:
+            A dictionary of the edge construction plan (see plans_stage_workers).
+        """
+
+        sizes = [len(v['edge_list']) for v in self.edge_dict.values()] or [0]; edges = sum(sizes)
+        triples = edges * edge_triples * (2 if self.inverse_relations_dict is not None else 1)
+        metadata_mb = sum(os.path.getsize(x) for x in self.node_data or []) * pickle_ratio / 2 ** 20
+        ont_cls_mb = len(args['ont_cls']) * 8 / 2 ** 20
+
+        def estimates(n: int) -> Tuple[float, float]:
+            worker_mb = worker_base_mb + ont_cls_mb + min(edges, edges / n + max(sizes)) * edge_mb
+            return triples * triple_mb, worker_mb + metadata_mb / n + 2 * triples / n * triple_mb
+
+        plan = plans_stage_workers('edge_construction', self.cpus, estimates, self.memory_budget)
+        log_str = 'Planned {} EdgeConstructor Actors: {}'.format(plan['planned_workers'], plan)
+        print(log_str); logger.info(log_str); self.memory_plans.append(plan)
+
+        return plan
+
+    def runs_edge_constructors(self, args: Dict, meta: Metadata) -> List:
+        """Creates one EdgeConstructor actor per CPU, or fewer when the memory budget does not fit them (see
+        plans_edge_construction), assigns each actor its edge type shards (see creates_edge_constructor_params), and
+        waits for the actors to finish. The logic and annotation triples of all
+        actors are written by one file writer per file (i.e. a TriplesWriter actor, see gets_executor), so that the
+        writes of different actors cannot be interleaved. The statistics of edge types that were split into shards are
+        merged and logged once per edge type, in sorted order.
+
+        Args:
+            args: A dictionary of the EdgeConstructor parameters (see EdgeConstructor), without an edge_dict.
+            meta: An instance of the Metadata class.
+
+        Returns:
+            A list of EdgeConstructor actors that have finished constructing their edges.
+        """
+
+        files, executor = self.EdgeConstructor.gets_output_files(args['write_loc'], args['kg_owl']), gets_executor()
+        writers = {x: executor.creates_file_writer(self.TriplesWriter, x) for x in files}
+        workers = self.plans_edge_construction(args)['planned_workers']
+        edges, params = self.creates_edge_constructor_params({**args, 'writers': writers}, meta, workers)
+        actors = [executor.creates_actor(self.EdgeConstructor, params[i]) for i in range(workers)]
+        for i in range(0, len(edges)): [actors[i].creates_new_edges.remote(j[0], j[1:]) for j in edges[i]]
+        _ = executor.waits([x.counters_getter.remote() for x in actors], num_returns=len(actors))
+        written = executor.gets([x.closes.remote() for x in writers.values()])
+        logger.info('Triples Writers: {}'.format(dict(zip(files, written)))); del writers
+        edge_stats: Dict = dict()
+        for actor_stats in executor.gets([x.edge_stats_getter.remote() for x in actors]):
+            for k, v in actor_stats.items(): edge_stats.setdefault(k, []).extend(v)
+        for k in sorted(edge_stats.keys()):
+            stat = self.EdgeConstructor.merges_edge_statistics(k, edge_stats[k])
+            p = 'Created {} Edges from {} Shards: {}'.format(k.upper(), len(edge_stats[k]), stat)
+            print('\n' + p); logger.info(p)
+
+        return actors
+
+    def prepares_ontology_graph(self, meta: Metadata, annot_file: str, logic_file: str) -> None:
+        """Runs the build stages that come before the edges are added: (1) Merge ontologies, or load the ontologies
+        merged by a previous build; (2) Process node metadata; and (3) Create graph subsets, appending the annotation
+        triples to annot_file and the logic triples to logic_file. Afterwards, graph holds the logic subset of the
+        merged ontologies. Each stage is measured (see tracks_build_stage).
+
+        Args:
+            meta: An instance of the Metadata class.
+            annot_file: A string specifying the path of the annotation triples file.
+            logic_file: A string specifying the path of the logic triples file.
+
+        Returns:
+            None.
+        """
+
+        # MERGE ONTOLOGIES
+        with tracks_build_stage(self.build_report, 'merge_ontologies') as counts:
+            if self.merged_ont_kg in glob.glob(self.write_location + '/*.owl'):
+                log_str = '*** Loading Merged Ontologies ***'; print(log_str); logger.info(log_str)
+                self.graph = Graph().parse(self.merged_ont_kg, format='xml')
+            else:
+                log_str = '*** Merging Ontology Data ***'; print(log_str); logger.info(log_str)
+                merges_ontologies(self.ontologies, self.merged_ont_kg.split('/')[-1], self.owl_tools)
+                self.graph.parse(self.merged_ont_kg, format='xml')
+            counts['triples'] = len(self.graph)
+        stats = 'Merged Ontologies {}'.format(derives_graph_statistics(self.graph)); print(stats); logger.info(stats)
+
+        # PROCESS NODE METADATA
+        log_str = '*** Loading Node Metadata Data ***'; print(log_str); logger.info(log_str)
+        with tracks_build_stage(self.build_report, 'node_metadata') as counts:
+            if self.node_data: meta.metadata_processor(); meta.extract_metadata(self.graph)
+            counts['nodes'] = len(meta.node_dict['nodes']) if meta.node_dict else 0
+
+        # CREATE GRAPH SUBSETS
+        log_str = '*** Splitting Graph ***'; print(log_str); logger.info(log_str)
+        with tracks_build_stage(self.build_report, 'split_graph') as counts:
+            self.graph, annotation_triples = splits_knowledge_graph(self.graph)
+            appends_to_existing_file(annotation_triples, annot_file); appends_to_existing_file(self.graph, logic_file)
+            counts['triples'] = len(self.graph) + len(annotation_triples); del annotation_triples
+        s = 'Merged Ontologies - Logic Subset {}'.format(derives_graph_statistics(self.graph)); print(s); logger.info(s)
+
+        return None
+
+    def gets_input_fingerprint(self) -> str:
+        """Creates a fingerprint of the build settings and input files (i.e. ontologies, relations data, and the master
+        edge list), which is used to only resume a build from checkpoints that were created from the same inputs. The
+        node metadata files are only fingerprinted by name, because the build updates them in place (see
+        Metadata.extract_metadata).
+
+        Returns:
+            A string containing the hexadecimal md5 digest of the build settings and input files.
+        """
+
+        edges = [self.res_dir + '/Master_Edge_List_Dict.json'] + glob.glob(self.res_dir + '/Master_Edge_List_Store/*')
+        files = sorted(self.ontologies) + sorted(glob.glob(self.res_dir + '/relations_data/*.txt')) + sorted(edges)
+        settings = {'full_kg': self.full_kg, 'node_data': sorted(self.node_data) if self.node_data else None,
+                    'files': {x: gets_file_md5(x) for x in files if os.path.isfile(x)}}
+
+        return hashlib.md5(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+    def checkpoints_stage(self, stage: str, state: Dict, files: List[str]) -> None:
+        """Saves the state of a completed build stage and adds the stage to the checkpoint manifest. The manifest holds
+        the input fingerprint (see gets_input_fingerprint) and, for each completed stage, the md5 of its pickled state
+        and the size and md5 of each artifact file that exists after the stage. The state and the manifest are written
+        to temporary files which are then renamed, so an interrupted build never leaves a partially written checkpoint.
+
+        Args:
+            stage: A string containing the name of the completed build stage.
+            state: A dictionary of the objects needed to continue the build after the stage.
+            files: A list of strings specifying paths to the stage's artifact files.
+
+        Returns:
+            None.
+        """
+
+        if self.input_fingerprint is None: self.input_fingerprint = self.gets_input_fingerprint()
+        if not os.path.exists(self.checkpoint_dir): os.makedirs(self.checkpoint_dir)
+        manifest_file, state_file = self.checkpoint_dir + '/checkpoint_manifest.json', self.checkpoint_dir + '/' + stage
+        manifest = {'fingerprint': self.input_fingerprint, 'stages': {}}
+        if os.path.exists(manifest_file):
+            with open(manifest_file, 'r') as f: manifest = json.load(f)
+        with open(state_file + '.tmp', 'wb') as out: pickle.dump(state, out, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(state_file + '.tmp', state_file + '.pkl')
+        artifacts = {x: {'size': os.path.getsize(x), 'md5': gets_file_md5(x)} for x in files if os.path.exists(x)}
+        manifest['stages'][stage] = {'state': gets_file_md5(state_file + '.pkl'), 'files': artifacts,
+                                     'completed': time.strftime('%Y-%m-%d %H:%M:%S')}
+        with open(manifest_file + '.tmp', 'w') as out: json.dump(manifest, out, indent=2)
+        os.replace(manifest_file + '.tmp', manifest_file)
+        log_str = 'Checkpointed Build Stage: {}'.format(stage); print(log_str); logger.info(log_str)
+
+        return None
+
+    def loads_checkpoint(self, stages: List[str]) -> Dict:
+        """Finds the last valid checkpoint of a build and loads its state. A stage's checkpoint is valid when the build
+        inputs have not changed since it was created, all of the stages before it were completed, its pickled state is
+        unchanged, and each of its artifact files still starts with the bytes that existed when the stage completed.
+        Artifact files that were appended to after that stage are truncated back to their checkpointed size, and the
+        checkpoints of later stages are removed. When the build is not being resumed, or no stage is valid, all
+        checkpoints are removed so that the build starts from scratch.
+
+        Args:
+            stages: A list of the names of the build's stages, in the order that they are completed.
+
+        Returns:
+            A dictionary that is empty when the build starts from scratch, otherwise it contains the keys: "stage",
+                the name of the last valid stage; and "state", the dictionary that was saved with the stage.
+        """
+
+        completed: List = []; manifest_file = self.checkpoint_dir + '/checkpoint_manifest.json'
+        if self.resume and os.path.exists(manifest_file):
+            with open(manifest_file, 'r') as f: manifest = json.load(f)
+            self.input_fingerprint = self.gets_input_fingerprint()  # only the inputs of a resumed build are hashed
+            if manifest['fingerprint'] != self.input_fingerprint:
+                log_str = 'Build inputs changed since the last checkpoint'; print(log_str); logger.info(log_str)
+            else:
+                recorded = stages[:[x in manifest['stages'] for x in stages + [None]].index(False)]
+                for i in reversed(range(len(recorded))):  # each stage's state and files are enough to continue from it
+                    info, state_file = manifest['stages'][recorded[i]], self.checkpoint_dir + '/' + recorded[i] + '.pkl'
+                    if not os.path.exists(state_file) or gets_file_md5(state_file) != info['state']: continue
+                    if all(os.path.exists(k) and os.path.getsize(k) >= v['size'] and
+                           gets_file_md5(k, size=v['size']) == v['md5'] for k, v in info['files'].items()):
+                        completed = recorded[:i + 1]; break
+        if len(completed) == 0:
+            if os.path.exists(self.checkpoint_dir): shutil.rmtree(self.checkpoint_dir)
+            if self.resume: log_str = 'No valid checkpoints, starting build'; print(log_str); logger.info(log_str)
+            return dict()
+        for stage in [x for x in manifest['stages'] if x not in completed]:  # remove checkpoints of later stages
+            del manifest['stages'][stage]; state_file = self.checkpoint_dir + '/' + stage + '.pkl'
+            if os.path.exists(state_file): os.remove(state_file)
+        with open(manifest_file + '.tmp', 'w') as out: json.dump(manifest, out, indent=2)
+        os.replace(manifest_file + '.tmp', manifest_file)
+        for k, v in manifest['stages'][completed[-1]]['files'].items(): os.truncate(k, v['size'])
+        with open(self.checkpoint_dir + '/' + completed[-1] + '.pkl', 'rb') as f: state = pickle.load(f)
+        log_str = 'Resuming Build After Stage: {}'.format(completed[-1]); print(log_str); logger.info(log_str)
+
+        return {'stage': completed[-1], 'state': state}
+
+    def writes_build_report(self) -> None:
+        """Writes the timing, CPU time, peak memory, and throughput of each build stage (see tracks_build_stage) to a
+        JSON and a CSV file in the write_location directory (i.e. <knowledge graph name>_Build_Report.json/.csv). The
+        memory plans of the parallel stages are added to the report and their estimates are logged next to the actual
+        peak memory of the stages (see merges_memory_plans).
+
+        Returns:
+            None.
+        """
+
+        for log_str in merges_memory_plans(self.build_report, self.memory_plans): print(log_str); logger.info(log_str)
+        report_file = self.write_location + self.full_kg[:-4] + '_Build_Report.json'
+        writes_build_report(self.build_report, report_file)
+        log_str = 'Build Report: {}'.format(report_file); print(log_str); logger.info(log_str)
+
+        return None
+
     def construct_knowledge_graph(self) -> None:
         """Builds a knowledge graph. The knowledge graph build is completed differently depending on the build type
         that the user requested. The build types include: "full", "partial", or "post-closure". The knowledge graph
@@ -179,37 +484,54 @@ class KGBuilder(object):
         pass
 
     class EdgeConstructor(object):
-        """Inner class object used to facilitate ray parallelization.
+        """Inner class object used to facilitate parallelization (see gets_executor).
 
         Attributes:
             construction: A string indicating the construction approach (i.e. instance or subclass).
             edge_data: A nested dictionary keyed by edge type that contains all information needed to construct an edge.
+                Each actor only receives the edge types it was assigned; edge lists are lists or numpy arrays. The
+                values can also be object references, so that actors sharing an edge type share one copy of it.
             kg_owl: A string containing a filename.
             rel_dict: A dictionary keyed by URI containing all relations for constructing an edge set.
             inverse_dict: A dictionary keyed by URI containing all relations and their inverse relation.
+            inverse_rels: A dictionary keyed by edge type containing the inverse relation of each edge type (or None),
+                as determined by gets_inverse_relation. Edge types that are not keys are checked by the actor.
             node_data: A string ("yes" or "no") indicating whether or not to add node data to the knowledge graph.
             metadata: An instance of the metadata class with bound method needed for created edge metadata.
-            ont_cls: A set of RDFLib URIRef terms representing all classes in the core merged ontologies.
+            ont_cls: A set of RDFLib URIRef terms representing all classes in the core merged ontologies, or a hash
+                set of them (see builds_hash_set).
             obj_props: A set of RDFLib URIRef terms representing all object properties in the core merged ontologies.
             write_loc: A string passed specifying the primary directory to write to.
+            batch_size: An integer specifying the number of edges constructed per batch (default=10000).
+            writers: A dictionary keyed by output file path with file writers (i.e. TriplesWriter actors or
+                SharedFileWriters) as values. Output files without a writer are appended to directly.
+            Any parameter can also be passed as an object reference (i.e. a Ray object reference or a SharedMemoryRef),
+                which is resolved when the actor is created.
         """
 
         def __init__(self, params) -> None:
 
+            params = {k: resolves_reference(v) for k, v in params.items()}
             self.clean_graph: Graph = Graph()
             self.construction: str = params.get('construction')
-            self.edge_dict: dict = params.get('edge_dict')
+            self.counters: Counter = Counter()
+            self.edge_dict: dict = {k: resolves_reference(v) for k, v in (params.get('edge_dict') or dict()).items()}
+            self.edge_stats: Dict = dict()
             self.error_dict: Dict = dict()
             self.graph: Graph = Graph()
             self.kg_owl = params.get('kg_owl')
             self.inverse_relations_dict: Optional[Dict] = params.get('inverse_dict')
+            self.inverse_rels: Dict = params.get('inverse_rels') or dict()
             self.node_data: Optional[str] = 'yes' if params.get('node_data') is not None else None
             self.node_metadata_func: Callable = params.get('metadata')
-            self.obj_properties: Set = params.get('obj_props')
+            self.obj_properties: Set = set(params.get('obj_props') or set())  # registry seeded from merged ontologies
             self.ont_classes: Set = params.get('ont_cls')
             self.relations_dict: Optional[Dict] = params.get('rel_dict')
+            self.batch_size: int = params.get('batch_size') or 10000
             self.res_dir: str = os.path.abspath('/'.join(params.get('write_loc').split('/')[:-1]))
             self.write_location: str = params.get('write_loc')
+            self.writers: Dict = params.get('writers') or dict()
+            self.pending_writes: List = []
 
         def graph_getter(self) -> Tuple[Graph, Graph]:
             """Methods returns two inner class RDFLib Graph objects the first contains pkt-namespaces and the second
@@ -217,13 +539,37 @@ class KGBuilder(object):
 
             return self.graph, self.clean_graph
 
+        def encoded_graph_getter(self, clean_graph: bool = True) -> Dict:
+            """Methods returns the inner class RDFLib Graph objects as integer-encoded triples (see encodes_triples),
+            which are much smaller to transfer to the driver than the graphs themselves.
+
+            Args:
+                clean_graph: A bool indicating whether or not to also encode the graph with the pkt-namespaces removed.
+
+            Returns:
+                A dictionary of the encoded graph and, if clean_graph is True, the encoded clean graph.
+            """
+
+            return encodes_triples([self.graph, self.clean_graph] if clean_graph else [self.graph])
+
         def error_dict_getter(self) -> Dict:
             """Methods returns inner class subclass error dict object."""
 
             return self.error_dict
 
+        def edge_stats_getter(self) -> Dict:
+            """Methods returns inner class edge statistics of the edge type shards (see merges_edge_statistics)."""
+
+            return self.edge_stats
+
+        def counters_getter(self) -> Counter:
+            """Methods returns inner class counters (e.g. the number of object properties checked and added)."""
+
+            return self.counters
+
         def verifies_object_property(self, object_property: URIRef) -> None:
-            """Adds an object property to a knowledge graph.
+            """Adds an object property to a knowledge graph. The object properties that are already in the graph are
+            kept in a set (seeded from the merged ontologies), which is updated as new object properties are added.
 
             Args:
                 object_property: A string containing an obo ontology object property.
@@ -238,9 +584,10 @@ class KGBuilder(object):
             if not isinstance(object_property, URIRef):
                 log = 'object not rdflib.term.URIRef'; logger.error('TypeError: ' + log); raise TypeError(log)
             else:
+                self.counters['object_properties_checked'] += 1
                 if object_property not in self.obj_properties:
                     self.graph.add((object_property, RDF.type, OWL.ObjectProperty))
-                    self.obj_properties = gets_object_properties(self.graph)
+                    self.obj_properties.add(object_property); self.counters['object_properties_added'] += 1
 
             return None
 
@@ -259,20 +606,65 @@ class KGBuilder(object):
                 False - if the edge contains at least 1 ontology class that is not present in the graph.
             """
 
-            if edge_info['n1'] != 'class' and edge_info['n2'] != 'class': return True
+            return bool(self.checks_batch_classes(edge_info, [edge_info['edges']])[0])
+
+        def checks_batch_classes(self, edge_info: Dict, edges: List) -> np.ndarray:
+            """Applies checks_classes to a batch of edges of the same edge type, looking up the ontology class nodes of
+            all of the edges at once (see finds_classes).
+
+            Args:
+                edge_info: A dict of information needed to add edge to graph (see checks_classes), without 'edges'.
+                edges: A list of edges (e.g. [['CHEBI_81395', 'DOID_12858'], ['CHEBI_81396', 'DOID_12858']]).
+
+            Returns:
+                A boolean numpy array, with one value per edge, which is True if the edge is safe to add to the graph.
+            """
+
+            if edge_info['n1'] != 'class' and edge_info['n2'] != 'class': return np.ones(len(edges), dtype=bool)
             elif edge_info['n1'] == 'class' and edge_info['n2'] == 'class':
-                n1, n2 = URIRef(obo + edge_info['edges'][0]), URIRef(obo + edge_info['edges'][1])
-                return n1 in self.ont_classes and n2 in self.ont_classes
-            else: return URIRef(finds_node_type(edge_info)['cls1']) in self.ont_classes
+                found = self.finds_classes([URIRef(obo + x[i]) for x in edges for i in [0, 1]])
+                return found.reshape(-1, 2).all(axis=1)
+            else:
+                i = 0 if edge_info['n1'] == 'class' else 1
+                return self.finds_classes([URIRef(edge_info['uri'][i] + x[i]) for x in edges])
+
+        def contains_classes(self, nodes: List[URIRef]) -> bool:
+            """Determines whether or not all nodes are classes in the core merged ontologies.
+
+            Args:
+                nodes: A list of RDFLib URIRef terms.
+
+            Returns:
+                True if every node is in ont_classes (a set of classes or a hash set), otherwise False.
+            """
+
+            return bool(self.finds_classes(nodes).all())
+
+        def finds_classes(self, nodes: List[URIRef]) -> np.ndarray:
+            """Determines which nodes are classes in the core merged ontologies. When ont_classes is a hash set, all of
+            the nodes are looked up with a single call to searches_hash_set.
+
+            Args:
+                nodes: A list of RDFLib URIRef terms.
+
+            Returns:
+                A boolean numpy array, with one value per node, which is True if the node is in ont_classes.
+            """
+
+            if isinstance(self.ont_classes, np.ndarray): return searches_hash_set(self.ont_classes, nodes)
+            else: return np.array([x in self.ont_classes for x in nodes], dtype=bool)
 
-        def checks_relations(self, relation: str, edge_list: Union[List, Set]) -> Optional[str]:
+        def checks_relations(self, relation: str, edge_list: Union[List, Set, np.ndarray]) -> Optional[str]:
             """Determines whether or not an inverse relation should be created and added to the graph and verifies
             that a
-            relation and its inverse (if it exists) are both an existing owl:ObjectProperty in the graph.
+            relation and its inverse (if it exists) are both an existing owl:ObjectProperty in the graph. Edge lists
+            that are numpy arrays (e.g. memory-mapped from the edge list store) are checked in chunks of batch_size
+            edges, so that they are never loaded as a whole.
 
             Args:
                 relation: A string that contains the relation assigned to edge in resource_info.txt (e.g. 'RO_0000056').
-                edge_list: A list or set of knowledge graph edges. For example: {["8837", "4283"], ["8837", "839"]}
+                edge_list: A list, set, or numpy array of knowledge graph edges. For example: {["8837", "4283"],
+                    ["8837", "839"]}
 
             Returns:
                 A string containing an ontology identifier (e.g. "RO_0000056) or None. Value depends on:
@@ -281,12 +673,41 @@ class KGBuilder(object):
                     - None, assuming the prior listed conditions are not met
             """
 
-            edge_list = set(tuple(x) for x in edge_list) if isinstance(edge_list, List) else edge_list
             if self.inverse_relations_dict is not None and relation in self.inverse_relations_dict.keys():
                 self.verifies_object_property(URIRef(obo + self.inverse_relations_dict[relation]))
-                return self.inverse_relations_dict[relation]
-            elif self.relations_dict is not None:
-                if relation in self.relations_dict.keys() and 'interact' in self.relations_dict[relation]:
+
+            return self.gets_inverse_relation(relation, edge_list, self.inverse_relations_dict, self.relations_dict,
+                                              self.batch_size)
+
+        @staticmethod
+        def gets_inverse_relation(relation: str, edge_list: Union[List, Set, np.ndarray], inverse_dict: Optional[Dict],
+                                  relations_dict: Optional[Dict], batch_size: int = 10000) -> Optional[str]:
+            """Determines whether or not an inverse relation should be created for an edge type (see checks_relations),
+            without verifying the relations in the graph. The driver uses it to determine the inverse relation of each
+            edge type once, instead of in every actor that constructs a shard of the edge type.
+
+            Args:
+                relation: A string that contains the relation assigned to edge in resource_info.txt (e.g. 'RO_0000056').
+                edge_list: A list, set, or numpy array of knowledge graph edges.
+                inverse_dict: A dictionary keyed by URI containing all relations and their inverse relation or None.
+                relations_dict: A dictionary keyed by URI containing all relations or None.
+                batch_size: An integer specifying the number of edges of a numpy array checked at once (default=10000).
+
+            Returns:
+                A string containing an ontology identifier (e.g. "RO_0000056) or None (see checks_relations).
+            """
+
+            if inverse_dict is not None and relation in inverse_dict.keys(): return inverse_dict[relation]
+            elif relations_dict is not None:
+                if relation in relations_dict.keys() and 'interact' in relations_dict[relation]:
+                    if isinstance(edge_list, np.ndarray):  # compare the hashes of each edge and its reverse
+                        edges, reverse = [np.array([], np.uint64)], [np.array([], np.uint64)]
+                        for i in range(0, len(edge_list), batch_size):
+                            chunk = edge_list[i:i + batch_size].tolist()
+                            edges += [hashes_strings(x[0] + '\t' + x[1] for x in chunk)]
+                            reverse += [hashes_strings(x[1] + '\t' + x[0] for x in chunk)]
+                        return None if np.isin(np.concatenate(reverse), np.concatenate(edges)).all() else relation
+                    edge_list = set(tuple(x) for x in edge_list) if isinstance(edge_list, List) else edge_list
                     return None if len([x for x in edge_list if x[-1::-1] not in edge_list]) == 0 else relation
                 else: return None
             else: return None
@@ -312,43 +733,183 @@ class KGBuilder(object):
 
             return formatted_str
 
-        def creates_new_edges(self, edge_type: str) -> Graph:
-            """Takes a dictionary of information needed to construct and edge creates the associated triples.
+        @staticmethod
+        def merges_edge_statistics(edge_type: str, shard_stats: List[Dict]) -> str:
+            """Merges the statistics of the shards of an edge type into the statistics of the whole edge type (see
+            gets_edge_statistics). Edges and nodes are stored as hash sets (see builds_hash_set), so that they are
+            counted once no matter how many shards they were constructed in and in which order the shards finished.
+
+            Args:
+                edge_type: A string point to a specific edge type (e.g. 'chemical-disease).
+                shard_stats: A list of dictionaries, one per shard, with the keys "edges", "owl_nodes", "n1", and "n2",
+                    which are hash sets, and "rels", the count of non-OWL edges.
+
+            Returns:
+                formatted_str: A string containing edge statistics.
+            """
+
+            n1, n2 = edge_type.split('-')[0], edge_type.split('-')[1]
+            keys = ['edges', 'owl_nodes', 'n1', 'n2']
+            counts = {k: len(np.unique(np.concatenate([x[k] for x in shard_stats]))) for k in keys}
+            stats = [counts['edges'], sum(x['rels'] for x in shard_stats), counts['owl_nodes'], counts['n1'], n1,
+                     counts['n2'], n2]
+            stats_str = '{} OWL Edges, {} Original Edges; {} OWL Nodes, Original Nodes: {} {}(s), {} {}(s)'
+            formatted_str = stats_str.format(stats[0], stats[1], stats[2], stats[3], stats[4], stats[5], stats[6])
+
+            return formatted_str
+
+        @staticmethod
+        def gets_output_files(write_location: str, kg_owl: str) -> Tuple[str, str]:
+            """Returns the paths of the logic and annotation N-Triples files that the edges are written to.
+
+            Args:
+                write_location: A string pointing to the knowledge graph directory.
+                kg_owl: A string containing the knowledge graph filename.
+
+            Returns:
+                A tuple of the logic file path and the annotation file path.
+            """
+
+            f_name = write_location + '_'.join(kg_owl.split('_')[0:-1]) + '_OWL'
+
+            return f_name + '_LogicOnly.nt', f_name + '_AnnotationsOnly.nt'
+
+        def writes_lines(self, out: Any, lines: str) -> None:
+            """Writes N-Triples lines to an open file or sends them to the file writer that owns the file. At
+            most eight sends are left pending, so that a slow writer holds back the actor rather than its queue growing.
+
+            Args:
+                out: An open file object or a file writer (i.e. a TriplesWriter actor or a SharedFileWriter).
+                lines: A string of N-Triples lines.
+
+            Returns:
+                None.
+            """
+
+            if len(lines) == 0: return None
+            elif not hasattr(out, 'writes_lines'): out.write(lines)
+            else:
+                self.pending_writes += [out.writes_lines.remote(lines)]
+                if len(self.pending_writes) > 8:
+                    _, self.pending_writes = gets_executor().waits(self.pending_writes, len(self.pending_writes) - 8)
+
+            return None
+
+        @profiles_function
+        def creates_new_edges(self, edge_type: str, edge_range: Optional[Tuple] = None) -> None:
+            """Takes a dictionary of information needed to construct and edge creates the associated triples. The edge
+            list is processed, without being modified, in batches of batch_size edges (edge lists that are memory-mapped
+            from the edge list store are only read one batch at a time). Each batch is constructed with a single call
+            to the batch construction approach, bulk inserted into the graphs, and written to the logic and annotation
+            files (see writes_lines), which stay open for the whole edge type. When only a shard of the
+            edge list is processed, the statistics of the shard are kept in edge_stats so that they can be merged with
+            those of the other shards (see merges_edge_statistics).
 
             Args:
                 edge_type: A list of strings representing the types of edges to build.
+                edge_range: A (start, stop) tuple of the indices of the edges to build (default=None, all edges).
 
             Returns:
-                graph: An RDFLib Graph object.
+                None.
             """
 
-            kg_bld = KGConstructionApproach(self.res_dir)
-            f_name = self.write_location + '_'.join(self.kg_owl.split('_')[0:-1]) + '_OWL'
-            anot = f_name + '_AnnotationsOnly.nt'; logic = f_name + '_LogicOnly.nt'
+            kg_bld = KGConstructionApproach(self.res_dir); start = time.perf_counter()
+            logic, anot = self.gets_output_files(self.write_location, self.kg_owl)
             edge_list = self.edge_dict[edge_type]['edge_list']; s, o = self.edge_dict[edge_type]['data_type'].split('-')
+            first, last = tuple(edge_range) if edge_range is not None else (0, len(edge_list))
+            shard = (first, last) != (0, len(edge_list)); hashes: List = []
             rel, uri = self.edge_dict[edge_type]['edge_relation'], self.edge_dict[edge_type]['uri']
-            invrel = self.checks_relations(rel, edge_list) if self.inverse_relations_dict is not None else None
-            n1, n2, rels = set(), set(), 0; res: Set = set()  # ; pbar = tqdm(total=len(edge_list))
-            while len(edge_list) > 0:
-                edge = edge_list.pop(0)  # ; pbar.update(1)
-                edge_info = {'n1': s, 'n2': o, 'rel': rel, 'inv_rel': invrel, 'uri': uri, 'edges': edge}
-                meta = self.node_metadata_func(ent=[''.join(x) for x in list(zip(uri, edge))], e_type=[s, o])
-                meta_logic = [True if (self.node_data is None and meta is None) or [s, o] == ['class', 'class']
-                              or (self.node_data is not None and meta is not None) else False][0]
-                if self.checks_classes(edge_info) and meta_logic:
-                    if self.construction == 'subclass': edges = set(kg_bld.subclass_constructor(edge_info, edge_type))
-                    else: edges = set(kg_bld.instance_constructor(edge_info, edge_type))
-                    res |= edges; n1 |= {edge[0]}; n2 |= {edge[1]}; rels = rels + 1 if invrel is None else rels + 2
-                    self.graph = adds_edges_to_graph(self.graph, edges, False); appends_to_existing_file(edges, logic)
-                    if meta is not None: appends_to_existing_file(meta, anot)
+            if self.inverse_relations_dict is None: invrel = None
+            elif edge_type not in self.inverse_rels: invrel = self.checks_relations(rel, edge_list)
+            else:  # determined once by the driver (see creates_edge_constructor_params)
+                invrel = self.inverse_rels[edge_type]
+                if rel in self.inverse_relations_dict: self.verifies_object_property(URIRef(obo + invrel))
+            edge_info = {'n1': s, 'n2': o, 'rel': rel, 'inv_rel': invrel, 'uri': uri}
+            n1, n2, rels = set(), set(), 0; res: Set = set()
+            with ExitStack() as stack:
+                logic_out, anot_out = [self.writers.get(x) or stack.enter_context(open(x, 'a', newline=''))
+                                       for x in [logic, anot]]
+                for i in range(first, last, self.batch_size):
+                    batch, meta_edges = [], []
+                    chunk = edge_list[i:min(i + self.batch_size, last)]  # only one batch of an edge store array
+                    chunk = chunk.tolist() if isinstance(chunk, np.ndarray) else list(chunk)
+                    for edge, is_safe in zip(chunk, self.checks_batch_classes(edge_info, chunk).tolist()):
+                        if not is_safe: continue
+                        meta = self.node_metadata_func(ent=[''.join(x) for x in list(zip(uri, edge))], e_type=[s, o])
+                        meta_logic = [True if (self.node_data is None and meta is None) or [s, o] == ['class', 'class']
+                                      or (self.node_data is not None and meta is not None) else False][0]
+                        if meta_logic: batch += [edge]; meta_edges += meta if meta is not None else []
+                    if len(batch) == 0: continue
+                    built = kg_bld.constructs_edge_batch(edge_info, edge_type, batch, self.construction)
+                    terms, term_n3 = built['terms'], [n3(x) for x in built['terms']]
+                    rows = set(tuple(x) for x in built['triples'].tolist())
+                    edges = {(terms[x[0]], terms[x[1]], terms[x[2]]) for x in rows}
+                    res |= edges; n1 |= {x[0] for x in batch}; n2 |= {x[1] for x in batch}
+                    rels += len(batch) if invrel is None else 2 * len(batch)
+                    self.graph.addN(x + (self.graph,) for x in edges)
+                    lines = [term_n3[x[0]] + ' ' + term_n3[x[1]] + ' ' + term_n3[x[2]] + ' .\n' for x in rows]
+                    self.writes_lines(logic_out, ''.join(lines)); hashes += [hashes_strings(lines)] if shard else []
+                    self.writes_lines(anot_out, ''.join(n3(x[0]) + ' ' + n3(x[1]) + ' ' + n3(x[2]) + ' .\n'
+                                                        for x in meta_edges))
                     cleaned_graph = updates_pkt_namespace_identifiers(edges, self.construction, False)
-                    self.clean_graph = adds_edges_to_graph(self.clean_graph, cleaned_graph, False)
-            stat = self.gets_edge_statistics(edge_type, res, [n1, n2, rels]); del [n1, n2, rels], res  # ; pbar.close()
-            p = 'Created {} ({}-{}) Edges: {}'.format(edge_type.upper(), s, o, stat); print('\n' + p); logger.info(p)
-            if len(kg_bld.subclass_error.keys()) > 0: self.error_dict = kg_bld.subclass_error
+                    self.clean_graph.addN(x + (self.clean_graph,) for x in cleaned_graph)
+            if len(self.pending_writes) > 0: gets_executor().gets(self.pending_writes); self.pending_writes = []
+            if shard:  # keep the shard statistics as hash sets to merge them with those of the other shards
+                owl_nodes = set(i for j in [x[0::2] for x in res] for i in j)
+                self.edge_stats.setdefault(edge_type, []).append(
+                    {'range': (first, last), 'edges': np.unique(np.concatenate(hashes or [np.array([], np.uint64)])),
+                     'owl_nodes': builds_hash_set([n3(x) for x in owl_nodes]), 'n1': builds_hash_set(list(n1)),
+                     'n2': builds_hash_set(list(n2)), 'rels': rels})
+            stat = self.gets_edge_statistics(edge_type, res, [n1, n2, rels]); del [n1, n2, rels], res
+            rate = (last - first) / max(time.perf_counter() - start, 1e-9)
+            label = edge_type.upper() + (' [{}:{}]'.format(first, last) if shard else '')
+            p = 'Created {} ({}-{}) Edges: {}; {:,.0f} Edges/Second'.format(label, s, o, stat, rate)
+            print('\n' + p); logger.info(p)
+            self.error_dict = KGConstructionApproach.merges_subclass_errors([self.error_dict, kg_bld.subclass_error])
 
             return None
 
+    class TriplesWriter(object):
+        """Inner class object used as the single writer of an N-Triples file that several EdgeConstructor actors
+        write to. Each call to writes_lines is written as a whole through a large buffer, so lines from different
+        actors are never interleaved.
+
+        Attributes:
+            filepath: A string specifying the path of the file to append to.
+            buffer_size: An integer specifying the size of the write buffer in bytes (default=4MiB).
+        """
+
+        def __init__(self, filepath: str, buffer_size: int = 2 ** 22) -> None:
+
+            self.filepath: str = filepath
+            self.out: IO = open(self.filepath, 'a', newline='', buffering=buffer_size)
+            self.lines: int = 0
+
+        def writes_lines(self, lines: str) -> None:
+            """Appends a string of N-Triples lines to the file.
+
+            Args:
+                lines: A string of N-Triples lines.
+
+            Returns:
+                None.
+            """
+
+            self.out.write(lines); self.lines += lines.count('\n')
+
+            return None
+
+        def closes(self) -> int:
+            """Flushes and closes the file.
+
+            Returns:
+                An integer specifying the number of lines written.
+            """
+
+            self.out.close()
+
+            return self.lines
+
 
 class PartialBuild(KGBuilder):
 
@@ -361,7 +922,8 @@ class PartialBuild(KGBuilder):
         """Builds a partial knowledge graph. A partial knowledge graph build is recommended when one intends to build a
         knowledge graph and intends to run a reasoner over it. The partial build includes the following steps: (1)
         Process relation/inverse relations; (2) Merge ontologies; (3) Process node metadata; (4) Create graph subsets;
-        and (5) Add master edge list to merged ontologies.
+        and (5) Add master edge list to merged ontologies. The build is checkpointed after steps 4 and 5, so that an
+        interrupted build can be resumed (see loads_checkpoint), and each step is measured (see writes_build_report).
 
         Returns:
             None.
@@ -375,61 +937,56 @@ class PartialBuild(KGBuilder):
 
         # STEP 1: PROCESS RELATION AND INVERSE RELATION DATA
         log_str = '*** Loading Relations Data ***'; print(log_str); logger.info(log_str)
-        self.reverse_relation_processor()
-
-        # STEP 2: MERGE ONTOLOGIES
-        if self.merged_ont_kg in glob.glob(self.write_location + '/*.owl'):
-            log_str = '*** Loading Merged Ontologies ***'; print(log_str); logger.info(log_str)
-            self.graph = Graph().parse(self.merged_ont_kg, format='xml')
-        else:
-            log_str = '*** Merging Ontology Data ***'; print(log_str); logger.info(log_str)
-            merges_ontologies(self.ontologies, self.merged_ont_kg.split('/')[-1], self.owl_tools)
-            self.graph.parse(self.merged_ont_kg, format='xml')
-        stats = 'Merged Ontologies {}'.format(derives_graph_statistics(self.graph)); print(stats); logger.info(stats)
-
-        # STEP 3: PROCESS NODE METADATA
-        log_str = '*** Loading Node Metadata Data ***'; print(log_str); logger.info(log_str)
+        with tracks_build_stage(self.build_report, 'relations') as counts:
+            self.reverse_relation_processor(); counts['relations'] = len(self.relations_dict)
+        checkpoint = self.loads_checkpoint(['graph_split', 'edges_built'])
+        stage, state = checkpoint.get('stage'), checkpoint.get('state', dict())
         meta = Metadata(self.kg_version, self.write_location, self.full_kg, self.node_data, self.node_dict)
-        if self.node_data: meta.metadata_processor(); meta.extract_metadata(self.graph)
-
-        # STEP 4: CREATE GRAPH SUBSETS
-        log_str = '*** Splitting Graph ***'; print(log_str); logger.info(log_str)
-        f = self.write_location; self.graph, annotation_triples = splits_knowledge_graph(self.graph)
-        s = 'Merged Ontologies - Logic Subset {}'.format(derives_graph_statistics(self.graph)); print(s); logger.info(s)
-        kg_owl = '_'.join(self.full_kg.split('_')[0:-1]) + '_OWL.owl'
+        f, kg_owl = self.write_location, '_'.join(self.full_kg.split('_')[0:-1]) + '_OWL.owl'
         annot, logic, full = kg_owl[:-4] + '_AnnotationsOnly.nt', kg_owl[:-4] + '_LogicOnly.nt', kg_owl[:-4] + '.nt'
-        appends_to_existing_file(annotation_triples, f + annot); appends_to_existing_file(self.graph, f + logic)
-        del annotation_triples
-
-        # STEP 5: ADD EDGE DATA TO KNOWLEDGE GRAPH DATA
-        log_str = '*** Building Knowledge Graph Edges ***'; print(log_str); logger.info(log_str)
-        self.ont_classes = gets_ontology_classes(self.graph); self.obj_properties = gets_object_properties(self.graph)
-        # instantiate inner class to construct edge sets
-        try: ray.init()
-        except RuntimeError: pass
-        args = {'construction': self.construct_approach, 'edge_dict': self.edge_dict, 'write_loc': self.write_location,
-                'rel_dict': self.relations_dict, 'inverse_dict': self.inverse_relations_dict, 'kg_owl': kg_owl,
-                'node_data': self.node_data, 'ont_cls': self.ont_classes, 'metadata': meta.creates_node_metadata,
-                'obj_props': self.obj_properties}
-        edges = sublist_creator({k: len(v['edge_list']) for k, v in self.edge_dict.items()}, self.cpus)
-        actors = [ray.remote(self.EdgeConstructor).remote(args) for _ in range(self.cpus)]  # type: ignore
-        for i in range(0, len(edges)): [actors[i].creates_new_edges.remote(j) for j in edges[i]]  # type: ignore
-        # extract results, aggregate actor dictionaries into single dictionary, and write data to json file
-        _ = ray.wait([x.graph_getter.remote() for x in actors], num_returns=len(actors))  # type: ignore
-        graph_res = ray.get([x.graph_getter.remote() for x in actors])  # type: ignore
-        graphs = [self.graph] + [x[0] for x in graph_res]  # ; clean_graphs = [x[1] for x in graph_res]
-        error_dicts = dict(ChainMap(*ray.get([x.error_dict_getter.remote() for x in actors])))  # type: ignore
-        del actors
-        if len(error_dicts.keys()) > 0:  # output error logs
-            log_file = glob.glob(self.res_dir + '/construction*')[0] + '/subclass_map_log.json'
-            logger.info('See log: {}'.format(log_file)); outputs_dictionary_data(error_dicts, log_file)
-        results = set(x for y in [set(x) for x in graphs] for x in y)
-        stats = 'Full Logic {}'.format(derives_graph_statistics(results)); print(stats); logger.info(stats)
+        if stage is not None and self.node_data: meta.metadata_processor()  # extracted metadata was saved to node_data
+
+        if stage is None:
+            # STEPS 2-4: MERGE ONTOLOGIES, PROCESS NODE METADATA, AND CREATE GRAPH SUBSETS
+            self.prepares_ontology_graph(meta, f + annot, f + logic)
+            if self.checkpoint:
+                self.checkpoints_stage('graph_split', {'graphs': encodes_triples([self.graph])}, [f + annot, f + logic])
+        elif stage == 'graph_split': self.graph = merges_encoded_triples([state['graphs']], [Graph()])[0]
+
+        if stage in [None, 'graph_split']:
+            # STEP 5: ADD EDGE DATA TO KNOWLEDGE GRAPH DATA
+            log_str = '*** Building Knowledge Graph Edges ***'; print(log_str); logger.info(log_str)
+            with tracks_build_stage(self.build_report, 'edge_construction') as counts:
+                self.ont_classes = gets_ontology_classes(self.graph)
+                self.obj_properties = gets_object_properties(self.graph)
+                KGConstructionApproach.indexes_subclass_map(self.res_dir)  # written once before the actors start
+                executor = gets_executor(); executor.starts()
+                args = {'construction': self.construct_approach, 'write_loc': self.write_location, 'kg_owl': kg_owl,
+                        'rel_dict': self.relations_dict, 'inverse_dict': self.inverse_relations_dict,
+                        'node_data': self.node_data, 'ont_cls': self.ont_classes,
+                        'metadata': meta.creates_node_metadata, 'obj_props': self.obj_properties}
+                actors = self.runs_edge_constructors(args, meta)
+                # extract results, aggregate actor dictionaries into single dictionary, and write data to json file
+                encoded = (executor.gets(x.encoded_graph_getter.remote(False)) for x in actors)
+                results = merges_encoded_triples(encoded, [set(self.graph)])[0]  # merged one actor at a time
+                counts['triples'] = len(results) - len(self.graph)
+                errors = executor.gets([x.error_dict_getter.remote() for x in actors])
+                error_dicts = KGConstructionApproach.merges_subclass_errors(errors)
+                counters = sum(executor.gets([x.counters_getter.remote() for x in actors]), Counter())
+                logger.info('Edge Constructor Counters: {}'.format(dict(counters))); del actors
+                log_file = glob.glob(self.res_dir + '/construction*')[0] + '/' + self.subclass_log
+                if len(error_dicts.keys()) > 0:  # output error logs
+                    logger.info('See log: {}'.format(log_file))
+                    outputs_dictionary_data(KGConstructionApproach.summarizes_subclass_errors(error_dicts), log_file)
+            stats = 'Full Logic {}'.format(derives_graph_statistics(results)); print(stats); logger.info(stats)
+            if self.checkpoint: self.checkpoints_stage('edges_built', dict(), [f + annot, f + logic, log_file])
 
         # deduplicate logic and annotation files, merge them, and print final stats
-        deduplicates_file(f + annot); deduplicates_file(f + logic); merges_files(f + annot, f + logic, f + full)
-        graph = Graph().parse(f + full, format='nt')
+        with tracks_build_stage(self.build_report, 'merge_outputs') as counts:
+            deduplicates_file(f + annot); deduplicates_file(f + logic); merges_files(f + annot, f + logic, f + full)
+            graph = Graph().parse(f + full, format='nt'); counts['triples'] = len(graph)
         s = 'Full (Logic + Annotation) {}'.format(derives_graph_statistics(graph)); print('\n' + s); logger.info(s)
+        self.writes_build_report()
 
         return None
 
@@ -449,6 +1006,7 @@ class PostClosureBuild(KGBuilder):
         The post-closure build utilizes the following steps: (1) Process relation and inverse relation data; (2)
         Load closed knowledge graph; (3) Process node metadata; (4) Create graph subsets; (5) Decode OWL-encoded
         classes; (6) Output knowledge graph files and create edge lists; and (7) Extract and write node metadata.
+        Each step is measured and written to a build report (see writes_build_report).
 
         Returns:
             None.
@@ -463,7 +1021,8 @@ class PostClosureBuild(KGBuilder):
 
         # STEP 1: PROCESS RELATION AND INVERSE RELATION DATA
         log_str = '*** Loading Relations Data ***'; print(log_str); logger.info(log_str)
-        self.reverse_relation_processor()
+        with tracks_build_stage(self.build_report, 'relations') as counts:
+            self.reverse_relation_processor(); counts['relations'] = len(self.relations_dict)
 
         # STEP 2: LOAD CLOSED KNOWLEDGE GRAPH
         closed_kg = glob.glob(self.write_location + '/*.owl')
@@ -472,34 +1031,45 @@ class PostClosureBuild(KGBuilder):
             logs = '{} is empty'.format(closed_kg); logger.error('TypeError: ' + logs); raise TypeError(logs)
         else:
             log_str = '*** Loading Closed Knowledge Graph ***'; print(log_str); logger.info(log_str)
-            os.rename(closed_kg[0], self.write_location + self.full_kg)  # rename closed kg file
-            self.graph = Graph().parse(self.write_location + self.full_kg, format='xml')
+            with tracks_build_stage(self.build_report, 'load_closed_graph') as counts:
+                os.rename(closed_kg[0], self.write_location + self.full_kg)  # rename closed kg file
+                self.graph = Graph().parse(self.write_location + self.full_kg, format='xml')
+                counts['triples'] = len(self.graph)
         stats = 'Input {}'.format(derives_graph_statistics(self.graph)); print(stats); logger.info(stats)
 
         # STEP 3: PROCESS NODE METADATA
         log_str = '*** Loading Node Metadata Data ***'; print(log_str); logger.info(log_str)
         meta = Metadata(self.kg_version, self.write_location, self.full_kg, self.node_data, self.node_dict)
-        if self.node_data: meta.metadata_processor(); meta.extract_metadata(self.graph)
+        with tracks_build_stage(self.build_report, 'node_metadata') as counts:
+            if self.node_data: meta.metadata_processor(); meta.extract_metadata(self.graph)
+            counts['nodes'] = len(meta.node_dict['nodes']) if meta.node_dict else 0
 
         # STEP 4: CREATE GRAPH SUBSETS
         log_str = '*** Splitting Graph ***'; print(log_str); logger.info(log_str)
-        _ = self.write_location; self.graph, annotation_triples = splits_knowledge_graph(self.graph)
-        stats = 'Merged Logic Subset {}'.format(derives_graph_statistics(self.graph)); print(stats); logger.info(stats)
+        _ = self.write_location
         kg_owl = '_'.join(self.full_kg.split('_')[0:-1]) + '_OWL.owl'; kg_owl_main = kg_owl[:-8] + '.owl'
         annot, logic, full = kg_owl[:-4] + '_AnnotationsOnly.nt', kg_owl[:-4] + '_LogicOnly.nt', kg_owl[:-4] + '.nt'
-        appends_to_existing_file(annotation_triples, _ + annot); appends_to_existing_file(self.graph, _ + logic)
-        del annotation_triples
+        with tracks_build_stage(self.build_report, 'split_graph') as counts:
+            self.graph, annotation_triples = splits_knowledge_graph(self.graph)
+            appends_to_existing_file(annotation_triples, _ + annot); appends_to_existing_file(self.graph, _ + logic)
+            counts['triples'] = len(self.graph) + len(annotation_triples); del annotation_triples
+        stats = 'Merged Logic Subset {}'.format(derives_graph_statistics(self.graph)); print(stats); logger.info(stats)
 
         # STEP 5: DECODE OWL SEMANTICS
         results = [set(self.graph), None, None]
         stats = 'Full Logic {}'.format(derives_graph_statistics(results[0])); print(stats); logger.info(stats)
         logger.info('*** Converting Knowledge Graph to Networkx MultiDiGraph ***')
-        s = convert_to_networkx(self.write_location, kg_owl[:-4], results[0], True)
+        with tracks_build_stage(self.build_report, 'networkx_graph') as counts:
+            s = convert_to_networkx(self.write_location, kg_owl[:-4], results[0], True)
+            counts['triples'] = len(results[0])
         if s is not None: log_stats = 'Full Logic Subset (OWL) {}'.format(s); logger.info(log_stats); print(log_stats)
         if self.decode_owl:
-            self.graph = updates_pkt_namespace_identifiers(self.graph, self.construct_approach)
-            owlnets = OwlNets(self.graph, self.write_location, kg_owl_main, self.construct_approach, self.owl_tools)
-            results = [results[0]] + list(owlnets.runs_owlnets(self.cpus))
+            with tracks_build_stage(self.build_report, 'decode_owl') as counts:
+                self.graph = updates_pkt_namespace_identifiers(self.graph, self.construct_approach)
+                owlnets = OwlNets(self.graph, self.write_location, kg_owl_main, self.construct_approach, self.owl_tools)
+                results = [results[0]] + list(owlnets.runs_owlnets(self.cpus, self.memory_budget))
+                self.build_report += owlnets.build_report; self.memory_plans += owlnets.memory_plans
+                counts['triples'] = sum(len(x) for x in results if x is not None)
 
         # STEP 7: WRITE OUT KNOWLEDGE GRAPH METADATA AND CREATE EDGE LISTS
         log_str = '*** Writing Knowledge Graph Edge Lists ***'; print('\n' + log_str); logger.info(log_str)
@@ -508,16 +1078,22 @@ class PostClosureBuild(KGBuilder):
             graph = results[x]; p_str = 'OWL' if x == 0 else 'OWL-NETS' if x == 1 else 'Purified OWL-NETS'
             if graph is not None:
                 log_str = '*** Processing {} Graph ***'.format(p_str); print(log_str); logger.info(log_str)
-                triple_list_file = kg_owl[:-8] + f_prefix[x] + '_Triples_Integers.txt'
-                triple_map = triple_list_file[:-5] + '_Identifier_Map.json'
-                node_int_map = maps_ids_to_integers(graph, self.write_location, triple_list_file, triple_map)
+                with tracks_build_stage(self.build_report, 'edge_lists' + f_prefix[x]) as counts:
+                    triple_list_file = kg_owl[:-8] + f_prefix[x] + '_Triples_Integers.txt'
+                    triple_map = triple_list_file[:-5] + '_Identifier_Map.json'
+                    node_int_map = maps_ids_to_integers(graph, self.write_location, triple_list_file, triple_map)
+                    counts['triples'] = len(graph)
 
                 # STEP 8: EXTRACT AND WRITE NODE METADATA
-                meta.full_kg = kg_owl[:-8] + f_prefix[x] + '.owl'
-                if self.node_data: meta.output_metadata(node_int_map, graph)
+                with tracks_build_stage(self.build_report, 'node_metadata' + f_prefix[x]) as counts:
+                    meta.full_kg = kg_owl[:-8] + f_prefix[x] + '.owl'
+                    if self.node_data: meta.output_metadata(node_int_map, graph)
+                    counts['nodes'] = len(node_int_map)
 
         # deduplicate logic and annotation files and then merge them
-        deduplicates_file(_ + annot); deduplicates_file(_ + logic); merges_files(_ + annot, _ + logic, _ + full)
+        with tracks_build_stage(self.build_report, 'merge_outputs'):
+            deduplicates_file(_ + annot); deduplicates_file(_ + logic); merges_files(_ + annot, _ + logic, _ + full)
+        self.writes_build_report()
 
         return None
 
@@ -534,7 +1110,8 @@ class FullBuild(KGBuilder):
         does not include running a reasoner. The full build includes the following steps: (1) Process relation/inverse
         relations; (2) Merge ontologies; (3) Process node metadata; (4) Create graph subsets; (5) Add master edge
         list to merged ontologies; (6) Decode OWL-encoded classes; (7) Output knowledge graphs and create edge lists
-        and (8) Extract and write node metadata.
+        and (8) Extract and write node metadata. The build is checkpointed after steps 4, 5, 6, and 8, so that an
+        interrupted build can be resumed (see loads_checkpoint), and each step is measured (see writes_build_report).
 
         Returns:
             None.
@@ -545,83 +1122,237 @@ class FullBuild(KGBuilder):
 
         # STEP 1: PROCESS RELATION AND INVERSE RELATION DATA
         log_str = '*** Loading Relations Data ***'; print(log_str); logger.info(log_str)
-        self.reverse_relation_processor()
+        with tracks_build_stage(self.build_report, 'relations') as counts:
+            self.reverse_relation_processor(); counts['relations'] = len(self.relations_dict)
+        checkpoint = self.loads_checkpoint(['graph_split', 'edges_built', 'owlnets_decoded', 'outputs_written'])
+        stage, state = checkpoint.get('stage'), checkpoint.get('state', dict())
+        meta = Metadata(self.kg_version, self.write_location, self.full_kg, self.node_data, self.node_dict)
+        f, kg_owl = self.write_location, '_'.join(self.full_kg.split('_')[0:-1]) + '_OWL.owl'
+        kg_owl_main = kg_owl[:-8] + '.owl'
+        annot, logic, full = kg_owl[:-4] + '_AnnotationsOnly.nt', kg_owl[:-4] + '_LogicOnly.nt', kg_owl[:-4] + '.nt'
+        if stage is not None and self.node_data: meta.metadata_processor()  # extracted metadata was saved to node_data
+
+        if stage is None:
+            # STEPS 2-4: MERGE ONTOLOGIES, PROCESS NODE METADATA, AND CREATE GRAPH SUBSETS
+            self.prepares_ontology_graph(meta, f + annot, f + logic)
+            if self.checkpoint:
+                self.checkpoints_stage('graph_split', {'graphs': encodes_triples([self.graph])}, [f + annot, f + logic])
+        elif stage == 'graph_split': self.graph = merges_encoded_triples([state['graphs']], [Graph()])[0]
+
+        if stage in [None, 'graph_split']:
+            # STEP 5: ADD EDGE DATA TO KNOWLEDGE GRAPH DATA
+            log_str = '*** Building Knowledge Graph Edges ***'; print('\n' + log_str); logger.info(log_str)
+            with tracks_build_stage(self.build_report, 'edge_construction') as counts:
+                self.ont_classes = gets_ontology_classes(self.graph)
+                self.obj_properties = gets_object_properties(self.graph)
+                KGConstructionApproach.indexes_subclass_map(self.res_dir)  # written once before the actors start
+                executor = gets_executor(); executor.starts()
+                args = {'construction': self.construct_approach, 'node_data': self.node_data,
+                        'rel_dict': self.relations_dict, 'inverse_dict': self.inverse_relations_dict, 'kg_owl': kg_owl,
+                        'ont_cls': self.ont_classes, 'obj_props': self.obj_properties,
+                        'metadata': meta.creates_node_metadata, 'write_loc': self.write_location}
+                actors = self.runs_edge_constructors(args, meta)
+                encoded = (executor.gets(x.encoded_graph_getter.remote()) for x in actors)
+                g1, g2 = merges_encoded_triples(encoded, [set(self.graph), Graph()])  # merged one actor at a time
+                counts['triples'] = len(g1) - len(self.graph)
+                errors = executor.gets([x.error_dict_getter.remote() for x in actors])
+                error_dicts = KGConstructionApproach.merges_subclass_errors(errors)
+                counters = sum(executor.gets([x.counters_getter.remote() for x in actors]), Counter())
+                logger.info('Edge Constructor Counters: {}'.format(dict(counters))); del actors
+                log_file = glob.glob(self.res_dir + '/construction*')[0] + '/' + self.subclass_log
+                if len(error_dicts.keys()) > 0:  # output error logs
+                    logger.info('See log: {}'.format(log_file))
+                    outputs_dictionary_data(KGConstructionApproach.summarizes_subclass_errors(error_dicts), log_file)
+            if self.checkpoint:
+                self.checkpoints_stage('edges_built', {'graphs': encodes_triples([self.graph, g1, g2])},
+                                       [f + annot, f + logic, log_file])
+        elif stage == 'edges_built':
+            self.graph, g1, g2 = merges_encoded_triples([state['graphs']], [Graph(), set(), Graph()])
+
+        if stage in [None, 'graph_split', 'edges_built']:
+            # STEP 6: DECODE OWL SEMANTICS
+            results = [g1, None, None]
+            stats = 'Full Logic {}'.format(derives_graph_statistics(results[0])); print(stats); logger.info(stats)
+            with tracks_build_stage(self.build_report, 'networkx_graph') as counts:
+                s1 = convert_to_networkx(self.write_location, kg_owl[:-4], results[0], True)
+                counts['triples'] = len(results[0])
+            if s1 is not None: log_str = 'Full Logic Subset (OWL) {}'.format(s1); logger.info(log_str); print(log_str)
+            with tracks_build_stage(self.build_report, 'decode_owl') as counts:
+                # aggregates processed owl-nets output derived when constructing non-ontology edges
+                if self.decode_owl is not None:
+                    graphs = [updates_pkt_namespace_identifiers(self.graph, self.construct_approach), g2]
+                    owlnets = OwlNets(graphs, self.write_location, kg_owl_main, self.construct_approach, self.owl_tools)
+                    results = [results[0]] + list(owlnets.runs_owlnets(self.cpus, self.memory_budget))
+                    self.build_report += owlnets.build_report; self.memory_plans += owlnets.memory_plans
+                counts['triples'] = sum(len(x) for x in results if x is not None)
+            if self.checkpoint:
+                graphs = encodes_triples([x for x in results if x is not None])
+                self.checkpoints_stage('owlnets_decoded', {'graphs': graphs,
+                                                           'decoded': [x is not None for x in results]}, [])
+        elif stage == 'owlnets_decoded':
+            graphs = iter(merges_encoded_triples([state['graphs']], [set() for x in state['decoded'] if x]))
+            results = [next(graphs) if x else None for x in state['decoded']]
+
+        if stage != 'outputs_written':
+            # STEP 7: WRITE OUT KNOWLEDGE GRAPH METADATA AND CREATE EDGE LISTS
+            log_str = '*** Writing Knowledge Graph Edge Lists ***'; print('\n' + log_str); logger.info(log_str)
+            f_prefix = ['_OWL', '_OWLNETS', '_OWLNETS_' + self.construct_approach.upper() + '_purified']
+            for x in range(0, len(results)):
+                graph = results[x]; p_str = 'OWL' if x == 0 else 'OWL-NETS' if x == 1 else 'Purified OWL-NETS'
+                if graph is not None:
+                    log_str = '*** Processing {} Graph ***'.format(p_str); print('\n' + log_str); logger.info(log_str)
+                    with tracks_build_stage(self.build_report, 'edge_lists' + f_prefix[x]) as counts:
+                        triple_list_file = kg_owl[:-8] + f_prefix[x] + '_Triples_Integers.txt'
+                        triple_map = triple_list_file[:-5] + '_Identifier_Map.json'
+                        node_int_map = maps_ids_to_integers(graph, self.write_location, triple_list_file, triple_map)
+                        counts['triples'] = len(graph)
+
+                    # STEP 8: EXTRACT AND WRITE NODE METADATA
+                    with tracks_build_stage(self.build_report, 'node_metadata' + f_prefix[x]) as counts:
+                        meta.full_kg = kg_owl[:-8] + f_prefix[x] + '.owl'
+                        if self.node_data: meta.output_metadata(node_int_map, graph)
+                        counts['nodes'] = len(node_int_map)
+            if self.checkpoint: self.checkpoints_stage('outputs_written', dict(), [])
 
-        # STEP 2: MERGE ONTOLOGIES
-        if self.merged_ont_kg in glob.glob(self.write_location + '/*.owl'):
-            log_str = '*** Loading Merged Ontologies ***'; print(log_str); logger.info(log_str)
-            self.graph = Graph().parse(self.merged_ont_kg, format='xml')
-        else:
-            log_str = '*** Merging Ontology Data ***'; print(log_str); logger.info(log_str)
-            merges_ontologies(self.ontologies, self.merged_ont_kg.split('/')[-1], self.owl_tools)
-            self.graph.parse(self.merged_ont_kg, format='xml')
-        stats = 'Merged Ontologies {}'.format(derives_graph_statistics(self.graph)); print(stats); logger.info(stats)
+        # deduplicate logic and annotation files, merge them, and print final stats
+        with tracks_build_stage(self.build_report, 'merge_outputs') as counts:
+            deduplicates_file(f + annot); deduplicates_file(f + logic); merges_files(f + annot, f + logic, f + full)
+            str1 = '\nLoading Full (Logic + Annotation) Graph'; print('\n' + str1); logger.info(str1)
+            graph = Graph().parse(f + full, format='nt'); counts['triples'] = len(graph)
+        str2 = 'Deriving Stats'; print('\n' + str2); logger.info(str2)
+        s = 'Full (Logic + Annotation) {}'.format(derives_graph_statistics(graph)); print('\n' + s); logger.info(s)
+        self.writes_build_report()
 
-        # STEP 3: PROCESS NODE METADATA
-        log_str = '*** Loading Node Metadata Data ***'; print(log_str); logger.info(log_str)
-        meta = Metadata(self.kg_version, self.write_location, self.full_kg, self.node_data, self.node_dict)
-        if self.node_data: meta.metadata_processor(); meta.extract_metadata(self.graph)
+        return None
 
-        # STEP 4: CREATE GRAPH SUBSETS
-        log_str = '*** Splitting Graph ***'; print(log_str); logger.info(log_str)
-        f = self.write_location; self.graph, annotation_triples = splits_knowledge_graph(self.graph)
-        s = 'Merged Ontologies - Logic Subset {}'.format(derives_graph_statistics(self.graph)); print(s); logger.info(s)
-        kg_owl = '_'.join(self.full_kg.split('_')[0:-1]) + '_OWL.owl'; kg_owl_main = kg_owl[:-8] + '.owl'
-        annot, logic, full = kg_owl[:-4] + '_AnnotationsOnly.nt', kg_owl[:-4] + '_LogicOnly.nt', kg_owl[:-4] + '.nt'
-        appends_to_existing_file(annotation_triples, f + annot); appends_to_existing_file(self.graph, f + logic)
-        del annotation_triples
-
-        # STEP 5: ADD EDGE DATA TO KNOWLEDGE GRAPH DATA
-        log_str = '*** Building Knowledge Graph Edges ***'; print('\n' + log_str); logger.info(log_str)
-        self.ont_classes = gets_ontology_classes(self.graph); self.obj_properties = gets_object_properties(self.graph)
-        try: ray.init()
-        except RuntimeError: pass
-        args = {'construction': self.construct_approach, 'edge_dict': self.edge_dict, 'node_data': self.node_data,
-                'rel_dict': self.relations_dict, 'inverse_dict': self.inverse_relations_dict, 'kg_owl': kg_owl,
-                'ont_cls': self.ont_classes, 'obj_props': self.obj_properties, 'metadata': meta.creates_node_metadata,
-                'write_loc': self.write_location}
-        edges = sublist_creator({k: len(v['edge_list']) for k, v in self.edge_dict.items()}, self.cpus)
-        actors = [ray.remote(self.EdgeConstructor).remote(args) for _ in range(self.cpus)]  # type: ignore
-        for i in range(0, len(edges)): [actors[i].creates_new_edges.remote(j) for j in edges[i]]  # type: ignore
-        _ = ray.wait([x.graph_getter.remote() for x in actors], num_returns=len(actors))  # type: ignore
-        res = ray.get([x.graph_getter.remote() for x in actors]); g1 = [x[0] for x in res]  # type: ignore
-        g2 = [x[1] for x in res]
-        error_dicts = dict(ChainMap(*ray.get([x.error_dict_getter.remote() for x in actors])))  # type: ignore
-        del actors
-        if len(error_dicts.keys()) > 0:  # output error logs
-            log_file = glob.glob(self.res_dir + '/construction*')[0] + '/subclass_map_log.json'
-            logger.info('See log: {}'.format(log_file)); outputs_dictionary_data(error_dicts, log_file)
-
-        # STEP 6: DECODE OWL SEMANTICS
-        results = [set(x for y in [set(x) for x in [self.graph] + g1] for x in y), None, None]
-        stats = 'Full Logic {}'.format(derives_graph_statistics(results[0])); print(stats); logger.info(stats)
-        s1 = convert_to_networkx(self.write_location, kg_owl[:-4], results[0], True)
-        if s1 is not None: log_stats = 'Full Logic Subset (OWL) {}'.format(s1); logger.info(log_stats); print(log_stats)
-        # aggregates processed owl-nets output derived when constructing non-ontology edges
-        if self.decode_owl is not None:
-            graphs = [updates_pkt_namespace_identifiers(self.graph, self.construct_approach)] + g2
-            owlnets = OwlNets(graphs, self.write_location, kg_owl_main, self.construct_approach, self.owl_tools)
-            results = [results[0]] + list(owlnets.runs_owlnets(self.cpus))
 
-        # STEP 7: WRITE OUT KNOWLEDGE GRAPH METADATA AND CREATE EDGE LISTS
-        log_str = '*** Writing Knowledge Graph Edge Lists ***'; print('\n' + log_str); logger.info(log_str)
-        f_prefix = ['_OWL', '_OWLNETS', '_OWLNETS_' + self.construct_approach.upper() + '_purified']
-        for x in range(0, len(results)):
-            graph = results[x]; p_str = 'OWL' if x == 0 else 'OWL-NETS' if x == 1 else 'Purified OWL-NETS'
-            if graph is not None:
-                log_str = '*** Processing {} Graph ***'.format(p_str); print('\n' + log_str); logger.info(log_str)
-                triple_list_file = kg_owl[:-8] + f_prefix[x] + '_Triples_Integers.txt'
-                triple_map = triple_list_file[:-5] + '_Identifier_Map.json'
-                node_int_map = maps_ids_to_integers(graph, self.write_location, triple_list_file, triple_map)
+class MatrixBuild(KGBuilder):
+    """Class builds several variants of a full knowledge graph from the same inputs, one variant for each combination
+    of construction approach and inverse relations. The build stages that do not depend on the variant (i.e. merging
+    the ontologies, processing the node metadata, and splitting the graph) are run once, and their output is used as
+    the "graph_split" checkpoint of every variant (see KGBuilder.checkpoints_stage). Each variant then resumes a
+    FullBuild from that checkpoint, so only the variant-specific stages are run for it.
 
-                # STEP 8: EXTRACT AND WRITE NODE METADATA
-                meta.full_kg = kg_owl[:-8] + f_prefix[x] + '.owl'
-                if self.node_data: meta.output_metadata(node_int_map, graph)
+    Attributes:
+        constructions: A list of strings indicating the construction approaches (i.e. instance and/or subclass).
+        node_data: A string ("yes" or "no") indicating whether or not to add node data to the knowledge graph.
+        inverse_relations: A list of strings ("yes" and/or "no") indicating whether or not to add inverse relations.
+        decode_owl: A string containing "yes" or "no" indicating whether owl semantics should be removed.
+        cpus: An integer indicating the number of workers each variant uses.
+        write_location: An optional string passed to specify the primary directory to write to.
+        max_parallel: An optional integer indicating the maximum number of variants to build at the same time
+            (default=None, as many variants as there are CPUs for their workers, i.e. the number of CPUs // cpus).
+        memory_budget: An optional float specifying the peak memory (in MB) of the parallel build stages, which is
+            split evenly between the variants that are built at the same time (default=None).
 
-        # deduplicate logic and annotation files, merge them, and print final stats
-        deduplicates_file(f + annot); deduplicates_file(f + logic); merges_files(f + annot, f + logic, f + full)
-        str1 = '\nLoading Full (Logic + Annotation) Graph'; print('\n' + str1); logger.info(str1)
-        graph = Graph().parse(f + full, format='nt'); str2 = 'Deriving Stats'; print('\n' + str2); logger.info(str2)
-        s = 'Full (Logic + Annotation) {}'.format(derives_graph_statistics(graph)); print('\n' + s); logger.info(s)
+    Raises:
+        ValueError: If constructions or inverse_relations are empty.
+        ValueError: If constructions does not only contain "instance" or "subclass".
+        ValueError: If inverse_relations does not only contain "yes" or "no".
+    """
+
+    def __init__(self, constructions: List[str], node_data: str, inverse_relations: List[str], decode_owl: str,
+                 cpus: int = 1, write_location: str = os.path.abspath('./resources/knowledge_graphs'),
+                 max_parallel: Optional[int] = None, memory_budget: Optional[float] = None) -> None:
+
+        if len(constructions) == 0 or len(inverse_relations) == 0:
+            log = 'constructions or inverse_relations is empty'; logger.error('ValueError: ' + log)
+            raise ValueError(log)
+        super().__init__(constructions[0], node_data, inverse_relations[0], decode_owl, cpus, write_location,
+                         memory_budget=memory_budget)
+        self.edge_dict = dict()  # edges are only constructed by the variants
+        self.max_parallel: int = max_parallel or max(1, (os.cpu_count() or 1) // max(1, cpus))
+        self.variants: List[Dict] = []
+        for const, inv in [(str(x).lower(), str(y).lower()) for x in constructions for y in inverse_relations]:
+            if const not in ['subclass', 'instance']:
+                log = 'construction not "instance" or "subclass"'; logger.error('ValueError: ' + log)
+                raise ValueError(log)
+            if inv not in ['yes', 'no']:
+                log = 'inverse_relations not "no" or "yes"'; logger.error('ValueError: ' + log); raise ValueError(log)
+            variant = {'construction': const, 'node_data': node_data, 'inverse_relations': inv,
+                       'decode_owl': decode_owl, 'cpus': cpus, 'write_location': write_location}
+            if variant not in self.variants: self.variants.append(variant)
+        parallel = min(self.max_parallel, len(self.variants))  # the budget is split between them
+        for x in self.variants: x['memory_budget'] = None if memory_budget is None else memory_budget / parallel
+
+        # KG FILE NAME (the output of the shared stages)
+        self.full_kg = '/PheKnowLator_' + self.kg_version + '_' + self.build + '_Shared.owl'
+        self.checkpoint_dir = self.write_location + '/checkpoints' + self.full_kg[:-4]
+
+    def gets_build_type(self) -> str:
+        """"A string representing the type of knowledge graph being built."""
+
+        return 'Matrix Build'
+
+    @staticmethod
+    def builds_variant(params: Dict, owl_tools: str, state: Dict, shared_files: List[str]) -> List[Dict]:
+        """Builds one variant of the knowledge graph from the output of the shared build stages. The shared annotation
+        and logic triples are copied to the variant's files and saved, together with the shared graph, as the variant's
+        "graph_split" checkpoint. The variant is then built as a FullBuild that resumes after that stage. Each variant
+        writes its own subclass map log (e.g. subclass_map_log_subclass_inverseRelations_noOWL.json).
+
+        Args:
+            params: A dictionary of the FullBuild parameters of the variant (i.e. construction, node_data,
+                inverse_relations, decode_owl, cpus, write_location, and memory_budget).
+            owl_tools: A string pointing to the location of the owl tools library.
+            state: A dictionary containing the "graph_split" checkpoint state (i.e. the encoded logic subset graph).
+            shared_files: A list of strings specifying paths to the shared annotation and logic triple files.
+
+        Returns:
+            A list of dictionaries, where each dictionary is a stage of the variant's build report.
+        """
+
+        kg = FullBuild(**params, resume=True); kg.owl_tools = owl_tools
+        kg.subclass_log = 'subclass_map_log_{}.json'.format('_'.join(kg.full_kg[:-4].split('_')[3:]))  # one per variant
+        kg_owl = kg.write_location + '_'.join(kg.full_kg.split('_')[0:-1]) + '_OWL.owl'
+        files = [kg_owl[:-4] + '_AnnotationsOnly.nt', kg_owl[:-4] + '_LogicOnly.nt']
+        if os.path.exists(kg.checkpoint_dir): shutil.rmtree(kg.checkpoint_dir)  # never resume stale variant stages
+        for src, dst in zip(shared_files, files): shutil.copyfile(src, dst)
+        kg.checkpoints_stage('graph_split', state, files); kg.construct_knowledge_graph()
+
+        return kg.build_report
+
+    def construct_knowledge_graph(self) -> None:
+        """Builds every variant of a full knowledge graph. The matrix build includes the following steps: (1) Merge
+        ontologies; (2) Process node metadata; (3) Create graph subsets; and (4) Build the variants. Steps 1-3 are run
+        once and their output is shared by all of the variants. In step 4, each variant is built in its own executor
+        task (see builds_variant and gets_executor), which runs the remaining FullBuild stages (i.e. adding the master
+        edge list, decoding OWL-encoded classes, and writing the outputs) and writes its own build report. At most
+        max_parallel variants are built at the same time.
+
+        Returns:
+            None.
+        """
+
+        log_str = '### Starting Knowledge Graph Build: MATRIX ###'; print('\n' + log_str)
+        logger.info('*' * 10 + 'PKT STEP: CONSTRUCTING KNOWLEDGE GRAPH' + '*' * 10 + '\n' + log_str)
+        meta = Metadata(self.kg_version, self.write_location, self.full_kg, self.node_data, self.node_dict)
+        f, shared = self.write_location, self.full_kg[:-4]
+        annot, logic = shared + '_AnnotationsOnly.nt', shared + '_LogicOnly.nt'
+        for x in [f + annot, f + logic]:
+            if os.path.exists(x): os.remove(x)
+
+        # STEPS 1-3: MERGE ONTOLOGIES, PROCESS NODE METADATA, AND CREATE GRAPH SUBSETS
+        self.prepares_ontology_graph(meta, f + annot, f + logic)
+
+        # STEP 4: BUILD THE KNOWLEDGE GRAPH VARIANTS
+        log_str = '*** Building {} Knowledge Graph Variants ***'.format(len(self.variants))
+        print('\n' + log_str); logger.info(log_str)
+        with tracks_build_stage(self.build_report, 'build_variants') as counts:
+            KGConstructionApproach.indexes_subclass_map(self.res_dir)  # written once before the variants start
+            executor = gets_executor(); executor.starts()
+            state = executor.puts({'graphs': encodes_triples([self.graph])}); self.graph = Graph()
+            pending: List = []; reports: List = []
+            for params in self.variants:
+                if len(pending) >= self.max_parallel:
+                    done, pending = executor.waits(pending, num_returns=1); reports += executor.gets(done)
+                args = (params, self.owl_tools, state, [f + annot, f + logic])
+                pending += [executor.submits(self.builds_variant, *args)]
+            reports += executor.gets(pending); counts['variants'] = len(reports)
+            counts['stages'] = sum(len(x) for x in reports)
+        for x in self.variants:
+            log_str = 'Built Variant: {} + inverse_relations={}'.format(x['construction'], x['inverse_relations'])
+            print(log_str); logger.info(log_str)
+        self.writes_build_report()
 
         return None
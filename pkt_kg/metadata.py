@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 # import needed libraries
+import copy
 import glob
 # import json
 import logging.config
@@ -16,7 +17,7 @@ from datetime import datetime
 from rdflib import Graph, Literal, Namespace, URIRef   # type: ignore
 from rdflib.namespace import RDF, RDFS, OWL  # type: ignore
 from tqdm import tqdm  # type: ignore
-from typing import Dict, List, Optional, Set, Union
+from typing import Dict, Iterable, List, Optional, Set, Union
 
 from pkt_kg.utils import *
 
@@ -152,6 +153,24 @@ class Metadata(object):
 
         return None
 
+    def shards_node_metadata(self, nodes: Iterable[str]) -> 'Metadata':
+        """Creates a copy of the class whose node_dict only contains the node metadata for a set of nodes (relation
+        metadata is kept). The copy is used to send each edge construction worker only the metadata it needs.
+
+        Args:
+            nodes: An iterable of node identifiers (e.g. ['http://www.ncbi.nlm.nih.gov/gene/1']).
+
+        Returns:
+            A Metadata instance, or the current instance if there is no node metadata.
+        """
+
+        if not self.node_dict or not isinstance(self.node_dict, Dict) or 'nodes' not in self.node_dict.keys():
+            return self
+        meta = copy.copy(self); node_metadata = self.node_dict['nodes']
+        meta.node_dict = {**self.node_dict, 'nodes': {x: node_metadata[x] for x in nodes if x in node_metadata}}
+
+        return meta
+
     def creates_node_metadata(self, ent: List, e_type: Optional[List] = None, key_type: str = 'nodes') -> Graph:
         """Given a node in the knowledge graph, if the node is not an ontology class and if it has metadata information,
         then new edges are created to add the metadata to the knowledge graph. Metadata that is added includes: labels,
@@ -230,6 +249,7 @@ class Metadata(object):
 
         return graph
 
+    @profiles_function
     def output_metadata(self, node_integer_map: Dict, graph: Union[Set, Graph]) -> None:
         """Loops over the self.node_dict dictionary and writes out the data to a file locally. The data is stored as
         a tab-delimited '.txt' file with four columns: (1) node identifier; (2) node label; (3) node description or
@@ -252,7 +272,9 @@ class Metadata(object):
             log_str = 'Writing Class Metadata'; print(log_str); logger.info(log_str)
 
             # make sure that the metadata dict contains valid entries
-            self._tidy_metadata(); pickle.dump(self.node_dict, open(self.node_data[0], 'wb'))
+            self._tidy_metadata(); temp_file = self.node_data[0] + '.' + str(os.getpid())  # matrix variants share it
+            with open(temp_file, 'wb') as out: pickle.dump(self.node_dict, out)
+            os.replace(temp_file, self.node_data[0])
             # write metadata in flat-file
             entities = set([i for j in tqdm(graph) for i in j]); filename = self.full_kg[:-4] + '_NodeLabels.txt'
             with open(self.write_location + filename, 'w', encoding='utf-8') as out:
@@ -4,25 +4,29 @@
 # import needed libraries
 import glob
 import logging.config
+import multiprocessing
 import networkx  # type: ignore
 import os
 import os.path
 import pickle
-import ray  # type: ignore
 # import re
 
 from collections import ChainMap  # type: ignore
-from random import sample, shuffle
+from random import shuffle
 from rdflib import BNode, Graph, Literal, Namespace, URIRef  # type: ignore
 from rdflib.namespace import RDF, RDFS, OWL  # type: ignore
-from statistics import mode, StatisticsError
 from tqdm import tqdm  # type: ignore
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from pkt_kg.utils import *
+from pkt_kg.utils.data_utils import triple_mb, worker_base_mb
 
 # add global variables
 obo = Namespace('http://purl.obolibrary.org/obo/')
+index_triple_mb = 100 / 2 ** 20  # the approximate memory of an IndexedGraph triple (i.e. its arrays and its terms)
+# node type flags (see indexes_node_types): an owl:Class or owl:NamedIndividual without a "#" in its URI, an
+# owl:ObjectProperty, and a node typed as anything other than an owl:AnnotationProperty or owl:DatatypeProperty
+class_flag, object_property_flag, property_flag = 1, 2, 4
 
 # logging
 log_dir, log, log_config = 'builds/logs', 'pkt_build_log.log', glob.glob('**/logging.ini', recursive=True)
@@ -61,7 +65,8 @@ class OwlNets(object):
     Notebook Ex: https://github.com/callahantiff/PheKnowLator/blob/master/notebooks/OWLNETS_Example_Application.ipynb
 
     Attributes:
-        graph: An RDFLib object or a list of RDFLib Graph objects.
+        graph: An RDFLib object, an IndexedGraph (i.e. the read-only graph shared with the decoding actors, see
+            runs_owlnets), or a list of RDFLib Graph objects.
         write_location: A file path used for writing knowledge graph data (e.g. "resources/".
         filename: A string containing the filename for the full knowledge graph (e.g. "/hpo_owlnets").
         kg_construct_approach: A string containing the type of construction approach used to build the knowledge graph.
@@ -80,7 +85,7 @@ class OwlNets(object):
         TypeError: If the file containing owl object properties is empty.
     """
 
-    def __init__(self, graph: Union[Graph, List, str], write_location: str, filename: str,
+    def __init__(self, graph: Union[Graph, IndexedGraph, List, str], write_location: str, filename: str,
                  kg_construct_approach: Optional[str] = None, owl_tools: str = './pkt_kg/libs/owltools',
                  top_level: Optional[List] = None, support: Optional[List] = None,
                  relations: Optional[List] = None) -> None:
@@ -95,21 +100,26 @@ class OwlNets(object):
         self.relations: List = ['RO'] if relations is None else relations  # can only appear as relations
 
         # VERIFY INPUT GRAPH
-        if not isinstance(graph, Graph) and not isinstance(graph, List) and not isinstance(graph, str):
+        if not isinstance(graph, (Graph, IndexedGraph)) and not isinstance(graph, List) and not isinstance(graph, str):
             logs = 'Graph must be RDFLib Graph or set.'; logger.error('TypeError: ' + logs); raise TypeError(logs)
-        elif (isinstance(graph, Graph) or isinstance(graph, List)) and len(graph) == 0:
+        elif (isinstance(graph, (Graph, IndexedGraph)) or isinstance(graph, List)) and len(graph) == 0:
             log_str = 'Graph Object is empty.'; logger.error('ValueError: ' + log_str); raise ValueError(log_str)
         elif isinstance(graph, str) and not os.path.exists(graph):
             logs = "Can't find graph file"; logger.error("OSError: " + logs); raise OSError(logs)
         else:
-            graph = graph if isinstance(graph, Graph) or isinstance(graph, List) else Graph().parse(graph)
+            graph = graph if not isinstance(graph, str) else Graph().parse(graph)
             self.graph_list: List = [graph] if not isinstance(graph, List) else graph
         self.graph: Graph = self.graph_list[0]
+        self.indexes_anonymous_nodes()
 
         # OWL-NETS CLEANING DICTIONARY
         self.owl_nets_dict: Dict = {'decoded_entities': {}, 'cardinality': {}, 'misc': {}, 'complementOf': {},
                                     'negation': {}, 'disjointWith': set(), 'filtered_triples': set()}
 
+        # BUILD REPORT (see tracks_build_stage and plans_stage_workers)
+        self.build_report: List[Dict] = list()
+        self.memory_plans: List[Dict] = list()
+
     def gets_owlnets_dict(self) -> Dict:
         """Returns the owl_nets_dict dictionary."""
 
@@ -138,9 +148,55 @@ class OwlNets(object):
 
         return None
 
+    def indexes_node_types(self) -> Dict:
+        """Creates an index of the rdf:type flags of every typed node in the graph (i.e. class_flag,
+        object_property_flag, and property_flag), so that the types of a node are found with a single lookup instead of
+        a search of the graph.
+
+        Returns:
+            A dictionary keyed by node with the node's type flags as the values. For example:
+                {obo.HP_0000832: 5, obo.RO_0002606: 6}
+        """
+
+        index: Dict = dict()
+        for node, _, node_type in self.graph.triples((None, RDF.type, None)):
+            is_class = (OWL.Class in node_type or OWL.NamedIndividual in node_type) and '#' not in str(node)
+            flags = class_flag if is_class else 0
+            if node_type == OWL.ObjectProperty: flags |= object_property_flag
+            if node_type != OWL.AnnotationProperty and node_type != OWL.DatatypeProperty: flags |= property_flag
+            index[node] = index.get(node, 0) | flags
+
+        return index
+
+    @staticmethod
+    def creates_prefix_table(prefixes: List[str]) -> Callable:
+        """Creates a lookup function that checks whether the local name of a node (i.e. the text after the last "/" of
+        its URI) starts with one of the prefixes followed by "_" (e.g. "BFO" and "BFO_0000001"). Instead of testing
+        each prefix, the text before each "_" of the local name is looked up in a set of the prefixes, and the result
+        of each node is cached.
+
+        Args:
+            prefixes: A list of ontology namespace prefixes (e.g. ['ISO', 'SUMO', 'BFO']).
+
+        Returns:
+            A function that takes a node and returns True if the node's local name starts with one of the prefixes.
+        """
+
+        table, cache = set(x for x in prefixes if x), dict()
+
+        def starts_with_prefix(node: Union[URIRef, str]) -> bool:
+            if node not in cache:
+                name = str(node).split('/')[-1]; idx = name.find('_')
+                while idx != -1 and name[:idx] not in table: idx = name.find('_', idx + 1)
+                cache[node] = idx != -1
+            return cache[node]
+
+        return starts_with_prefix
+
     def removes_edges_with_owl_semantics(self, verbose: bool = True) -> Graph:
         """Creates a filtered knowledge graph, such that only nodes that are owl:Class/owl:Individual connected via a
-        owl:ObjectProperty and not an owl:AnnotationProperty. For example:
+        owl:ObjectProperty and not an owl:AnnotationProperty. The types of the nodes are looked up in an index (see
+        indexes_node_types) and the ontology namespaces in a prefix table (see creates_prefix_table). For example:
             REMOVE - edges needed to support owl semantics (not biologically meaningful):
                 subject: obo:CLO_0037294; predicate: owl:AnnotationProperty; object: rdf:about=obo.CLO_0037294
 
@@ -156,35 +212,23 @@ class OwlNets(object):
 
         if verbose: log_str = 'Filtering Triples'; logger.info(log_str); print(log_str)
 
-        keep, filtered = set(), set(); exclude = self.top_level + self.relations + self.support
-        pbar = tqdm(total=len(self.graph)) if verbose else None
-        for x in self.graph:
-            if verbose: pbar.update()
-            if isinstance(x[0], URIRef) and isinstance(x[1], URIRef) and isinstance(x[2], URIRef):
-                # handle top-level, relation, and support ontologies (top/rel can only be rel; remove support onts)
-                subj = not any(i for i in exclude if str(x[0]).split('/')[-1].startswith(i + '_'))
-                obj = not any(i for i in exclude if str(x[2]).split('/')[-1].startswith(i + '_'))
-                rel = not any(i for i in self.support if str(x[1]).split('/')[-1].startswith(i + '_'))
-                if subj and obj and rel:
-                    s = [i for i in list(self.graph.triples((x[0], RDF.type, None)))
-                         if (OWL.Class in i[2] or OWL.NamedIndividual in i[2]) and '#' not in str(x[0])]
-                    o = [i for i in list(self.graph.triples((x[2], RDF.type, None)))
-                         if (OWL.Class in i[2] or OWL.NamedIndividual in i[2]) and '#' not in str(x[2])]
-                    p = [i for i in list(self.graph.triples((x[1], RDF.type, None)))
-                         if i[2] != OWL.AnnotationProperty and i[2] != OWL.DatatypeProperty]
-                    if len(s) > 0 and len(o) > 0 and len(p) > 0:
-                        if OWL.ObjectProperty in [x[2] for x in p]: keep.add(x)
-                        else: filtered |= {x}
-                    elif len(s) > 0 and len(o) > 0 and len(p) == 0:
-                        if RDFS.subClassOf in x[1]: keep.add(x)
-                        elif RDF.type in x[1]: keep.add(x)
-                        else: filtered |= {x}
-                    elif x[1] == RDFS.subClassOf and (str(OWL) not in str(x[2]) and 'ObsoleteClass' not in str(x[2])):
-                        keep.add(x)
-                    else: filtered |= {x}
-                else: filtered |= {x}
-            else: filtered |= {x}
-        if verbose: pbar.close()
+        keep, filtered, types = set(), set(), self.indexes_node_types()
+        excluded = self.creates_prefix_table(self.top_level + self.relations + self.support)
+        support = self.creates_prefix_table(self.support)
+        for x in (tqdm(self.graph, total=len(self.graph)) if verbose else self.graph):
+            # handle top-level, relation, and support ontologies (top/rel can only be rel; remove support onts)
+            if not (isinstance(x[0], URIRef) and isinstance(x[1], URIRef) and isinstance(x[2], URIRef)) \
+                    or excluded(x[0]) or excluded(x[2]) or support(x[1]): filtered.add(x); continue
+            s, o, p = types.get(x[0], 0), types.get(x[2], 0), types.get(x[1], 0)
+            if s & class_flag and o & class_flag and p & property_flag:
+                if p & object_property_flag: keep.add(x)
+                else: filtered.add(x)
+            elif s & class_flag and o & class_flag:
+                if RDFS.subClassOf in x[1] or RDF.type in x[1]: keep.add(x)
+                else: filtered.add(x)
+            elif x[1] == RDFS.subClassOf and (str(OWL) not in str(x[2]) and 'ObsoleteClass' not in str(x[2])):
+                keep.add(x)
+            else: filtered.add(x)
         filtered_graph = adds_edges_to_graph(Graph(), list(keep), False)
 
         self.owl_nets_dict['filtered_triples'] |= filtered
@@ -205,20 +249,16 @@ class OwlNets(object):
 
         if verbose: log_str = 'Filtering Triples'; logger.info(log_str); print(log_str)
 
-        keep_predicates, filtered_triples = set(), set(); exclude = self.top_level + self.relations + self.support
+        keep_predicates, filtered_triples = set(), set()
+        excluded = self.creates_prefix_table(self.top_level + self.relations + self.support)
+        support = self.creates_prefix_table(self.support)
         for x in self.graph:
-            if isinstance(x[0], URIRef) and isinstance(x[1], URIRef) and isinstance(x[2], URIRef):
-                # handle top-level, relation, and support ontologies (top/rel can only be rel; remove support onts)
-                subj = not any(i for i in exclude if str(x[0]).split('/')[-1].startswith(i + '_'))
-                obj = not any(i for i in exclude if str(x[2]).split('/')[-1].startswith(i + '_'))
-                rel = not any(i for i in self.support if str(x[1]).split('/')[-1].startswith(i + '_'))
-                if subj and obj and rel:
-                    if str(OWL) not in str(x[0]) and str(OWL) not in str(x[2]):
-                        if ('XMLSchema' not in str(x[0])) and ('XMLSchema' not in str(x[2])):
-                            keep_predicates.add(x)
-                    else: filtered_triples |= {x}
-                else: filtered_triples |= {x}
-            else: filtered_triples |= {x}
+            # handle top-level, relation, and support ontologies (top/rel can only be rel; remove support onts)
+            if not (isinstance(x[0], URIRef) and isinstance(x[1], URIRef) and isinstance(x[2], URIRef)) \
+                    or excluded(x[0]) or excluded(x[2]) or support(x[1]): filtered_triples.add(x)
+            elif str(OWL) not in str(x[0]) and str(OWL) not in str(x[2]):
+                if ('XMLSchema' not in str(x[0])) and ('XMLSchema' not in str(x[2])): keep_predicates.add(x)
+            else: filtered_triples.add(x)
 
         filtered_graph = adds_edges_to_graph(Graph(), list(keep_predicates), False)  # create a new graph from filtered
         self.owl_nets_dict['filtered_triples'] |= filtered_triples
@@ -248,6 +288,64 @@ class OwlNets(object):
         if len(tracked) > 0: visited += list(set(tracked)); return self.recurses_axioms(visited, search_axioms)
         else: return visited
 
+    def indexes_anonymous_nodes(self) -> None:
+        """Creates an empty index of the anonymous nodes (i.e. BNodes) of the graph, which is filled as the BNodes are
+        used (see gets_anonymous_subgraph). The index belongs to the current graph object and is reset when the graph
+        is replaced.
+
+        Returns:
+            None.
+        """
+
+        self.anonymous_index: Dict = {'graph': self.graph, 'triples': dict(), 'closures': dict()}
+
+        return None
+
+    def gets_anonymous_subgraph(self, nodes: Iterable) -> Set:
+        """Returns the out-edge triples of every BNode that can be reached from the input BNodes by following BNode
+        objects (i.e. the anonymous subgraph of a class or an axiom). The out-edge triples of each BNode are read from
+        the graph once, and the BNodes that can be reached from each BNode are memoized. The BNodes are completed in
+        reverse topological order (i.e. after all of the BNodes they point to), so the anonymous structures shared by
+        several classes (e.g. owl:unionOf lists and nested restrictions) are only traversed once. BNodes on a cycle are
+        not memoized and are traversed each time.
+
+        Args:
+            nodes: An iterable of RDFLib BNode objects.
+
+        Returns:
+            A set of tuples, where each tuple contains a triple that is comprised of three RDFLib objects of type
+                URIRef, BNode, and/or Literal.
+        """
+
+        if self.anonymous_index['graph'] is not self.graph: self.indexes_anonymous_nodes()
+        triples, closures = self.anonymous_index['triples'], self.anonymous_index['closures']
+
+        def children(x: BNode) -> List:
+            if x not in triples: triples[x] = tuple(self.graph.triples((x, None, None)))
+            return [i[2] for i in triples[x] if isinstance(i[2], BNode)]
+
+        reached: Set = set()
+        for node in nodes:
+            stack: List = [(node, False)]; active: Set = set()
+            while stack:
+                x, expanded = stack.pop()
+                if x in closures: continue
+                elif not expanded:
+                    active.add(x); stack.append((x, True))
+                    stack += [(y, False) for y in children(x) if y not in closures and y not in active]
+                else:
+                    active.discard(x); nested = [closures.get(y) for y in children(x)]
+                    if None not in nested: closures[x] = frozenset([x]).union(*nested)
+            if node in closures: reached |= closures[node]
+            else:  # the node is on or leads to a cycle
+                visited, queue = {node}, [node]
+                while queue:
+                    for y in children(queue.pop()):
+                        if y not in visited: visited.add(y); queue.append(y)
+                reached |= visited
+
+        return set(x for y in reached for x in triples[y])
+
     def finds_uri(self, n1: Union[BNode, URIRef], n2: Optional[URIRef], node_list: Optional[list] = None) -> URIRef:
         """Method searches for the RDFLib URIRef object that represents a BNode that is either an OWL.annotatedSource or
         OWL.annotatedTarget within an OWL.Axiom.
@@ -288,16 +386,13 @@ class OwlNets(object):
             org_src, src = src, src if isinstance(src, URIRef) else self.finds_uri(src, tgt)
             org_tgt, tgt = tgt, tgt if isinstance(tgt, URIRef) else self.finds_uri(tgt, src)
             bnodes = [org_src] if isinstance(org_src, BNode) and not isinstance(org_tgt, BNode) else [org_tgt]
-        master, matches = set(), set()
-        while len(bnodes) > 0:
-            x = bnodes.pop(0); master |= {x}; matches |= set(self.graph.triples((x, None, None)))
-            node_list = set([x for y in [i[0::2] for i in matches] for x in y])
-            bnodes += [x for x in node_list if isinstance(x, BNode) and x not in master]
+        matches = self.gets_anonymous_subgraph(bnodes)
 
         return src, matches
 
     def reconciles_classes(self, node: URIRef) -> Set:
-        """Method searches for all triples which are out edges from all BNodes that can be reached from the input node.
+        """Method searches for all triples which are out edges from all BNodes that can be reached from the input node
+        (see gets_anonymous_subgraph).
 
         Args:
             node: An RDFLib URIRef object.
@@ -307,15 +402,8 @@ class OwlNets(object):
                 type URIRef, BNode, and/or Literal.
         """
 
-        matches: Set = set()
         out_edges = set(x for y in self.graph.triples((node, None, None)) for x in y if isinstance(x, BNode))
-        node_list = list(out_edges)
-        while len(node_list) != 0:
-            entity = node_list.pop(0)
-            for element in self.recurses_axioms([], list(self.graph.triples((entity, None, None)))):
-                matches |= set(self.graph.triples((element, None, None)))
-            hits = set(x for y in matches for x in y if isinstance(x, BNode) if x not in out_edges)
-            node_list = list(set(node_list) | hits); out_edges |= set(node_list)
+        matches = self.gets_anonymous_subgraph(out_edges)
 
         return matches
 
@@ -595,6 +683,7 @@ class OwlNets(object):
                 return cleaned, results[1]
             else: return cleaned, axioms
 
+    @profiles_function
     def cleans_owl_encoded_entities(self, node_list: List, verbose: bool = True) -> None:
         """Loops over a all owl:Class and owl: Axiom objects and decodes the OWL semantics returning the corresponding
         triples for each type without OWL semantics.
@@ -610,6 +699,7 @@ class OwlNets(object):
         if verbose: s = 'Decoding {} OWL Classes and Axioms'.format(len(node_list)); logger.info(s); print(s)
 
         decoded_graph: Graph = Graph(); cleaned_entities: Set = set()  # ; pbar = tqdm(total=len(node_list))
+        self.indexes_anonymous_nodes()
         while node_list:
             # pbar.update(1)
             node = node_list.pop(0); node_info = self.creates_edge_dictionary(node)
@@ -642,6 +732,7 @@ class OwlNets(object):
                     decoded_graph = adds_edges_to_graph(decoded_graph, list(cleaned_classes), False)
                     self.owl_nets_dict['decoded_entities'][n3(node)] = cleaned_classes
         self.graph = decoded_graph; self.graph = self.cleans_decoded_graph(verbose)  # ; pbar.close()
+        self.indexes_anonymous_nodes()
 
         return None
 
@@ -651,6 +742,12 @@ class OwlNets(object):
         not the best solution long-term is the cleanest way to ensure the graph remains connected and to introduce the
         least amount of extra edges (i.e. avoids having to make every node rdfs:subClassOf BFO_0000001).
 
+        The class hierarchy (i.e. the rdfs:subClassOf edges between URIRefs) is split into connected components (see
+        connected_components) and only the components that do not contain common_ancestor are connected to it, through
+        their root nodes (i.e. the nodes without a superclass, or the first node by URI when the component is a cycle).
+        Nodes outside of the hierarchy are connected through their neighbors, unless none of their out-edge neighbors
+        are in the hierarchy, in which case the node is connected to common_ancestor itself.
+
         Args:
             graph: An RDFLib Graph object.
             common_ancestor: A URIRef or str containing a URI that represents the node that should be used as the
@@ -667,18 +764,17 @@ class OwlNets(object):
             log_str = 'Obtaining node list'; print(log_str); logger.info(log_str)
             anc_node, roots = common_ancestor if isinstance(common_ancestor, URIRef) else URIRef(common_ancestor), set()
             nodes = set([x for x in tqdm(list(graph.subjects()) + list(graph.objects())) if isinstance(x, URIRef)])
+            hierarchy = set(x for x in graph.triples((None, RDFS.subClassOf, None))
+                            if isinstance(x[0], URIRef) and isinstance(x[2], URIRef))
+            subclasses = set(x[0] for x in hierarchy); classes = subclasses | set(x[2] for x in hierarchy)
 
             print('Identifying root nodes')
-            for x in tqdm(nodes):
-                ancs = gets_entity_ancestors(graph, [x], RDFS.subClassOf)
-                if len(ancs) == 0:
-                    nbhd = set(graph.objects(x))
-                    ancs = [x for y in [gets_entity_ancestors(graph, [i], RDFS.subClassOf) for i in nbhd] for x in y]
-                    if len(ancs) == 0: ancs = [x]
-                    else:
-                        try: ancs = [mode(ancs)]
-                        except StatisticsError: ancs = sample(ancs, 1) if not any(x for x in ancs if x in roots) else []
-                roots |= {ancs[0]} if len(ancs) > 0 else {x}
+            for component in connected_components(hierarchy):
+                if anc_node not in component:
+                    component_roots = set(x for x in component if x not in subclasses)
+                    roots |= component_roots if len(component_roots) > 0 else {min(component, key=str)}
+            for x in tqdm(nodes - classes):
+                if not any(i in classes for i in graph.objects(x)): roots |= {x}
 
             log_str = 'Updating graph connectivity'; print(log_str); logger.info(log_str)
             rel = RDF.type if self.kg_construct_approach == 'instance' else RDFS.subClassOf
@@ -696,8 +792,17 @@ class OwlNets(object):
         instance, all triples where the subject and object are connected by RDFS.subClassOf are updated to RDF.type and
         the subjects of these triples are made RDF.type all ancestors of the objects. Examples are provided below.
 
+        The triples are grouped by their object, so the ancestors of each object are only found once (see
+        gets_entity_ancestors), and the purified triples are written to a new graph in bulk. The ancestors are found
+        in the purified class hierarchy, i.e. the rdfs:subClassOf triples of the input graph for instance purification,
+        which are replaced by rdf:type triples, and the rdfs:subClassOf triples of the output graph for subclass
+        purification, which include the updated rdf:type triples.
+
+        Args:
+            graph: An RDFLib Graph object.
+
         Returns:
-             graph: An RDFLib object that has been purified to the kg_construction approach.
+             purified_graph: An RDFLib object that has been purified to the kg_construction approach.
         """
 
         log_str = 'Purifying Graph Based on Construction Approach'; logger.info(log_str); print(log_str)
@@ -706,16 +811,23 @@ class OwlNets(object):
         pure_rel = RDFS.subClassOf if org_rel == RDF.type else RDF.type
 
         log_str = 'Determining what triples need purification'; print(log_str); logger.info(log_str)
-        triples = list(graph.triples((None, org_rel, None)))
-
-        log_str = 'Processing {} {} triples'.format(len(triples), org_rel); print(log_str); logger.info(log_str)
-        for edge in tqdm(triples):
-            graph.add((edge[0], pure_rel, edge[2])); graph.remove(edge)
-            o_ancs = gets_entity_ancestors(graph, [edge[2]], RDFS.subClassOf, [edge[2]])
-            ancs_filter = tuple([x for x in o_ancs if x.startswith('http') and URIRef(x) != edge[2]])
-            for node in ancs_filter: graph.add((edge[0], pure_rel, URIRef(node)))
-
-        return graph
+        edges: Dict = dict()
+        for s, p, o in graph.triples((None, org_rel, None)): edges.setdefault(o, []).append(s)
+        purified_graph = Graph()
+        purified_graph.addN((s, p, o, purified_graph) for s, p, o in graph if p != org_rel)
+        purified_graph.addN((s, pure_rel, o, purified_graph) for o, subjects in edges.items() for s in subjects)
+        hierarchy = purified_graph if pure_rel == RDFS.subClassOf else graph
+
+        log_str = 'Processing {} {} triples with {} objects'.format(sum(len(x) for x in edges.values()), org_rel,
+                                                                   len(edges)); print(log_str); logger.info(log_str)
+        ancestors: Dict = dict()
+        for o in tqdm(edges.keys()):
+            o_ancs = gets_entity_ancestors(hierarchy, [o], RDFS.subClassOf, [o])
+            ancestors[o] = tuple([URIRef(x) for x in o_ancs if x.startswith('http') and URIRef(x) != o])
+        purified_graph.addN((s, pure_rel, x, purified_graph) for o, subjects in edges.items() for x in ancestors[o]
+                            for s in subjects)
+
+        return purified_graph
 
     def write_out_results(self, graph: Union[Set, Graph], kg_const: Optional[str] = None) -> None:
         """Serializes graph and prints out basic statistics.
@@ -752,11 +864,17 @@ class OwlNets(object):
 
         return None
 
-    def runs_owlnets(self, cpus: int = 1) -> Tuple:
-        """Method facilitates the parallel processing of OWL-NETS over a list of n RDFLib Graph objects.
+    def runs_owlnets(self, cpus: int = 1, memory_budget: Optional[float] = None) -> Tuple:
+        """Method facilitates the parallel processing of OWL-NETS over a list of n RDFLib Graph objects. The actors only
+        query the graph they decode, so the graph is converted to an IndexedGraph that is stored once in the executor's
+        object store and shared by all of the actors without being copied. Actors that are forked by the local executor
+        already share the graph with this process (i.e. copy-on-write), so they get the graph itself. The number of
+        actors used for each graph is planned under the memory budget (see plans_stage_workers) from the graph's triple
+        count.
 
         Args:
             cpus: An integer representing the number of workers (default=1).
+            memory_budget: An optional float specifying the peak memory (in MB) of decoding a graph (default=None).
 
         Return:
             graph 1: A set of rdflib.Graph object triples.
@@ -767,32 +885,45 @@ class OwlNets(object):
 
         full_graph = Graph(); res2 = []
         loc, f, cons, ot = self.write_location, self.filename, self.kg_construct_approach, self.owl_tools
-        for g in tqdm(self.graph_list):
-            self.graph = g; self.removes_disjoint_with_axioms()
-            full_graph = adds_edges_to_graph(full_graph, self.removes_edges_with_owl_semantics(), False)
-            owl_classes = list(gets_ontology_classes(self.graph)); owl_axioms = []
-            for x in set(self.graph.subjects(RDF.type, OWL.Axiom)):
-                src = set(self.graph.objects(list(self.graph.objects(x, OWL.annotatedSource))[0], RDF.type))
-                tgt = set(self.graph.objects(list(self.graph.objects(x, OWL.annotatedTarget))[0], RDF.type))
-                if OWL.Class in src and OWL.Class in tgt: owl_axioms += [x]
-                elif (OWL.Class in src and len(tgt) == 0) or (OWL.Class in tgt and len(src) == 0): owl_axioms += [x]
-                else: pass
-            ents_to_decode = list(set(owl_classes) | set(owl_axioms)); shuffle(ents_to_decode)
-            if len(ents_to_decode) > 0:
-                entities = [ents_to_decode[i::cpus] for i in range(cpus)]
-                try: ray.init()
-                except RuntimeError: pass
-                acts = [ray.remote(OwlNets).remote(self.graph, loc, f, cons, ot) for _ in range(cpus)]  # type: ignore
-                for i in range(0, cpus): acts[i % cpus].cleans_owl_encoded_entities.remote(entities[i])  # type: ignore
-                _ = ray.wait([x.gets_owlnets_graph.remote() for x in acts], num_returns=len(acts))
-                graph_res = ray.get([x.gets_owlnets_graph.remote() for x in acts])  # type: ignore
-                full_graph = adds_edges_to_graph(full_graph, set(x for y in set(graph_res) for x in y), False)
-                res2 += ray.get([x.gets_owlnets_dict.remote() for x in acts]); del acts  # type: ignore
-        conn_graph = self.makes_graph_connected(full_graph); graph1 = set(conn_graph).copy(); graph2 = None
-        g1 = derives_graph_statistics(graph1); g2 = 'None'; self.write_out_results(graph1)
+        for n, g in enumerate(tqdm(self.graph_list)):
+            with tracks_build_stage(self.build_report, 'owlnets_decode_graph_' + str(n)) as counts:
+                self.graph = g; self.removes_disjoint_with_axioms()
+                full_graph = adds_edges_to_graph(full_graph, self.removes_edges_with_owl_semantics(), False)
+                owl_classes = list(gets_ontology_classes(self.graph)); owl_axioms = []
+                for x in set(self.graph.subjects(RDF.type, OWL.Axiom)):
+                    src = set(self.graph.objects(list(self.graph.objects(x, OWL.annotatedSource))[0], RDF.type))
+                    tgt = set(self.graph.objects(list(self.graph.objects(x, OWL.annotatedTarget))[0], RDF.type))
+                    if OWL.Class in src and OWL.Class in tgt: owl_axioms += [x]
+                    elif (OWL.Class in src and len(tgt) == 0) or (OWL.Class in tgt and len(src) == 0): owl_axioms += [x]
+                    else: pass
+                ents_to_decode = list(set(owl_classes) | set(owl_axioms)); shuffle(ents_to_decode)
+                if len(ents_to_decode) > 0:
+                    graph_mb, index_mb = len(self.graph) * triple_mb, len(self.graph) * index_triple_mb
+                    plan = plans_stage_workers('owlnets_decode_graph_' + str(n), cpus,
+                                               lambda x: (graph_mb + index_mb, worker_base_mb + graph_mb / x),
+                                               memory_budget)
+                    log_str = 'Planned {} OWL-NETS Actors: {}'.format(plan['planned_workers'], plan)
+                    logger.info(log_str); self.memory_plans.append(plan); workers = plan['planned_workers']
+                    entities = [ents_to_decode[i::workers] for i in range(workers)]
+                    executor = gets_executor(); executor.starts()
+                    if executor.name == 'local' and multiprocessing.get_start_method() == 'fork': graph_ref = self.graph
+                    else: graph_ref = executor.puts(IndexedGraph(self.graph))
+                    acts = [executor.creates_actor(OwlNets, graph_ref, loc, f, cons, ot) for _ in range(workers)]
+                    for i in range(0, workers):
+                        acts[i % workers].cleans_owl_encoded_entities.remote(entities[i])
+                    _ = executor.waits([x.gets_owlnets_graph.remote() for x in acts], num_returns=len(acts))
+                    graph_res = executor.gets([x.gets_owlnets_graph.remote() for x in acts])
+                    full_graph = adds_edges_to_graph(full_graph, set(x for y in set(graph_res) for x in y), False)
+                    res2 += executor.gets([x.gets_owlnets_dict.remote() for x in acts]); del acts, graph_ref
+                counts.update({'triples': len(g), 'entities': len(ents_to_decode)})
+        with tracks_build_stage(self.build_report, 'owlnets_connect_graph') as counts:
+            conn_graph = self.makes_graph_connected(full_graph); graph1 = set(conn_graph).copy(); graph2 = None
+            g1 = derives_graph_statistics(graph1); g2 = 'None'; self.write_out_results(graph1)
+            counts['triples'] = len(graph1)
         if self.kg_construct_approach is not None:
-            graph2 = set(self.purifies_graph_build(conn_graph)); g2 = derives_graph_statistics(graph2)
-            self.write_out_results(graph2, self.kg_construct_approach)
+            with tracks_build_stage(self.build_report, 'owlnets_purify_graph') as counts:
+                graph2 = set(self.purifies_graph_build(conn_graph)); g2 = derives_graph_statistics(graph2)
+                self.write_out_results(graph2, self.kg_construct_approach); counts['triples'] = len(graph2)
         stats = '\n\nOWL-NETS {};\nPurified OWL-NETS {}'.format(g1, g2); print(stats); logger.info(stats)
 
         # process owl decoding results
@@ -4,6 +4,7 @@
 
 from .data_utils import *
 from .kg_utils import *
+from .executor_utils import *
 
 
 __all__ = ['url_download', 'ftp_url_download', 'gzipped_ftp_url_download', 'zipped_url_download',
@@ -15,4 +16,10 @@ __all__ = ['url_download', 'ftp_url_download', 'gzipped_ftp_url_download', 'zipp
            'connected_components', 'removes_self_loops', 'derives_graph_statistics', 'splits_knowledge_graph',
            'adds_namespace_to_bnodes', 'removes_namespace_from_bnodes', 'updates_pkt_namespace_identifiers',
            'finds_node_type', 'updates_graph_namespace', 'maps_ids_to_integers', 'n3', 'appends_to_existing_file',
-           'deduplicates_file', 'merges_files', 'convert_to_networkx', 'sublist_creator', 'gets_ontology_definitions']
+           'deduplicates_file', 'merges_files', 'convert_to_networkx', 'sublist_creator', 'gets_ontology_definitions',
+           'builds_sorted_index', 'searches_sorted_index', 'writes_edge_list_store', 'reads_edge_list_store',
+           'converts_edge_list_json_to_store', 'converts_edge_list_store_to_json', 'gets_file_md5',
+           'hashes_strings', 'builds_hash_set', 'searches_hash_set', 'encodes_triples', 'merges_encoded_triples',
+           'IndexedGraph', 'shards_edge_lists', 'gets_process_memory', 'tracks_build_stage', 'writes_build_report',
+           'plans_stage_workers', 'merges_memory_plans', 'profiles_function', 'merges_profiles', 'RayExecutor',
+           'LocalExecutor', 'gets_executor', 'LocalActor', 'SharedFileWriter', 'SharedMemoryRef', 'resolves_reference']
@@ -23,34 +23,73 @@ Miscellaneous data Processing Methods
 * deduplicates_file
 * merges_files
 * sublist_creator
+* shards_edge_lists
+* gets_file_md5
+
+Identifier Indexing
+* builds_sorted_index
+* searches_sorted_index
+* hashes_strings
+* builds_hash_set
+* searches_hash_set
+
+Edge List Storage
+* writes_edge_list_store
+* reads_edge_list_store
+* converts_edge_list_json_to_store
+* converts_edge_list_store_to_json
 
 Outputs data
 * outputs_dictionary_data
+
+Build Instrumentation
+* gets_process_memory
+* tracks_build_stage
+* writes_build_report
+* plans_stage_workers
+* merges_memory_plans
+* profiles_function
+* merges_profiles
 """
 
 # import needed libraries
+import cProfile
+import csv
 import ftplib
+import functools
+import glob
 import gzip
+import hashlib
 import heapq
 import json
 import numpy as np  # type: ignore
 import os
 import pandas as pd  # type: ignore
+import psutil  # type: ignore
+import pstats
 import re
 import requests
 import shutil
+import socket
+import threading
+import time
 import urllib3  # type: ignore
 
-from contextlib import closing
+from contextlib import closing, contextmanager
 from io import BytesIO
 from reactome2py import content  # type: ignore
 from tqdm import tqdm  # type: ignore
-from typing import Dict, Generator, List, Optional, Union
+from typing import Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple, Union
 from urllib.request import urlopen
 from zipfile import ZipFile
 
 # GLOBAL ENVIRONMENT VARIABLE
 zip_pat = '.gz|.zip'
+profiler_state: Dict = {'active': False, 'profiles': dict()}  # this process's profiles (see profiles_function)
+# memory planning estimates (see plans_stage_workers): the resident memory (MB) of an idle worker process, of a triple
+# in an rdflib.Graph, of an edge in a parsed master edge list, and the in-memory size of an unpickled object relative
+# to its pickle file
+worker_base_mb, triple_mb, edge_mb, pickle_ratio = 150.0, 1500 / 2 ** 20, 250 / 2 ** 20, 4
 
 # WARNING 1 - Pandas: disable chained assignment warning rationale:
 # https://stackoverflow.com/questions/20625582/how-to-deal-with-settingwithcopywarning-in-pandas
@@ -469,12 +508,470 @@ def sublist_creator(actors: Union[Dict, List], chunk_size: int) -> List:
     for value in values:
         total, index = heapq.heappop(totals); lists[index].append(value); heapq.heappush(totals, (total + value, index))
 
-    # update list to return string identifier associated with each list length
+    # update list to return string identifier associated with each list length (each identifier is used only once)
     if isinstance(actors, Dict):
-        updated_lists = []; used_ids = set()
-        for sub in lists:
-            sub_list = [[k for k, v in actors.items() if v == x and k not in used_ids][0] for x in sub]
-            updated_lists += [sub_list]; used_ids |= set(x for y in sub_list for x in y)
+        ids: Dict = dict()
+        for k, v in actors.items(): ids.setdefault(v, []).append(k)
+        updated_lists = [[ids[x].pop(0) for x in sub] for sub in lists]
     else: updated_lists = lists
 
     return updated_lists
+
+
+def shards_edge_lists(edge_sizes: Dict, chunk_size: int, min_size: int = 10000) -> Dict:
+    """Splits the edge lists that are too large to be balanced across chunk_size workers into contiguous shards. An
+    edge list is split when it contains more edges than an even share of all edges (or than min_size, if larger),
+    so that a single large edge type no longer bounds how well the edges can be balanced (see sublist_creator).
+
+    Args:
+        edge_sizes: A dictionary keyed by edge type with the length of each associated edge list stored as the values.
+        chunk_size: An integer specifying the number of workers.
+        min_size: An integer specifying the smallest number of edges worth splitting into its own shard.
+
+    Returns:
+        A dictionary keyed by (edge type, start, stop) tuples, where start and stop index the shard's edges in the
+            edge list, with the number of edges in each shard stored as the values. For example:
+                {('gene-gene', 0, 5): 5, ('gene-gene', 5, 10): 5, ('gene-disease', 0, 3): 3}
+    """
+
+    target = max(-(-sum(edge_sizes.values()) // max(chunk_size, 1)), min_size, 1); shards: Dict = dict()
+    for edge_type, size in edge_sizes.items():
+        bounds = np.linspace(0, size, -(-size // target) + 1 if size > 0 else 2).astype(int).tolist()
+        for start, stop in zip(bounds[:-1], bounds[1:]): shards[(edge_type, start, stop)] = stop - start
+
+    return shards
+
+
+def gets_file_md5(filepath: str, chunk_size: int = 2 ** 20, size: Optional[int] = None) -> str:
+    """Calculates the md5 checksum of a file, reading it in chunks so that large files are never fully loaded.
+
+    Args:
+        filepath: A string specifying a path to an existing file.
+        chunk_size: An integer specifying the number of bytes to read at a time (default=1MB).
+        size: An optional integer specifying the number of leading bytes to hash (default=None, the whole file).
+
+    Returns:
+        A string containing the hexadecimal md5 digest of the file.
+    """
+
+    md5 = hashlib.md5(); remaining = size if size is not None else float('inf')
+    with open(filepath, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(int(min(chunk_size, remaining)))
+            if not chunk: break
+            md5.update(chunk); remaining -= len(chunk)
+
+    return md5.hexdigest()
+
+
+def builds_sorted_index(keys: Iterable, values: Iterable) -> Dict[str, np.ndarray]:
+    """Builds a compact, read-only index over a set of (key, value) pairs, where a key can map to more than one value.
+    The index is stored as three flat numpy arrays: (1) the sorted unique keys; (2) the offsets of each key's values;
+    and (3) the values, grouped by key in their original order. Because the arrays are fixed-width (i.e. not Python
+    objects) they can be shared with Ray workers through the object store without being copied or unpickled.
+
+    Args:
+        keys: An iterable of identifiers to index (e.g. the join column of an identifier mapping file).
+        values: An iterable, of the same length as keys, containing the value for each key.
+
+    Returns:
+        A dictionary with three keys: 'keys', 'offsets', and 'values'. The values mapped to keys[i] are stored in
+            values[offsets[i]:offsets[i + 1]]. For example:
+                {'keys': array(['MESH_C1', 'MESH_C2']), 'offsets': array([0, 1, 3]),
+                 'values': array(['CHEBI_1', 'CHEBI_2', 'CHEBI_3'])}
+    """
+
+    key_arr = np.asarray(keys if isinstance(keys, (np.ndarray, pd.Series)) else list(keys)).astype(str)
+    value_arr = np.asarray(values if isinstance(values, (np.ndarray, pd.Series)) else list(values)).astype(str)
+    order = np.argsort(key_arr, kind='stable'); key_arr, value_arr = key_arr[order], value_arr[order]
+    unique_keys, starts = np.unique(key_arr, return_index=True)
+    offsets = np.append(starts, len(key_arr)).astype(np.int64)
+
+    return {'keys': unique_keys, 'offsets': offsets, 'values': value_arr}
+
+
+def searches_sorted_index(index: Dict[str, np.ndarray], queries: Iterable) -> Tuple[np.ndarray, np.ndarray]:
+    """Joins an array of query identifiers against an index created by builds_sorted_index. Every query is matched
+    with a single vectorized binary search and then expanded to one row per mapped value, which makes the result
+    equivalent to an inner join between the queries and the indexed (key, value) pairs.
+
+    Args:
+        index: A dictionary returned by builds_sorted_index.
+        queries: An iterable of identifiers to look up.
+
+    Returns:
+        A tuple of two integer numpy arrays of the same length: (1) the position of each matched query in queries;
+        and (2) the position of its mapped value in index['values']. Queries without a match are not returned.
+    """
+
+    keys, offsets = index['keys'], index['offsets']
+    query_arr = np.asarray(queries if isinstance(queries, (np.ndarray, pd.Series)) else list(queries)).astype(str)
+    if len(keys) == 0 or len(query_arr) == 0: return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    pos = np.minimum(np.searchsorted(keys, query_arr), len(keys) - 1)
+    hits = np.flatnonzero(keys[pos] == query_arr); starts = offsets[pos[hits]]; counts = offsets[pos[hits] + 1] - starts
+    query_idx = np.repeat(hits, counts)
+    value_idx = np.arange(counts.sum(), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts - starts, counts)
+
+    return query_idx.astype(np.int64), value_idx
+
+
+def hashes_strings(items: Iterable) -> np.ndarray:
+    """Converts strings into 64-bit integer hashes. Unlike Python's built-in hash function, the hashes (BLAKE2b with
+    an 8-byte digest) are the same in every process.
+
+    Args:
+        items: An iterable of strings or objects that can be converted to strings (e.g. RDFLib URIRefs).
+
+    Returns:
+        A numpy array of unsigned 64-bit integers, with one hash per item.
+    """
+
+    hashes = [int.from_bytes(hashlib.blake2b(str(x).encode(), digest_size=8).digest(), 'little') for x in items]
+
+    return np.array(hashes, dtype=np.uint64)
+
+
+def builds_hash_set(items: Iterable) -> np.ndarray:
+    """Builds a compact, read-only set of strings, which is stored as a sorted array of unique 64-bit hashes (see
+    hashes_strings). A set of one million ontology class URIs needs 8MB and, because the set is a flat numpy array,
+    it can be shared with Ray workers through the object store without being copied or unpickled. The chance that a
+    string outside the set matches a hash in a set of one million strings is about 1 in 10^13.
+
+    Args:
+        items: An iterable of strings or objects that can be converted to strings (e.g. RDFLib URIRefs).
+
+    Returns:
+        A sorted numpy array of unique unsigned 64-bit integers.
+    """
+
+    return np.unique(hashes_strings(items))
+
+
+def searches_hash_set(hash_set: np.ndarray, items: Iterable) -> np.ndarray:
+    """Checks whether or not each item is a member of a hash set created by builds_hash_set.
+
+    Args:
+        hash_set: A sorted numpy array of unique hashes returned by builds_hash_set.
+        items: An iterable of strings or objects that can be converted to strings (e.g. RDFLib URIRefs).
+
+    Returns:
+        A boolean numpy array, with one value per item.
+    """
+
+    hashes = hashes_strings(items)
+    if len(hash_set) == 0: return np.zeros(len(hashes), dtype=bool)
+    pos = np.minimum(np.searchsorted(hash_set, hashes), len(hash_set) - 1)
+
+    return hash_set[pos] == hashes
+
+
+def writes_edge_list_store(edge_dict: Dict, store_dir: str) -> None:
+    """Writes a master edge list dictionary to a columnar store. Each edge type's edge list is saved as its own
+    two-column numpy (.npy) file and the remaining source_info metadata is saved to a small JSON manifest, which
+    allows readers to memory-map only the edge types they need instead of parsing the full master edge list.
+
+    Args:
+        edge_dict: A nested dictionary keyed by edge type, where each value contains the source_info metadata and an
+            'edge_list' (e.g. the contents of Master_Edge_List_Dict.json).
+        store_dir: A string containing a directory path to write the store to (created if it does not exist).
+
+    Returns:
+        None.
+    """
+
+    if not os.path.exists(store_dir): os.makedirs(store_dir)
+    manifest: Dict = dict()
+    for edge_type, edge_info in edge_dict.items():
+        if not isinstance(edge_info, Dict) or 'edge_list' not in edge_info: manifest[edge_type] = edge_info; continue
+        edges = [[str(x[0]), str(x[1])] for x in edge_info['edge_list']]
+        edge_arr = np.array(edges, dtype=str) if len(edges) > 0 else np.empty((0, 2), dtype='<U1')
+        np.save(store_dir + '/' + edge_type + '.npy', edge_arr, allow_pickle=False)
+        manifest[edge_type] = {k: v for k, v in edge_info.items() if k != 'edge_list'}
+        manifest[edge_type].update({'edge_file': edge_type + '.npy', 'edge_count': len(edges)})
+    with open(store_dir + '/manifest.json', 'w') as file_name:
+        json.dump(manifest, file_name)
+    file_name.close()
+
+    return None
+
+
+def reads_edge_list_store(store_dir: str, edge_types: Optional[Iterable] = None, mmap: bool = True) -> Dict:
+    """Reads a columnar store created by writes_edge_list_store. Only the manifest is parsed, the edge lists are
+    memory-mapped (or loaded when mmap is False) and are returned as read-only numpy arrays with shape (n, 2).
+
+    Args:
+        store_dir: A string containing the directory path of an existing store.
+        edge_types: An optional iterable of edge types to read (default=None, which reads all edge types).
+        mmap: A bool indicating whether or not the edge list files should be memory-mapped (default=True).
+
+    Returns:
+        A nested dictionary with the same structure as Master_Edge_List_Dict.json.
+
+    Raises:
+        OSError: If the store does not contain a manifest.json file.
+        KeyError: If an edge type in edge_types is not in the store.
+    """
+
+    if not os.path.exists(store_dir + '/manifest.json'): raise OSError('{} is not an edge list store'.format(store_dir))
+    with open(store_dir + '/manifest.json', 'r') as file_name: manifest = json.load(file_name)
+    keep = list(manifest.keys()) if edge_types is None else list(edge_types)
+    edge_dict: Dict = dict()
+    for edge_type in keep:
+        if not isinstance(manifest[edge_type], Dict) or 'edge_file' not in manifest[edge_type]:
+            edge_dict[edge_type] = manifest[edge_type]; continue
+        edge_info = {k: v for k, v in manifest[edge_type].items() if k not in ['edge_file', 'edge_count']}
+        edge_info['edge_list'] = np.load(store_dir + '/' + manifest[edge_type]['edge_file'],
+                                         mmap_mode='r' if mmap else None, allow_pickle=False)
+        edge_dict[edge_type] = edge_info
+
+    return edge_dict
+
+
+def converts_edge_list_json_to_store(json_file: str, store_dir: str) -> None:
+    """Converts an existing Master_Edge_List_Dict.json file into a columnar edge list store.
+
+    Args:
+        json_file: A string containing the filepath of a master edge list JSON file.
+        store_dir: A string containing a directory path to write the store to.
+
+    Returns:
+        None.
+    """
+
+    with open(json_file, 'r') as file_name: edge_dict = json.load(file_name)
+    writes_edge_list_store(edge_dict, store_dir)
+
+    return None
+
+
+def converts_edge_list_store_to_json(store_dir: str, json_file: str) -> None:
+    """Converts a columnar edge list store back into the Master_Edge_List_Dict.json format.
+
+    Args:
+        store_dir: A string containing the directory path of an existing store.
+        json_file: A string containing the filepath to write the master edge list JSON file to.
+
+    Returns:
+        None.
+    """
+
+    edge_dict = reads_edge_list_store(store_dir)
+    for edge_info in [x for x in edge_dict.values() if isinstance(x, Dict) and 'edge_list' in x]:
+        edge_info['edge_list'] = edge_info['edge_list'].tolist()
+    with open(json_file, 'w') as file_name:
+        json.dump(edge_dict, file_name)
+    file_name.close()
+
+    return None
+
+
+def gets_process_memory(pid: Optional[int] = None) -> Tuple[int, Dict[int, float]]:
+    """Measures the resident memory and CPU time of a process and all of its child processes. When Ray is started by
+    the process (i.e. ray.init()), the Ray workers and actors are child processes, so they are included.
+
+    Args:
+        pid: An optional integer specifying a process identifier (default=None, the current process).
+
+    Returns:
+        A tuple of: (1) an integer of the total resident set size (RSS) in bytes; and (2) a dictionary keyed by the
+            process identifiers with the CPU time (user + system seconds) of each process as the values.
+    """
+
+    rss, cpu_times, parent = 0, dict(), psutil.Process(pid)
+    for process in [parent] + parent.children(recursive=True):
+        try:
+            with process.oneshot():
+                rss += process.memory_info().rss; times = process.cpu_times()
+                cpu_times[process.pid] = times.user + times.system
+        except (psutil.NoSuchProcess, psutil.AccessDenied): pass  # the process exited while it was being measured
+
+    return rss, cpu_times
+
+
+@contextmanager
+def tracks_build_stage(report: List[Dict], stage: str, interval: float = 0.25) -> Iterator[Dict]:
+    """Context manager that measures a build stage and appends the measurements to a build report. The memory of the
+    process and its child processes (see gets_process_memory) is sampled by a background thread, so the high-water
+    mark includes the Ray workers. The context manager yields a dictionary of counters (e.g. the number of triples or
+    edges the stage created); the throughput of each numeric counter is added to the report as well.
+
+    Args:
+        report: A list of dictionaries, one per stage, to append the stage's measurements to.
+        stage: A string containing the name of the stage.
+        interval: A float specifying the number of seconds between memory samples (default=0.25).
+
+    Yields:
+        A dictionary of counters which the caller can update while the stage runs.
+    """
+
+    counters: Dict = dict(); stop = threading.Event(); rss, cpu_start = gets_process_memory(); peak = [rss]
+    cpu_times, started, start = dict(cpu_start), time.strftime('%Y-%m-%d %H:%M:%S'), time.perf_counter()
+
+    def samples_memory():
+        while not stop.wait(interval):
+            rss_now, cpu_now = gets_process_memory(); peak[0] = max(peak[0], rss_now); cpu_times.update(cpu_now)
+
+    sampler = threading.Thread(target=samples_memory, daemon=True); sampler.start(); completed = False
+    try:
+        yield counters; completed = True
+    finally:
+        stop.set(); sampler.join(); seconds = time.perf_counter() - start
+        rss, cpu_now = gets_process_memory(); cpu_times.update(cpu_now); peak[0] = max(peak[0], rss)
+        record = {'stage': stage, 'completed': completed, 'started': started, 'wall_seconds': round(seconds, 3),
+                  'cpu_seconds': round(sum(v - cpu_start.get(k, 0.0) for k, v in cpu_times.items()), 3),
+                  'peak_rss_mb': round(peak[0] / 2 ** 20, 1), 'end_rss_mb': round(rss / 2 ** 20, 1)}
+        for k, v in counters.items():
+            record[k] = v
+            if isinstance(v, (int, float)): record[k + '_per_second'] = round(v / max(seconds, 1e-9), 1)
+        report.append(record)
+
+
+def writes_build_report(report: List[Dict], filepath: str) -> None:
+    """Writes a build report (see tracks_build_stage) to a JSON file and to a CSV file with the same name, so that the
+    stage measurements of different builds or releases can be compared.
+
+    Args:
+        report: A list of dictionaries, one per stage, of stage measurements.
+        filepath: A string containing the filepath of the JSON file; the CSV file is written next to it.
+
+    Returns:
+        None.
+    """
+
+    with open(filepath, 'w') as out: json.dump(report, out, indent=2)
+    columns = list(dict.fromkeys(k for x in report for k in x.keys()))
+    with open(os.path.splitext(filepath)[0] + '.csv', 'w', newline='') as out:
+        writer = csv.DictWriter(out, fieldnames=columns); writer.writeheader(); writer.writerows(report)
+
+    return None
+
+
+def plans_stage_workers(stage: str, cpus: int, estimates: Callable[[int], Tuple[float, float]],
+                        memory_budget: Optional[float] = None) -> Dict:
+    """Plans the number of workers of a parallel build stage under a memory budget. The estimates function returns the
+    memory (in MB) that the stage adds to the driver process and the memory of each worker process for a given number
+    of workers. The estimated peak of the stage is the current resident memory of the driver, plus the driver's
+    estimate, plus the estimate of every worker. The largest number of workers (at most cpus) whose estimated peak fits
+    in the budget is chosen. When even a single worker does not fit, one worker is used and the plan is flagged as over
+    the budget. Without a budget, cpus workers are used and the estimate is only recorded (see merges_memory_plans).
+
+    Args:
+        stage: A string containing the name of the build stage (see tracks_build_stage).
+        cpus: An integer specifying the largest number of workers to use.
+        estimates: A function that takes a number of workers and returns a tuple of the driver and the per-worker
+            memory estimates (in MB).
+        memory_budget: An optional float specifying the peak memory (in MB) of the stage (default=None, no budget).
+
+    Returns:
+        A dictionary of the stage's plan. For example:
+            {'stage': 'edge_construction', 'planned_workers': 4, 'estimated_worker_mb': 512.3,
+             'estimated_peak_mb': 3011.9, 'memory_budget_mb': 4096.0, 'over_budget': False}
+    """
+
+    rss_mb = psutil.Process().memory_info().rss / 2 ** 20; peaks: Dict = dict()
+    for n in range(1, max(int(cpus), 1) + 1):
+        driver_mb, worker_mb = estimates(n); peaks[n] = (rss_mb + driver_mb + n * worker_mb, worker_mb)
+    fits = [n for n in peaks.keys() if memory_budget is None or peaks[n][0] <= memory_budget]
+    workers = max(peaks.keys()) if memory_budget is None else max(fits) if len(fits) > 0 else 1
+
+    return {'stage': stage, 'planned_workers': workers, 'estimated_worker_mb': round(peaks[workers][1], 1),
+            'estimated_peak_mb': round(peaks[workers][0], 1), 'memory_budget_mb': memory_budget,
+            'over_budget': len(fits) == 0}
+
+
+def merges_memory_plans(report: List[Dict], plans: List[Dict]) -> List[str]:
+    """Adds the memory plan of each stage (see plans_stage_workers) to the stage's measurements in a build report (see
+    tracks_build_stage), so that the estimated peak memory of a stage is reported next to its actual peak memory.
+
+    Args:
+        report: A list of dictionaries, one per stage, of stage measurements.
+        plans: A list of dictionaries, one per planned stage, of memory plans.
+
+    Returns:
+        A list of strings, one per plan, comparing the estimated and the actual peak memory of the stage.
+    """
+
+    comparisons = []
+    for plan in plans:
+        record = next((x for x in report[::-1] if x['stage'] == plan['stage']), dict())
+        record.update({k: v for k, v in plan.items() if k != 'stage'})
+        comparisons += ['Memory Plan {}: {} Workers x {} MB; Estimated Peak {} MB; Actual Peak {} MB; Budget {} MB'
+                        .format(plan['stage'], plan['planned_workers'], plan['estimated_worker_mb'],
+                                plan['estimated_peak_mb'], record.get('peak_rss_mb'), plan['memory_budget_mb'])]
+
+    return comparisons
+
+
+def profiles_function(func: Callable) -> Callable:
+    """Decorator that profiles a function with cProfile when the PKT_PROFILE_DIR environment variable is set to a
+    directory path; otherwise the function is called directly. Each process (i.e. the driver and each Ray worker)
+    keeps one profile per function, which accumulates all of the function's calls and is written to
+    <PKT_PROFILE_DIR>/<function>.<host>.<pid>.prof after every call, so the profile of a Ray worker is kept even when
+    the worker is stopped without exiting cleanly. A call made while another profiled function is running in the same
+    process is included in the running function's profile. See merges_profiles for combining the profile files.
+
+    Args:
+        func: A function or method to profile.
+
+    Returns:
+        The wrapped function.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile_dir = os.environ.get('PKT_PROFILE_DIR')
+        if not profile_dir or profiler_state['active']: return func(*args, **kwargs)
+        profiler = profiler_state['profiles'].setdefault(func.__qualname__, cProfile.Profile())
+        profiler_state['active'] = True; profiler.enable()
+        try: return func(*args, **kwargs)
+        finally:
+            profiler.disable(); profiler_state['active'] = False; os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats('{}/{}.{}.{}.prof'.format(profile_dir, func.__qualname__, socket.gethostname(),
+                                                          os.getpid()))
+
+    return wrapper
+
+
+def merges_profiles(profile_dir: str, min_seconds: float = 1e-4) -> Tuple[str, str]:
+    """Merges the profile files written by profiles_function into a single pstats file and converts the merged
+    profile into collapsed stacks (i.e. one "frame;frame;frame microseconds" line per stack), which can be rendered
+    as a flame graph (e.g. with flamegraph.pl or speedscope). Because cProfile only records caller-callee pairs, the
+    stacks are rebuilt by walking the call graph from the profiled functions and splitting the time of a function
+    that has several callers in proportion to the time spent under each caller.
+
+    Args:
+        profile_dir: A string containing the directory path of the profile (.prof) files.
+        min_seconds: A float specifying the time below which a stack is not expanded further (default=1e-4).
+
+    Returns:
+        A tuple of the filepaths of the merged pstats file and of the collapsed stacks file.
+
+    Raises:
+        OSError: If the directory does not contain any profile files.
+    """
+
+    files = sorted(glob.glob(profile_dir + '/*.prof'))
+    if len(files) == 0: raise OSError('{} does not contain any profile files'.format(profile_dir))
+    stats = pstats.Stats(files[0])
+    for x in files[1:]: stats.add(x)
+    merged_file, collapsed_file = profile_dir + '/merged_profile.pstats', profile_dir + '/merged_profile.collapsed'
+    stats.dump_stats(merged_file)
+
+    entries, children, stacks = stats.stats, dict(), dict()  # type: ignore
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, values in callers.items(): children.setdefault(caller, []).append((func, values[3]))
+    roots = [x for x, y in entries.items() if not any(c in entries for c in y[4].keys())]
+    queue = [((x,), 1.0) for x in roots]
+    while len(queue) > 0:  # each item is a stack of functions and the fraction of its last function's time
+        stack, fraction = queue.pop(); self_time = entries[stack[-1]][2]
+        key = ';'.join('{}:{}({})'.format(os.path.basename(x[0]), x[1], x[2]) for x in stack)
+        if self_time * fraction > 0: stacks[key] = stacks.get(key, 0.0) + self_time * fraction
+        for child, child_time in children.get(stack[-1], []):
+            share = child_time * fraction
+            if child not in stack and share >= min_seconds and entries[child][3] > 0:
+                queue.append((stack + (child,), share / entries[child][3]))
+    with open(collapsed_file, 'w') as out:
+        for key, seconds in sorted(stacks.items()):
+            if int(round(seconds * 1e6)) > 0: out.write('{} {}\n'.format(key, int(round(seconds * 1e6))))
+
+    return merged_file, collapsed_file
@@ -0,0 +1,428 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parallel Execution Utility Functions.
+
+The build runs its parallel work as actors, i.e. instances of a class that live in their own process and whose methods
+are called with actor.<method>.remote(*args). Each call returns a reference to its result. The same calls are
+supported by two executors, which are selected with the PKT_EXECUTOR environment variable (i.e. "ray" or "local"):
+  - RayExecutor: runs the actors with Ray, which also supports multi-node clusters (default).
+  - LocalExecutor: runs each actor in a single-worker concurrent.futures.ProcessPoolExecutor and shares objects through
+    multiprocessing.shared_memory, which avoids starting Ray on single-node machines. It requires Python 3.8 or later
+    (i.e. for shared_memory and pickle protocol 5), so it is imported lazily and the Ray executor still runs on 3.6.
+
+Executors
+* RayExecutor
+* LocalExecutor
+* gets_executor
+
+Local Actors and Objects
+* LocalActor
+* SharedFileWriter
+* SharedMemoryRef
+* resolves_reference
+"""
+
+# import needed libraries
+import concurrent.futures
+import multiprocessing
+import os
+import pickle
+import ray  # type: ignore
+import sys
+
+from typing import Any, Callable, Dict, IO, List, Optional, Tuple
+
+# global executor state (i.e. the executor used by the current process, see gets_executor)
+executor_state: Dict = {'executor': None, 'pid': None}
+local_actor_state: Dict = {'instance': None}
+attached_blocks: Dict = {}  # shared memory blocks whose buffers are used by the objects of the current process
+buffer_alignment = 64
+
+
+def _imports_shared_memory() -> Any:
+    """Imports the multiprocessing.shared_memory module used by the local executor.
+
+    Returns:
+        The multiprocessing.shared_memory module.
+
+    Raises:
+        ValueError: If the Python version is older than 3.8 (i.e. PKT_EXECUTOR=local is not supported).
+    """
+
+    if sys.version_info < (3, 8): raise ValueError('PKT_EXECUTOR=local requires Python 3.8 or later, use "ray" instead')
+    from multiprocessing import shared_memory
+
+    return shared_memory
+
+
+class SharedMemoryRef(object):
+    """A reference to a pickled object stored in a multiprocessing.shared_memory block (see LocalExecutor.puts). The
+    reference is small to pickle, so it can be sent to many actors while the object is only stored once. The process
+    that created the block owns it and removes it once the reference is garbage collected; copies of the reference in
+    other processes (including forked processes, which inherit the owner's reference) only read it. Large buffers of
+    the object (e.g. numpy arrays) are stored after the pickled object and are not copied when another process
+    resolves the reference: its arrays are read-only views of the block, so the memory of the object is shared by all
+    of the processes that use it.
+
+    Attributes:
+        name: A string containing the name of the shared memory block.
+        size: An integer specifying the number of bytes of the pickled object.
+        block: The SharedMemory block of the process that owns it, otherwise None.
+        buffers: A list of (offset, size) tuples of the object's buffers in the block.
+        pid: An integer specifying the process identifier of the process that owns the block.
+    """
+
+    def __init__(self, name: str, size: int, block: Optional[Any] = None,
+                 buffers: Optional[List[Tuple[int, int]]] = None) -> None:
+
+        self.name: str = name
+        self.size: int = size
+        self.block: Optional[Any] = block
+        self.buffers: List[Tuple[int, int]] = buffers or []
+        self.pid: int = os.getpid()
+
+    def __getstate__(self) -> Dict:
+
+        return {'name': self.name, 'size': self.size, 'block': None, 'buffers': self.buffers, 'pid': self.pid}
+
+    def owns_block(self) -> bool:
+        """Returns True if the current process owns the shared memory block (i.e. it created the block)."""
+
+        return self.block is not None and self.pid == os.getpid()
+
+    def __del__(self) -> None:
+
+        if getattr(self, 'pid', None) == os.getpid() and self.block is not None:
+            self.block.close(); self.block.unlink(); self.block = None  # type: ignore
+
+    def resolves(self) -> Any:
+        """Reads and unpickles the object from the shared memory block. The buffers of the object are read-only views of
+        the block, which stays attached to the process (see attached_blocks), except in the process that owns the block,
+        where they are copied so that the block can be removed with the reference.
+
+        Returns:
+            The object that was stored.
+        """
+
+        shared_memory = _imports_shared_memory()
+        if not self.buffers or self.owns_block():
+            block = self.block if self.owns_block() else shared_memory.SharedMemory(name=self.name)
+            view = block.buf[:self.size]
+            try: obj = pickle.loads(view, buffers=[bytearray(block.buf[i:i + n]) for i, n in self.buffers])
+            finally:
+                view.release()
+                if block is not self.block: block.close()
+        else:
+            if self.name not in attached_blocks: attached_blocks[self.name] = shared_memory.SharedMemory(name=self.name)
+            buf = attached_blocks[self.name].buf
+            obj = pickle.loads(buf[:self.size], buffers=[buf[i:i + n].toreadonly() for i, n in self.buffers])
+
+        return obj
+
+
+def resolves_reference(obj: Any) -> Any:
+    """Returns the object that a reference points to (i.e. a Ray object reference or a SharedMemoryRef), or the input
+    when it is not a reference.
+
+    Args:
+        obj: Any object.
+
+    Returns:
+        The object that is referenced, or obj.
+    """
+
+    if isinstance(obj, ray.ObjectRef): return ray.get(obj)
+    elif isinstance(obj, SharedMemoryRef): return obj.resolves()
+    else: return obj
+
+
+def _creates_local_actor(cls: Callable, args: Tuple, kwargs: Dict) -> None:
+    """Initializes the actor instance of a LocalActor process; references in args are resolved like Ray does."""
+
+    local_actor_state['instance'] = cls(*[resolves_reference(x) for x in args], **kwargs)
+
+    return None
+
+
+def _calls_local_actor(method: str, args: Tuple, kwargs: Dict) -> Any:
+    """Calls a method of the actor instance of a LocalActor process."""
+
+    return getattr(local_actor_state['instance'], method)(*args, **kwargs)
+
+
+def _runs_local_task(func: Callable, args: Tuple) -> Any:
+    """Runs a task of the LocalExecutor task pool; references in args are resolved in the task's process (like Ray
+    does), so that the objects in shared memory are read where they are used instead of being pickled by the driver."""
+
+    return func(*[resolves_reference(x) for x in args])
+
+
+class _ActorMethod(object):
+    """A method of a LocalActor or SharedFileWriter, which is called with remote(*args) (like Ray actor methods)."""
+
+    def __init__(self, submit: Callable, method: str) -> None:
+
+        self.submit: Callable = submit
+        self.method: str = method
+
+    def remote(self, *args, **kwargs) -> concurrent.futures.Future:
+
+        return self.submit(self.method, args, kwargs)
+
+
+class LocalActor(object):
+    """An instance of a class that lives in its own process, i.e. a single-worker ProcessPoolExecutor. The instance is
+    created when the process starts and its methods are called with actor.<method>.remote(*args), which returns a
+    concurrent.futures.Future. The calls are run one at a time in the order they were made. The process is stopped
+    when the actor is garbage collected or shutdown is called.
+
+    Attributes:
+        cls: The class of the actor.
+        args: The positional arguments used to create the instance; SharedMemoryRef arguments are resolved.
+        kwargs: The keyword arguments used to create the instance.
+    """
+
+    def __init__(self, cls: Callable, *args, **kwargs) -> None:
+
+        self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=1, initializer=_creates_local_actor,
+                                                           initargs=(cls, args, kwargs))
+
+    def __getattr__(self, method: str) -> _ActorMethod:
+
+        if method.startswith('__') or method == 'pool': raise AttributeError(method)
+
+        return _ActorMethod(lambda m, a, k: self.pool.submit(_calls_local_actor, m, a, k), method)
+
+    def shutdown(self) -> None:
+        """Stops the actor's process once its pending method calls have finished.
+
+        Returns:
+            None.
+        """
+
+        self.pool.shutdown(wait=True)
+
+        return None
+
+
+class SharedFileWriter(object):
+    """Appends N-Triples lines to a file that several local actors write to. It is the LocalExecutor equivalent of a
+    file writer actor: it is passed to the actors when they are created (multiprocessing locks can only be shared by
+    inheritance), and each actor opens the file once and appends to it while holding the shared lock, so that the
+    lines of different actors are never interleaved. Its methods are called like actor methods (i.e.
+    writer.writes_lines.remote(lines)), but run in the calling process and return finished futures.
+
+    Attributes:
+        filepath: A string specifying the path of the file to append to.
+        lock: A multiprocessing lock shared by all of the processes that write to the file.
+        lines: A multiprocessing integer value counting the lines written by all of the processes.
+    """
+
+    def __init__(self, filepath: str, lock: Any = None, lines: Any = None) -> None:
+
+        self.filepath: str = filepath
+        self.lock: Any = lock if lock is not None else multiprocessing.Lock()
+        self.lines: Any = lines if lines is not None else multiprocessing.Value('q', 0, lock=False)
+        self.out: Optional[IO] = None
+
+    def __getstate__(self) -> Dict:
+
+        return {'filepath': self.filepath, 'lock': self.lock, 'lines': self.lines, 'out': None}
+
+    def __getattr__(self, method: str) -> _ActorMethod:
+
+        if method not in ['writes_lines', 'closes']: raise AttributeError(method)
+
+        return _ActorMethod(self._calls, method)
+
+    def _calls(self, method: str, args: Tuple, kwargs: Dict) -> concurrent.futures.Future:
+
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        try: future.set_result(getattr(self, '_' + method)(*args, **kwargs))
+        except Exception as e: future.set_exception(e)
+
+        return future
+
+    def _writes_lines(self, lines: str) -> None:
+
+        with self.lock:
+            if self.out is None: self.out = open(self.filepath, 'a', newline='')
+            self.out.write(lines); self.out.flush(); self.lines.value += lines.count('\n')
+
+        return None
+
+    def _closes(self) -> int:
+
+        if self.out is not None: self.out.close(); self.out = None
+
+        return self.lines.value
+
+
+class RayExecutor(object):
+    """Runs actors and tasks with Ray (see the module docstring)."""
+
+    name = 'ray'
+
+    @staticmethod
+    def starts() -> None:
+        """Starts Ray, unless it is already running (e.g. when called from a Ray worker)."""
+
+        try: ray.init()
+        except RuntimeError: pass
+
+        return None
+
+    @staticmethod
+    def puts(obj: Any) -> ray.ObjectRef:
+        """Stores an object in the Ray object store and returns a reference to it."""
+
+        return ray.put(obj)
+
+    @staticmethod
+    def gets(refs: Any) -> Any:
+        """Returns the object(s) that a reference or a list of references point to."""
+
+        return ray.get(refs)
+
+    @staticmethod
+    def waits(refs: List, num_returns: int) -> Tuple[List, List]:
+        """Waits until num_returns of the references are ready and returns the ready and the pending references."""
+
+        return ray.wait(refs, num_returns=num_returns)
+
+    @staticmethod
+    def creates_actor(cls: Callable, *args, **kwargs) -> Any:
+        """Creates a Ray actor of a class."""
+
+        return ray.remote(cls).remote(*args, **kwargs)  # type: ignore
+
+    def creates_file_writer(self, cls: Callable, filepath: str) -> Any:
+        """Creates the writer of a file that several actors append to, i.e. an actor of the writer class."""
+
+        return self.creates_actor(cls, filepath)
+
+    @staticmethod
+    def submits(func: Callable, *args) -> ray.ObjectRef:
+        """Runs a function as a Ray task. The task does not reserve a CPU, because it is expected to orchestrate actors
+        that use the CPUs (e.g. the variants of a MatrixBuild)."""
+
+        return ray.remote(num_cpus=0)(func).remote(*args)  # type: ignore
+
+    @staticmethod
+    def shutdown() -> None:
+        """Stops Ray."""
+
+        ray.shutdown()
+
+        return None
+
+
+class LocalExecutor(object):
+    """Runs actors in local processes and shares objects through shared memory (see the module docstring).
+
+    Attributes:
+        pool: A ProcessPoolExecutor used to run tasks (see submits), which is created when the first task is submitted.
+    """
+
+    name = 'local'
+
+    def __init__(self) -> None:
+
+        _imports_shared_memory()  # raises a ValueError on Python versions without shared memory support
+        self.pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    @staticmethod
+    def starts() -> None:
+        """Nothing needs to be started, the actor processes are started when the actors are created."""
+
+        return None
+
+    @staticmethod
+    def puts(obj: Any) -> SharedMemoryRef:
+        """Pickles an object into a new shared memory block and returns a reference to it (see SharedMemoryRef). The
+        object's buffers (i.e. pickle protocol 5 out-of-band buffers, like those of numpy arrays) are written after the
+        pickled object, each aligned to 64 bytes, so that they can be used without being copied."""
+
+        shared_memory = _imports_shared_memory()
+        buffers: List[Any] = []; data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        layout: List[Tuple[int, int]] = []; offset = len(data)
+        for x in buffers:
+            offset += -offset % buffer_alignment; layout.append((offset, x.raw().nbytes)); offset += layout[-1][1]
+        block = shared_memory.SharedMemory(create=True, size=max(offset, 1)); block.buf[:len(data)] = data
+        for (i, n), x in zip(layout, buffers): block.buf[i:i + n] = x.raw()
+        del buffers
+
+        return SharedMemoryRef(block.name, len(data), block, layout)
+
+    @staticmethod
+    def gets(refs: Any) -> Any:
+        """Returns the object(s) that a future, a SharedMemoryRef, or a list of them point to."""
+
+        if isinstance(refs, list): return [LocalExecutor.gets(x) for x in refs]
+        elif isinstance(refs, concurrent.futures.Future): return refs.result()
+        else: return resolves_reference(refs)
+
+    @staticmethod
+    def waits(refs: List, num_returns: int) -> Tuple[List, List]:
+        """Waits until num_returns of the futures are done and returns the done and the pending futures."""
+
+        done: set = set()
+        while len(done) < num_returns:
+            finished, _ = concurrent.futures.wait([x for x in refs if x not in done],
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+            done |= finished
+        ready = [x for x in refs if x in done][:num_returns]
+
+        return ready, [x for x in refs if x not in ready]
+
+    @staticmethod
+    def creates_actor(cls: Callable, *args, **kwargs) -> LocalActor:
+        """Creates a local actor of a class (see LocalActor)."""
+
+        return LocalActor(cls, *args, **kwargs)
+
+    @staticmethod
+    def creates_file_writer(cls: Callable, filepath: str) -> SharedFileWriter:
+        """Creates the writer of a file that several actors append to (see SharedFileWriter). The writer class is not
+        used, because local actors append to the file themselves."""
+
+        return SharedFileWriter(filepath)
+
+    def submits(self, func: Callable, *args) -> concurrent.futures.Future:
+        """Runs a function in a process of the task pool, which has one process per CPU. SharedMemoryRef arguments are
+        sent as references and resolved by the task (see _runs_local_task)."""
+
+        if self.pool is None: self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+
+        return self.pool.submit(_runs_local_task, func, args)
+
+    def shutdown(self) -> None:
+        """Stops the task pool."""
+
+        if self.pool is not None: self.pool.shutdown(wait=True); self.pool = None
+
+        return None
+
+
+def gets_executor() -> Any:
+    """Returns the executor of the current process, which is selected with the PKT_EXECUTOR environment variable (i.e.
+    "ray" or "local", default="ray"). The environment variable is inherited by the actor processes, so actors that
+    create actors of their own use the same executor.
+
+    Returns:
+        A RayExecutor or a LocalExecutor instance.
+
+    Raises:
+        ValueError: If PKT_EXECUTOR is not "ray" or "local", or if it is "local" on Python versions older than 3.8.
+    """
+
+    backend = os.environ.get('PKT_EXECUTOR', 'ray').lower()
+    if backend not in ['ray', 'local']: raise ValueError('PKT_EXECUTOR must be "ray" or "local", not ' + backend)
+    current = executor_state['executor']
+    if current is None or current.name != backend or executor_state['pid'] != os.getpid():  # e.g. forked processes
+        executor_state['executor'] = RayExecutor() if backend == 'ray' else LocalExecutor()
+        executor_state['pid'] = os.getpid()
+
+    return executor_state['executor']
@@ -26,6 +26,8 @@ Interacts with Knowledge Graphs
 * removes_namespace_from_bnodes
 * updates_pkt_namespace_identifiers
 * splits_knowledge_graph
+* encodes_triples
+* merges_encoded_triples
 
 Writes Triple Lists
 * maps_ids_to_integers
@@ -34,6 +36,9 @@ Writes Triple Lists
 
 File Type Conversion
 * convert_to_networkx
+
+Read-Only Indexed Graphs
+* IndexedGraph
 """
 
 # import needed libraries
@@ -41,6 +46,7 @@ import glob
 import hashlib
 import json
 import networkx as nx  # type: ignore
+import numpy as np  # type: ignore
 import os
 import os.path
 
@@ -52,7 +58,7 @@ from rdflib.plugins.serializers.nt import _quoteLiteral  # type: ignore
 import subprocess
 
 from tqdm import tqdm  # type: ignore
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Dict, Generator, Iterable, List, Optional, Set, Tuple, Union
 from pkt_kg.utils import *
 
 # set-up environment variables
@@ -399,22 +405,33 @@ def gets_entity_ancestors(graph: Graph, uris: List[Union[URIRef, str]], rel: Uni
 
 
 def connected_components(graph: Union[Graph, Set]) -> List:
-    """Creates a dictionary where the keys are integers representing a component number and the values are sets
-    containing the nodes for a given component. This method works by first converting the RDFLib graph into a
-    NetworkX multi-directed graph, which is converted to a undirected graph prior to calculating the connected
-    components.
+    """Creates a list of sets containing the nodes of each connected component of a graph, where the edges are treated
+    as undirected. The components are found in a single pass over the triples with a union-find (i.e. disjoint-set)
+    structure, which merges the components of the subject and the object of each triple.
 
     Args:
-        graph: An RDFLib Graph object.
+        graph: An RDFLib Graph object or a set of RDFLib triples.
 
     Returns:
         components: A list of the nodes in each component detected in the graph.
     """
 
-    nx_mdg = nx.MultiDiGraph()
-    for s, p, o in tqdm(graph): nx_mdg.add_edge(s, o, **{'key': p})
+    parents: Dict = dict(); sizes: Dict = dict()
+
+    def finds_root(node: Union[URIRef, BNode, Literal]) -> Union[URIRef, BNode, Literal]:
+        if node not in parents: parents[node] = node; sizes[node] = 1
+        while parents[node] != node: parents[node] = parents[parents[node]]; node = parents[node]  # path halving
+        return node
+
+    for s, p, o in tqdm(graph):
+        s_root, o_root = finds_root(s), finds_root(o)
+        if s_root != o_root:  # union by size
+            if sizes[s_root] < sizes[o_root]: s_root, o_root = o_root, s_root
+            parents[o_root] = s_root; sizes[s_root] += sizes[o_root]
     print('Calculating Connected Components')
-    components = list(nx.connected_components(nx_mdg.to_undirected()))
+    members: Dict = dict()
+    for node in parents: members.setdefault(finds_root(node), set()).add(node)
+    components = list(members.values())
 
     return components
 
@@ -596,6 +613,7 @@ def updates_pkt_namespace_identifiers(graph: Union[Graph, Set], const: str, verb
     return graph
 
 
+@profiles_function
 def splits_knowledge_graph(graph: Graph, graph_output: bool = False) -> Tuple[Graph, Union[Graph, Set]]:
     """Method takes an input RDFLib Graph object and splits it into two new graphs where the first graph contains
     only those triples needed to maintain a base logical subset and the second contains only annotation assertions.
@@ -649,6 +667,50 @@ def splits_knowledge_graph(graph: Graph, graph_output: bool = False) -> Tuple[Gr
     else: raise ValueError('Error: Graph Subsetting was Unsuccessful!')
 
 
+def encodes_triples(graphs: List[Union[Graph, Set]]) -> Dict:
+    """Encodes one or more graphs as integer triples. The terms of all graphs are stored once in a shared list and each
+    graph is stored as an array of term indices, which is much smaller to serialize (e.g. when returning results from
+    a Ray actor) than an RDFLib Graph object.
+
+    Args:
+        graphs: A list of RDFLib Graph objects or sets of RDFLib triples.
+
+    Returns:
+        A dictionary with two keys: "terms", a list of RDFLib terms; and "triples", a list with one integer array of
+            shape (n, 3) per graph, where each row holds the term indices of a triple's subject, predicate, and object.
+    """
+
+    terms: Dict = dict(); rows = [[terms.setdefault(x, len(terms)) for t in graph for x in t] for graph in graphs]
+    dtype = np.int32 if len(terms) < 2 ** 31 else np.int64
+
+    return {'terms': list(terms.keys()), 'triples': [np.array(x, dtype=dtype).reshape(-1, 3) for x in rows]}
+
+
+def merges_encoded_triples(encoded: Iterable[Dict], graphs: List[Union[Graph, Set]]) -> List[Union[Graph, Set]]:
+    """Merges integer-encoded triples (see encodes_triples) into existing graphs. The encoded items are consumed one
+    at a time, so when they are produced lazily (e.g. fetched one Ray actor at a time) only the merged graphs and a
+    single encoded item are held in memory. Duplicate triples are removed as they are merged.
+
+    Args:
+        encoded: An iterable of dictionaries returned by encodes_triples.
+        graphs: A list of RDFLib Graph objects or sets of triples, one per encoded graph, to merge the triples into.
+
+    Returns:
+        The list of graphs updated with the decoded triples.
+    """
+
+    for item in encoded:
+        terms = item['terms']
+        for graph, triples in zip(graphs, item['triples']):
+            decoded = ((terms[x[0]], terms[x[1]], terms[x[2]]) for x in set(map(tuple, triples.tolist())))
+            if isinstance(graph, Graph): graph.addN(x + (graph,) for x in decoded)
+            else: graph.update(decoded)
+        del item, terms  # released before the next item is produced
+
+    return graphs
+
+
+@profiles_function
 def maps_ids_to_integers(graph: Union[Graph, Set], write_location: str, output_ints: str, output_ints_map: str) -> Dict:
     """Loops over the knowledge graph in order to create three different types of files:
         - Integers: tab-delimited `.txt` file containing three columns, one for each part of a triple (i.e.
@@ -768,10 +830,143 @@ def appends_to_existing_file(edges: Union[List, Set, Graph], filepath: str, sep:
         None.
     """
 
-    if not os.path.exists(filepath): os.system('touch {}'.format(filepath))
-    with open(filepath, 'a', newline='') as out:
-        for edge in edges:
-            out.write(n3(edge[0]) + sep + n3(edge[1]) + sep + n3(edge[2]) + ' .\n')
-    out.close()
+    with open(filepath, 'a', newline='', buffering=2 ** 20) as out:  # creates the file if it does not exist
+        out.writelines(n3(edge[0]) + sep + n3(edge[1]) + sep + n3(edge[2]) + ' .\n' for edge in edges)
 
     return None
+
+
+class IndexedGraph(object):
+    """A compact, read-only graph that answers the triple pattern queries of an RDFLib Graph (i.e. triples, subjects,
+    predicates, and objects) from integer-encoded triples. The graph is stored as flat numpy arrays: (1) the terms,
+    serialized into a single UTF-8 byte array with an offset per term, and a sorted array of their 64-bit hashes (see
+    hashes_strings) that maps a term to its integer identifier; (2) the triples sorted by subject (SPO) with the
+    offset of each subject's triples; and (3) the triples sorted by object (OSP) with the offset of each object's
+    triples. The triples of each subject keep the order of the RDFLib Graph's store, so queries return the triples in
+    the same order as the graph. Because the arrays are fixed-width, the graph can be shared with many workers through
+    the executor's object store (see gets_executor) without being copied or unpickled, and terms are only created when
+    they are used by a query (each process caches the terms it has used, which are not pickled with the graph).
+
+    Attributes:
+        graph: An RDFLib Graph object or a set of RDFLib triples.
+    """
+
+    def __init__(self, graph: Union[Graph, Set]) -> None:
+
+        if isinstance(graph, Graph):  # group the triples by subject in the order of the graph's store
+            triples: Iterable = (x for s in dict.fromkeys(x[0] for x in graph) for x in graph.triples((s, None, None)))
+        else: triples = graph
+        terms: Dict = dict(); ids = [terms.setdefault(x, len(terms)) for t in triples for x in t]
+        dtype = np.int32 if len(terms) < 2 ** 31 else np.int64; rows = np.array(ids, dtype=dtype).reshape(-1, 3)
+        keys = [self.serializes_term(x) for x in terms.keys()]; data = [x.encode('utf-8') for x in keys]; del terms
+        self.term_data: np.ndarray = np.frombuffer(b''.join(data), dtype=np.uint8)
+        self.term_offsets: np.ndarray = np.cumsum([0] + [len(x) for x in data], dtype=np.int64)
+        hashes = hashes_strings(keys); order = np.argsort(hashes, kind='stable'); del keys, data
+        self.term_hashes: np.ndarray = hashes[order]; self.term_ids: np.ndarray = order.astype(dtype)
+        self.spo: np.ndarray = rows[np.argsort(rows[:, 0], kind='stable')]
+        self.osp: np.ndarray = rows[np.argsort(rows[:, 2], kind='stable')]
+        bounds = np.arange(len(self.term_offsets), dtype=dtype)
+        self.spo_offsets: np.ndarray = np.searchsorted(self.spo[:, 0], bounds).astype(np.int64)
+        self.osp_offsets: np.ndarray = np.searchsorted(self.osp[:, 2], bounds).astype(np.int64)
+        self.terms: Dict = dict(); self.term_index: Dict = dict()
+
+    def __getstate__(self) -> Dict:
+
+        return {k: v for k, v in self.__dict__.items() if k not in ['terms', 'term_index']}
+
+    def __setstate__(self, state: Dict) -> None:
+
+        self.__dict__.update(state); self.terms = dict(); self.term_index = dict()
+
+    def __len__(self) -> int:
+
+        return len(self.spo)
+
+    def __iter__(self) -> Generator:
+
+        return self.triples((None, None, None))
+
+    def __contains__(self, triple: Tuple) -> bool:
+
+        return next(self.triples(triple), None) is not None
+
+    @staticmethod
+    def serializes_term(term: Union[URIRef, BNode, Literal]) -> str:
+        """Serializes an RDFLib term into a string that is unique to the term (i.e. the term's type and its lexical
+        form, plus a Literal's datatype and language)."""
+
+        if not isinstance(term, Literal): return ('B' if isinstance(term, BNode) else 'U') + str(term)
+        else: return 'L' + str(term) + '\x1f' + str(term.datatype or '') + '\x1f' + (term.language or '')
+
+    @staticmethod
+    def deserializes_term(key: str) -> Union[URIRef, BNode, Literal]:
+        """Creates the RDFLib term of a string serialized by serializes_term."""
+
+        if key[0] == 'U': return URIRef(key[1:])
+        elif key[0] == 'B': return BNode(key[1:])
+        else:
+            lexical, datatype, language = key[1:].rsplit('\x1f', 2)
+            return Literal(lexical, lang=language or None, datatype=datatype or None, normalize=False)
+
+    def gets_term(self, term_id: int) -> Union[URIRef, BNode, Literal]:
+        """Returns the RDFLib term of an integer identifier."""
+
+        term = self.terms.get(term_id)
+        if term is None:
+            start, stop = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            term = self.deserializes_term(self.term_data[start:stop].tobytes().decode('utf-8'))
+            self.terms[term_id] = term; self.term_index[term] = term_id
+
+        return term
+
+    def gets_term_id(self, term: Union[URIRef, BNode, Literal]) -> int:
+        """Returns the integer identifier of an RDFLib term, or -1 if the term is not in the graph. The term's hash is
+        found with a binary search and the terms with the same hash are compared with the term."""
+
+        if term in self.term_index: return self.term_index[term]
+        key = self.serializes_term(term); term_hash = hashes_strings([key])[0]; term_id = -1
+        idx = int(np.searchsorted(self.term_hashes, term_hash))
+        while idx < len(self.term_hashes) and self.term_hashes[idx] == term_hash:
+            start, stop = self.term_offsets[self.term_ids[idx]], self.term_offsets[self.term_ids[idx] + 1]
+            if self.term_data[start:stop].tobytes().decode('utf-8') == key: term_id = int(self.term_ids[idx]); break
+            idx += 1
+        self.term_index[term] = term_id
+
+        return term_id
+
+    def triples(self, pattern: Tuple) -> Generator:
+        """Returns the triples that match a triple pattern, where None matches any term (like RDFLib Graph.triples).
+
+        Args:
+            pattern: A tuple of a subject, a predicate, and an object, where each item is an RDFLib term or None.
+
+        Returns:
+            A generator of the matching triples, where each triple is a tuple of RDFLib terms.
+        """
+
+        ids = [None if x is None else self.gets_term_id(x) for x in pattern]
+        if -1 in ids: return
+        if ids[0] is not None: rows = self.spo[self.spo_offsets[ids[0]]:self.spo_offsets[ids[0] + 1]]
+        elif ids[2] is not None: rows = self.osp[self.osp_offsets[ids[2]]:self.osp_offsets[ids[2] + 1]]
+        else: rows = self.spo
+        s, p, o = ids
+        for x, y, z in rows.tolist():
+            if (s is None or x == s) and (p is None or y == p) and (o is None or z == o):
+                yield self.gets_term(x), self.gets_term(y), self.gets_term(z)
+
+    def subjects(self, predicate: Optional[URIRef] = None, object: Optional[Union[URIRef, BNode, Literal]] = None) \
+            -> Generator:
+        """Returns the subjects of the triples that match a predicate and an object (like RDFLib Graph.subjects)."""
+
+        return (x[0] for x in self.triples((None, predicate, object)))
+
+    def predicates(self, subject: Optional[Union[URIRef, BNode]] = None,
+                   object: Optional[Union[URIRef, BNode, Literal]] = None) -> Generator:
+        """Returns the predicates of the triples that match a subject and an object (like RDFLib Graph.predicates)."""
+
+        return (x[1] for x in self.triples((subject, None, object)))
+
+    def objects(self, subject: Optional[Union[URIRef, BNode]] = None, predicate: Optional[URIRef] = None) -> Generator:
+        """Returns the objects of the triples that match a subject and a predicate (like RDFLib Graph.objects)."""
+
+        return (x[2] for x in self.triples((subject, predicate, None)))
@@ -61,7 +61,7 @@ setup(
         'License :: OSI Approved :: Apache Software License',
         'Programming Language :: Python :: 3'
     ],
-    packages=find_packages(exclude=['contrib', 'docs', 'tests*', 'builds']),
+    packages=find_packages(exclude=['contrib', 'docs', 'tests*', 'builds', 'benchmarks']),
     tests_require=test_deps,
 
     entry_points={
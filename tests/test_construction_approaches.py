@@ -1,6 +1,7 @@
 import glob
 import json
 import logging
+import numpy
 import os
 import os.path
 import pandas
@@ -8,11 +9,12 @@ import pickle
 import shutil
 import unittest
 
+from collections import Counter
 from rdflib import Graph, URIRef, BNode
 from rdflib.namespace import OWL, RDF
 from typing import Dict, List, Tuple
 
-from pkt_kg.construction_approaches import KGConstructionApproach
+from pkt_kg.construction_approaches import KGConstructionApproach, SubclassMap
 from pkt_kg.utils import adds_edges_to_graph
 
 
@@ -111,6 +113,17 @@ class TestKGConstructionApproach(unittest.TestCase):
 
         return None
 
+    def removes_subclass_map_entries(self, entities: List) -> None:
+        """Rewrites the subclass mapping data without the input entities and re-instantiates the class (the subclass
+        map is read-only)."""
+
+        subcls_map = {k: v for k, v in self.kg_builder.subclass_dict.items() if k not in entities}
+        with open(self.dir_loc_resources + '/construction_approach/subclass_construction_map.pkl', 'wb') as f:
+            pickle.dump(subcls_map, f, protocol=4)
+        self.kg_builder = KGConstructionApproach(self.dir_loc_resources)
+
+        return None
+
     def test_class_initialization_parameters_write_location(self):
         """Tests the class initialization parameters for write location."""
 
@@ -144,7 +157,7 @@ class TestKGConstructionApproach(unittest.TestCase):
         self.assertIsInstance(self.kg_builder.write_location, str)
 
         # subclass dict
-        self.assertIsInstance(self.kg_builder.subclass_dict, Dict)
+        self.assertIsInstance(self.kg_builder.subclass_dict, SubclassMap)
         self.assertTrue(len(self.kg_builder.subclass_dict) == 15)
 
         # subclass_error dict
@@ -162,12 +175,74 @@ class TestKGConstructionApproach(unittest.TestCase):
 
         # test when entity not in subclass_dict
         # update subclass dict to remove an entry
-        del self.kg_builder.subclass_dict['2']
+        self.removes_subclass_map_entries(['2'])
         result = self.kg_builder.maps_node_to_class('gene-phenotype', '2')
         self.assertEqual(None, result)
 
         return None
 
+    def test_subclass_map(self):
+        """Tests the SubclassMap class."""
+
+        file_name = self.dir_loc_resources + '/construction_approach/subclass_construction_map.pkl'
+        subclass_map = SubclassMap.loads(file_name)
+
+        # test the map is written to a memory-mapped index and only loaded once per process
+        self.assertTrue(os.path.exists(file_name[:-4] + '_index/keys.npy'))
+        self.assertIsInstance(subclass_map.index['keys'].base, numpy.memmap)
+        self.assertIs(subclass_map, self.kg_builder.subclass_dict)
+        self.assertIs(SubclassMap.loads(file_name), subclass_map)
+
+        # test mapping semantics
+        self.assertEqual(subclass_map['80219'], ['SO_0001217'])
+        self.assertIn('4267', subclass_map)
+        self.assertNotIn('4268', subclass_map)
+        self.assertNotIn(2, subclass_map)
+        self.assertIsNone(subclass_map.get('4268'))
+        self.assertRaises(KeyError, subclass_map.__getitem__, '4268')
+        self.assertEqual(sorted(subclass_map.keys()), list(subclass_map.keys()))
+
+        # test the index is rebuilt when the pickled map changes
+        with open(file_name, 'wb') as f: pickle.dump({'2': ['SO_0001217', 'SO_0000704'], '9': []}, f, protocol=4)
+        subclass_map = SubclassMap.loads(file_name)
+        self.assertEqual(dict(subclass_map), {'2': ['SO_0001217', 'SO_0000704'], '9': []})
+        self.assertEqual(KGConstructionApproach(self.dir_loc_resources).maps_node_to_class('gene-gene', '9'), [])
+
+        # test values pickled as sets (e.g. the reactome mappings) are returned as sets
+        with open(file_name, 'wb') as f: pickle.dump({'R-HSA-77584': {'PW_0000001', 'GO_0008334'}, '2': ['SO']}, f)
+        subclass_map = KGConstructionApproach.indexes_subclass_map(self.dir_loc_resources)
+        self.assertIs(subclass_map, SubclassMap.loads(file_name))
+        self.assertEqual(subclass_map['R-HSA-77584'], {'PW_0000001', 'GO_0008334'})
+        self.assertEqual(subclass_map['2'], ['SO'])
+
+        return None
+
+    def test_summarizes_subclass_errors(self):
+        """Tests the summarizes_subclass_errors method."""
+
+        for entity in ['9', '10', '9', '2', '9', '10']: self.kg_builder.maps_node_to_class('gene-gene', entity + '0000')
+        summary = self.kg_builder.summarizes_subclass_errors(self.kg_builder.subclass_error, 2)
+
+        self.assertEqual(summary, {'gene-gene': {'unmapped_entities': 3, 'misses': 6,
+                                                 'top_unmapped': [['90000', 3], ['100000', 2]],
+                                                 'entities': ['90000', '100000', '20000']}})
+        summary = self.kg_builder.summarizes_subclass_errors({'gene-gene': ['9', '10']})
+        self.assertEqual(summary['gene-gene']['misses'], 2)
+
+        return None
+
+    def test_merges_subclass_errors(self):
+        """Tests the merges_subclass_errors method."""
+
+        errors = [{'gene-gene': Counter({'9': 2, '10': 1})}, {'gene-gene': Counter({'9': 1}), 'gene-disease': ['2']}]
+        merged = self.kg_builder.merges_subclass_errors(errors)
+
+        self.assertEqual(merged, {'gene-gene': Counter({'9': 3, '10': 1}), 'gene-disease': Counter({'2': 1})})
+        self.assertEqual(errors[0]['gene-gene'], Counter({'9': 2, '10': 1}))  # inputs are not modified
+        self.assertEqual(self.kg_builder.merges_subclass_errors([]), dict())
+
+        return None
+
     def test_subclass_core_constructor_with_inverse(self):
         """Tests the class_edge_constructor method with inverse relations."""
 
@@ -249,7 +324,7 @@ class TestKGConstructionApproach(unittest.TestCase):
         subclass_map_dict."""
 
         # prepare input vars
-        del self.kg_builder.subclass_dict['2']
+        self.removes_subclass_map_entries(['2'])
 
         # edge_info
         edge_info = {'n1': 'subclass', 'n2': 'class', 'rel': 'RO_0003302', 'inv_rel': None,
@@ -266,7 +341,7 @@ class TestKGConstructionApproach(unittest.TestCase):
         # check subclass error log
         self.assertIsInstance(self.kg_builder.subclass_error, Dict)
         self.assertIn('gene-phenotype', self.kg_builder.subclass_error.keys())
-        self.assertEqual(self.kg_builder.subclass_error['gene-phenotype'], ['2'])
+        self.assertEqual(self.kg_builder.subclass_error['gene-phenotype'], Counter({'2': 1}))
 
         return None
 
@@ -494,6 +569,53 @@ class TestKGConstructionApproach(unittest.TestCase):
 
         return None
 
+    def test_constructor_batch_matches_constructor(self):
+        """Tests that the instance_constructor_batch and subclass_constructor_batch methods return the same triples
+        as the instance_constructor and subclass_constructor methods."""
+
+        edge_types = {'gene-phenotype': ('subclass', 'class'), 'gene-gene': ('subclass', 'subclass'),
+                      'disease-disease': ('class', 'class')}
+        for approach in ['instance', 'subclass']:
+            for edge_type, (n1, n2) in edge_types.items():
+                for inv_rel in [None, 'RO_0002435']:
+                    edge_info = {'n1': n1, 'n2': n2, 'rel': 'RO_0003302', 'inv_rel': inv_rel,
+                                 'uri': self.edge_dict[edge_type]['uri']}
+                    edge_list = self.edge_dict[edge_type]['edge_list']
+                    constructor = getattr(self.kg_builder, approach + '_constructor')
+                    edges = [constructor({**edge_info, 'edges': x}, edge_type) for x in edge_list]
+                    batch = getattr(self.kg_builder, approach + '_constructor_batch')(edge_info, edge_type, edge_list)
+
+                    # check returned results
+                    self.assertIsInstance(batch['triples'], numpy.ndarray)
+                    self.assertEqual(batch['triples'].shape[1], 3)
+                    self.assertEqual(len(batch['offsets']), len(edge_list) + 1)
+                    self.assertEqual(len(batch['terms']), len(set(batch['terms'])))
+                    self.assertEqual([self.kg_builder.decodes_edge_batch(batch, i) for i in range(len(edge_list))],
+                                     edges)
+                    self.assertEqual(self.kg_builder.decodes_edge_batch(batch), [x for y in edges for x in y])
+
+        return None
+
+    def test_constructor_batch_bad_map(self):
+        """Tests the subclass_constructor_batch method for edges that contain identifiers that are not included in
+        the subclass_map_dict."""
+
+        # prepare input vars
+        self.removes_subclass_map_entries(['2', '10'])
+        edge_info = {'n1': 'subclass', 'n2': 'class', 'rel': 'RO_0003302', 'inv_rel': None,
+                     'uri': ['https://www.ncbi.nlm.nih.gov/gene/', 'http://purl.obolibrary.org/obo/']}
+
+        # test method
+        batch = self.kg_builder.subclass_constructor_batch(edge_info, 'gene-phenotype',
+                                                           self.edge_dict['gene-phenotype']['edge_list'])
+
+        # check returned results
+        self.assertEqual(list(batch['offsets']), [0, 0, 0, 0, 11, 22, 33, 44, 44, 44, 44])
+        self.assertEqual(list(self.kg_builder.subclass_error['gene-phenotype'].items()), [('2', 3), ('10', 3)])
+        self.assertRaises(ValueError, self.kg_builder.constructs_edge_batch, edge_info, 'gene-phenotype', [], 'other')
+
+        return None
+
     def tearDown(self):
 
         # remove resource directory
@@ -1,9 +1,17 @@
+import cProfile
+import glob
+import hashlib
+import json
+import marshal
+import numpy
 import os.path
 import pandas
+import pstats
 import random
 import shutil
 import unittest
 
+from mock import patch
 from tqdm import tqdm
 from typing import List
 
@@ -154,6 +162,253 @@ class TestDataUtilsMisc(unittest.TestCase):
 
         return None
 
+    def tests_sublist_creator_dict_ties(self):
+        """Tests the sublist_creator method when the input is a dictionary with lists of the same length."""
+
+        lists = sublist_creator({'gene-gene': 10, 'gene-disease': 10, 'gene-pathway': 10, 'rna-anatomy': 5}, 2)
+
+        self.assertEqual(lists, [['gene-gene', 'gene-disease'], ['gene-pathway', 'rna-anatomy']])
+
+        return None
+
+    def tests_shards_edge_lists(self):
+        """Tests the shards_edge_lists method."""
+
+        shards = shards_edge_lists({'chemical-gene': 100, 'gene-gene': 10, 'gene-disease': 0}, 4, 1)
+        self.assertEqual(shards, {('chemical-gene', 0, 25): 25, ('chemical-gene', 25, 50): 25,
+                                  ('chemical-gene', 50, 75): 25, ('chemical-gene', 75, 100): 25,
+                                  ('gene-gene', 0, 10): 10, ('gene-disease', 0, 0): 0})
+        self.assertEqual(len(sublist_creator(shards, 4)), 4)
+
+        # test edge lists smaller than the minimum shard size are not split
+        shards = shards_edge_lists({'chemical-gene': 100, 'gene-gene': 10}, 4)
+        self.assertEqual(shards, {('chemical-gene', 0, 100): 100, ('gene-gene', 0, 10): 10})
+
+        return None
+
+    def tests_gets_file_md5(self):
+        """Tests the gets_file_md5 method."""
+
+        with open(self.dir_loc + '/md5_test.txt', 'w') as f: f.write('pheknowlator\n')
+        self.assertEqual(gets_file_md5(self.dir_loc + '/md5_test.txt'), '273ce8def3c1d9b0d62fe7d0be71d78b')
+        filepath = self.dir_loc + '/md5_test.txt'
+        self.assertEqual(gets_file_md5(filepath, 4), gets_file_md5(filepath))
+        # hash only a prefix of the file
+        self.assertEqual(gets_file_md5(filepath, 4, 12), hashlib.md5(b'pheknowlator').hexdigest())
+        self.assertEqual(gets_file_md5(filepath, size=100), gets_file_md5(filepath))
+        self.assertEqual(gets_file_md5(filepath, size=0), hashlib.md5(b'').hexdigest())
+
+        return None
+
+    def tests_builds_sorted_index(self):
+        """Tests the builds_sorted_index method."""
+
+        index = builds_sorted_index(['MESH_2', 'MESH_1', 'MESH_2', 3], ['CHEBI_1', 'CHEBI_2', 'CHEBI_3', 'CHEBI_4'])
+
+        self.assertIsInstance(index, dict)
+        self.assertEqual(list(index['keys']), ['3', 'MESH_1', 'MESH_2'])
+        self.assertEqual(list(index['offsets']), [0, 1, 2, 4])
+        self.assertEqual(list(index['values']), ['CHEBI_4', 'CHEBI_2', 'CHEBI_1', 'CHEBI_3'])
+
+        return None
+
+    def tests_searches_sorted_index(self):
+        """Tests the searches_sorted_index method."""
+
+        index = builds_sorted_index(['MESH_2', 'MESH_1', 'MESH_2'], ['CHEBI_1', 'CHEBI_2', 'CHEBI_3'])
+        query_idx, value_idx = searches_sorted_index(index, ['MESH_2', 'MESH_3', 'MESH_1', 'MESH_22'])
+
+        self.assertEqual(list(query_idx), [0, 0, 2])
+        self.assertEqual(list(index['values'][value_idx]), ['CHEBI_1', 'CHEBI_3', 'CHEBI_2'])
+
+        # test empty index
+        query_idx, value_idx = searches_sorted_index(builds_sorted_index([], []), ['MESH_1'])
+        self.assertEqual(len(query_idx), 0)
+        self.assertEqual(len(value_idx), 0)
+
+        return None
+
+    def tests_hash_set(self):
+        """Tests the hashes_strings, builds_hash_set, and searches_hash_set methods."""
+
+        hash_set = builds_hash_set(['HP_0000001', 'HP_0000002', 'HP_0000001'])
+        self.assertIsInstance(hash_set, numpy.ndarray)
+        self.assertEqual(hash_set.dtype, numpy.uint64)
+        self.assertEqual(len(hash_set), 2)
+        self.assertEqual(list(hash_set), sorted(hash_set))
+        self.assertEqual(list(hashes_strings(['HP_0000001'])), list(hashes_strings(['HP_0000001'])))
+        self.assertEqual(list(searches_hash_set(hash_set, ['HP_0000002', 'HP_0000003', 'HP_0000001'])),
+                         [True, False, True])
+        self.assertEqual(list(searches_hash_set(builds_hash_set([]), ['HP_0000001'])), [False])
+
+        return None
+
+    def tests_edge_list_store(self):
+        """Tests the writes_edge_list_store, reads_edge_list_store, and edge list store conversion methods."""
+
+        edge_dict = {'gene-gene': {'data_type': 'entity-entity', 'edge_relation': 'RO_0002435',
+                                   'uri': ['https://www.ncbi.nlm.nih.gov/gene/', 'https://www.ncbi.nlm.nih.gov/gene/'],
+                                   'edge_list': [['3075', '1080'], ['3075', '4267'], ['4800', '10190']]},
+                     'gene-disease': {'data_type': 'entity-class', 'edge_relation': 'RO_0003302',
+                                      'uri': ['https://www.ncbi.nlm.nih.gov/gene/', 'http://purl.obolibrary.org/obo/'],
+                                      'edge_list': []}}
+        with open(self.dir_loc + '/Master_Edge_List_Dict.json', 'w') as f: json.dump(edge_dict, f)
+
+        # test converting json to store and reading a single edge type
+        converts_edge_list_json_to_store(self.dir_loc + '/Master_Edge_List_Dict.json', self.dir_loc + '/store')
+        self.assertTrue(os.path.exists(self.dir_loc + '/store/manifest.json'))
+        store = reads_edge_list_store(self.dir_loc + '/store', ['gene-gene'])
+        self.assertEqual(list(store.keys()), ['gene-gene'])
+        self.assertIsInstance(store['gene-gene']['edge_list'], numpy.ndarray)
+        self.assertEqual(store['gene-gene']['edge_list'].shape, (3, 2))
+        self.assertEqual(store['gene-gene']['uri'], edge_dict['gene-gene']['uri'])
+        self.assertEqual(len(reads_edge_list_store(self.dir_loc + '/store')['gene-disease']['edge_list']), 0)
+        self.assertRaises(OSError, reads_edge_list_store, self.dir_loc)
+
+        # test converting store back to json
+        converts_edge_list_store_to_json(self.dir_loc + '/store', self.dir_loc + '/Master_Edge_List_Dict_2.json')
+        with open(self.dir_loc + '/Master_Edge_List_Dict_2.json', 'r') as f: self.assertEqual(json.load(f), edge_dict)
+
+        return None
+
+    def tests_gets_process_memory(self):
+        """Tests the gets_process_memory method."""
+
+        rss, cpu_times = gets_process_memory()
+        self.assertGreater(rss, 0)
+        self.assertIn(os.getpid(), cpu_times.keys())
+        self.assertGreaterEqual(cpu_times[os.getpid()], 0.0)
+
+        return None
+
+    def tests_tracks_build_stage(self):
+        """Tests the tracks_build_stage method."""
+
+        report: List = []
+        with tracks_build_stage(report, 'stage_1', 0.01) as counts:
+            data = numpy.ones(2 ** 24); counts['triples'] = 10; counts['source'] = 'test'
+        del data
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]['stage'], 'stage_1')
+        self.assertTrue(report[0]['completed'])
+        self.assertEqual(report[0]['triples'], 10)
+        self.assertIn('triples_per_second', report[0].keys())
+        self.assertNotIn('source_per_second', report[0].keys())
+        self.assertGreaterEqual(report[0]['peak_rss_mb'], 128)
+        self.assertGreaterEqual(report[0]['wall_seconds'], 0.0)
+
+        # a failed stage is recorded and the error is raised
+        with self.assertRaises(ValueError):
+            with tracks_build_stage(report, 'stage_2'): raise ValueError
+        self.assertEqual(len(report), 2)
+        self.assertFalse(report[1]['completed'])
+
+        return None
+
+    def tests_writes_build_report(self):
+        """Tests the writes_build_report method."""
+
+        report = [{'stage': 'stage_1', 'wall_seconds': 1.0}, {'stage': 'stage_2', 'wall_seconds': 2.0, 'edges': 5}]
+        writes_build_report(report, self.dir_loc + '/Build_Report.json')
+        with open(self.dir_loc + '/Build_Report.json', 'r') as f: self.assertEqual(json.load(f), report)
+        report_csv = pandas.read_csv(self.dir_loc + '/Build_Report.csv')
+        self.assertEqual(list(report_csv.columns), ['stage', 'wall_seconds', 'edges'])
+        self.assertEqual(report_csv['wall_seconds'].tolist(), [1.0, 2.0])
+
+        return None
+
+    def tests_plans_stage_workers(self):
+        """Tests the plans_stage_workers method."""
+
+        # without a budget all of the workers are used
+        plan = plans_stage_workers('stage_1', 4, lambda n: (100.0, 1000.0 / n + 50.0))
+        self.assertEqual(plan['planned_workers'], 4)
+        self.assertEqual(plan['estimated_worker_mb'], 300.0)
+        self.assertFalse(plan['over_budget'])
+        rss_mb = plan['estimated_peak_mb'] - 1300.0
+        self.assertGreater(rss_mb, 0)
+
+        # with a budget the largest number of workers that fits is used
+        plan = plans_stage_workers('stage_1', 4, lambda n: (100.0, 1000.0), rss_mb + 2200.0)
+        self.assertEqual(plan['planned_workers'], 2)
+        self.assertEqual(plan['memory_budget_mb'], rss_mb + 2200.0)
+        self.assertFalse(plan['over_budget'])
+
+        # one worker is used when none fit
+        plan = plans_stage_workers('stage_1', 4, lambda n: (100.0, 1000.0), 1.0)
+        self.assertEqual(plan['planned_workers'], 1)
+        self.assertTrue(plan['over_budget'])
+
+        return None
+
+    def tests_merges_memory_plans(self):
+        """Tests the merges_memory_plans method."""
+
+        report = [{'stage': 'stage_1', 'peak_rss_mb': 500.0}, {'stage': 'stage_2', 'peak_rss_mb': 900.0}]
+        plans = [{'stage': 'stage_2', 'planned_workers': 2, 'estimated_worker_mb': 300.0, 'estimated_peak_mb': 800.0,
+                  'memory_budget_mb': 1000.0, 'over_budget': False}]
+        comparisons = merges_memory_plans(report, plans)
+        self.assertNotIn('planned_workers', report[0].keys())
+        self.assertEqual(report[1]['planned_workers'], 2)
+        self.assertEqual(report[1]['estimated_peak_mb'], 800.0)
+        self.assertEqual(report[1]['peak_rss_mb'], 900.0)
+        comparison = 'Memory Plan stage_2: 2 Workers x 300.0 MB; Estimated Peak 800.0 MB; Actual Peak 900.0 MB; Budget'
+        self.assertEqual(comparisons, [comparison + ' 1000.0 MB'])
+
+        return None
+
+    def tests_profiles_function(self):
+        """Tests the profiles_function method."""
+
+        @profiles_function
+        def sums_squares(n: int) -> int: return sum(x ** 2 for x in range(n))
+
+        # test without profiling
+        self.assertEqual(sums_squares(10), 285)
+        self.assertEqual(glob.glob(self.dir_loc + '/*.prof'), [])
+
+        # test with profiling, each call updates the process's profile file
+        with patch.dict(os.environ, {'PKT_PROFILE_DIR': self.dir_loc + '/profiles'}):
+            self.assertEqual(sums_squares(10), 285); self.assertEqual(sums_squares(100), 328350)
+        profiles = glob.glob(self.dir_loc + '/profiles/*.prof')
+        self.assertEqual(len(profiles), 1)
+        self.assertIn('sums_squares', os.path.basename(profiles[0]))
+        self.assertIn(str(os.getpid()), os.path.basename(profiles[0]))
+        calls = [v[1] for k, v in pstats.Stats(profiles[0]).stats.items() if k[2] == '<genexpr>']  # type: ignore
+        self.assertEqual(calls, [112])
+
+        return None
+
+    def tests_merges_profiles(self):
+        """Tests the merges_profiles method."""
+
+        self.assertRaises(OSError, merges_profiles, self.dir_loc)
+
+        # create two profiles
+        for x in range(2):
+            profiler = cProfile.Profile(); profiler.enable(); sorted(random.random() for _ in range(10000))
+            profiler.disable(); profiler.dump_stats(self.dir_loc + '/profile_{}.prof'.format(x))
+        merged_file, collapsed_file = merges_profiles(self.dir_loc, 0.0)
+        self.assertEqual(merged_file, self.dir_loc + '/merged_profile.pstats')
+        stats = pstats.Stats(merged_file).stats  # type: ignore
+        self.assertEqual([v[1] for k, v in stats.items() if k[2] == '<built-in method builtins.sorted>'], [2])
+
+        # verify the collapsed stacks
+        with open(collapsed_file, 'r') as f: lines = f.read().splitlines()
+        self.assertTrue(len(lines) > 0)
+        self.assertTrue(all(int(x.rsplit(' ', 1)[1]) > 0 for x in lines))
+        self.assertTrue(any('<genexpr>' in x.rsplit(' ', 1)[0].split(';')[-1] for x in lines))
+
+        # verify that callees without any recorded time are not expanded
+        root, child = ('main.py', 1, 'root'), ('main.py', 2, 'child')
+        stats = {root: (1, 1, 0.001, 0.001, {}), child: (1, 1, 0.0, 0.0, {root: (1, 1, 0.0, 0.0)})}
+        for x in glob.glob(self.dir_loc + '/*.prof'): os.remove(x)
+        with open(self.dir_loc + '/profile_0.prof', 'wb') as f: marshal.dump(stats, f)
+        merged_file, collapsed_file = merges_profiles(self.dir_loc, 0.0)
+        with open(collapsed_file, 'r') as f: self.assertEqual(f.read().splitlines(), ['main.py:1(root) 1000'])
+
+        return None
+
     def tearDown(self):
 
         # remove temp directory
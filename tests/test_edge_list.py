@@ -1,4 +1,5 @@
 import glob
+import json
 import logging
 import os.path
 import pandas
@@ -105,6 +106,20 @@ class TestCreatesEdgeList(unittest.TestCase):
 
         return None
 
+    def tests_data_chunk_reader(self):
+        """Tests the data_chunk_reader method."""
+
+        file_path = self.edge_data_files['gene-disease']
+        edge_data = self.master_edge_list.data_reader(file_path, 't')
+        chunks = list(self.master_edge_list.data_chunk_reader(file_path, 't', 4))
+
+        self.assertTrue(len(chunks) == 4)
+        self.assertTrue(all(len(x) <= 4 for x in chunks))
+        self.assertEqual(pandas.concat(chunks).values.tolist(), edge_data.values.tolist())
+        self.assertEqual(list(chunks[0]), list(edge_data))
+
+        return None
+
     def test_filter_fixer(self):
         """Tests the filter_fixer method."""
 
@@ -208,6 +223,28 @@ class TestCreatesEdgeList(unittest.TestCase):
 
         return None
 
+    def tests_label_formatter_criteria(self):
+        """Tests label_formatter method for each type of label criteria."""
+
+        edge_data = pandas.DataFrame({'a': ['MESH:D1', 'MESH:D2', 'MESH:D1'], 'b': [1, 2, 1], 'c': ['x', 'y', 'z']})
+
+        # splitter in column values
+        labeled_data = self.master_edge_list.label_formatter(edge_data.copy(), ':;MESH_;')
+        self.assertEqual(list(labeled_data['a']), ['MESH_D1', 'MESH_D2', 'MESH_D1'])
+        self.assertEqual(list(labeled_data['b']), ['1', '2', '1'])
+        self.assertEqual(list(labeled_data['c']), ['x', 'y', 'z'])
+
+        # no splitter
+        labeled_data = self.master_edge_list.label_formatter(edge_data.copy(), ';;GENE_')
+        self.assertEqual(list(labeled_data['a']), ['MESH:D1', 'MESH:D2', 'MESH:D1'])
+        self.assertEqual(list(labeled_data['b']), ['GENE_1', 'GENE_2', 'GENE_1'])
+
+        # splitter is removed without a replacement
+        labeled_data = self.master_edge_list.label_formatter(edge_data.copy(), 'MESH:;;')
+        self.assertEqual(list(labeled_data['a']), ['D1', 'D2', 'D1'])
+
+        return None
+
     def tests_data_merger(self):
         """Tests the data_merger method."""
 
@@ -258,6 +295,36 @@ class TestCreatesEdgeList(unittest.TestCase):
 
         return None
 
+    def tests_gets_mapping_index(self):
+        """Tests the gets_mapping_index method."""
+
+        map_file = self.dir_loc + '/DISEASE_DOID_MAP.txt'
+        map_index = self.master_edge_list.gets_mapping_index(map_file)
+        self.assertIsInstance(map_index, dict)
+        self.assertEqual(len(map_index['offsets']), len(map_index['keys']) + 1)
+        self.assertEqual(list(map_index['keys']), sorted(set(map_index['keys'])))
+        self.assertIn(map_file, self.master_edge_list.mapping_cache.keys())
+
+        # verify the cached index is reused
+        self.assertIs(map_index, self.master_edge_list.gets_mapping_index(map_file))
+
+        return None
+
+    def tests_creates_mapping_cache(self):
+        """Tests the creates_mapping_cache method."""
+
+        mapping_cache = self.master_edge_list.creates_mapping_cache(['chemical-disease', 'gene-disease'])
+        self.assertIsInstance(mapping_cache, dict)
+        self.assertEqual(sorted(mapping_cache.keys()),
+                         [self.dir_loc + '/DISEASE_DOID_MAP.txt', self.dir_loc + '/MESH_CHEBI_MAP.txt'])
+
+        # verify a class initialized with the cache does not re-read mapping data
+        edge_list = CreatesEdgeList(self.edge_data_files, self.dir_loc + '/resource_info.txt', mapping_cache)
+        self.assertIs(mapping_cache[self.dir_loc + '/MESH_CHEBI_MAP.txt'],
+                      edge_list.gets_mapping_index(self.dir_loc + '/MESH_CHEBI_MAP.txt'))
+
+        return None
+
     def tests_process_mapping_data(self):
         """Tests the process_mapping_data method."""
 
@@ -362,12 +429,122 @@ class TestCreatesEdgeList(unittest.TestCase):
                                                                  cpus=1)
         ray.shutdown()
         self.assertTrue(os.path.exists(self.dir_loc + '/Master_Edge_List_Dict.json'))
+        self.assertTrue(os.path.exists(self.dir_loc + '/Master_Edge_List_Store/manifest.json'))
+        with open(self.dir_loc + '/Master_Edge_List_Build_Report.json', 'r') as f: report = json.load(f)
+        self.assertEqual([x['stage'] for x in report],
+                         ['edge_type_fingerprints', 'edge_construction', 'write_master_edge_list'])
+        self.assertIn('edges_per_second', report[1].keys())
+
+        return None
+
+    def tests_streams_edge_data(self):
+        """Tests the streams_edge_data method."""
+
+        file_path, info = self.edge_data_files['gene-disease'], self.master_edge_list.source_info['gene-disease']
+        for criteria in [('10;>=;0.3', 'None'), ('None', 'None'), ('0-1;dedup;asc', '4-0;dedup;desc::9;>=;0.3')]:
+            info['filter_criteria'], info['evidence_criteria'] = criteria
+            edge_data = self.master_edge_list.data_reader(file_path, 't')
+            edge_data = self.master_edge_list.filter_data(edge_data, criteria[0], criteria[1])
+            edge_data = self.master_edge_list.data_reducer(info['column_idx'], edge_data)
+            streamed_data = self.master_edge_list.streams_edge_data('gene-disease', chunk_size=4)
+            self.assertIsInstance(streamed_data, pandas.DataFrame)
+            self.assertEqual(list(streamed_data), list(edge_data))
+            self.assertEqual(streamed_data.values.tolist(), edge_data.values.tolist())
+
+        # test a sort column that only contains numbers in some of the partitions
+        file_path = self.dir_loc + '/edge_data/gene-disease_mixed_scores.tsv'
+        rows = ['geneId\tscore\tdiseaseId', 'g1\t10\td1', 'g1\t9\td2', 'g2\tx\td3', 'g2\t1\td4']
+        with open(file_path, 'w') as f: f.write('\n'.join(rows) + '\n')
+        self.master_edge_list.data_files['gene-disease'], self.master_edge_list.memory_limit = file_path, 0.00001
+        info['column_idx'], info['filter_criteria'], info['evidence_criteria'] = '0;2', '1-0;dedup;desc', 'None'
+        edge_data = self.master_edge_list.data_reader(file_path, 't')
+        edge_data = self.master_edge_list.filter_data(edge_data, '1-0;dedup;desc', 'None')
+        edge_data = self.master_edge_list.data_reducer(info['column_idx'], edge_data)
+        streamed_data = self.master_edge_list.streams_edge_data('gene-disease', chunk_size=1); os.remove(file_path)
+        self.assertEqual(edge_data.values.tolist(), [['g2', 'd3'], ['g1', 'd2']])
+        self.assertEqual(streamed_data.values.tolist(), edge_data.values.tolist())
+
+        return None
+
+    def tests_creates_knowledge_graph_edges_memory_limit(self):
+        """Tests the creates_knowledge_graph_edges method when sources are streamed to stay under a memory limit."""
+
+        self.master_edge_list.creates_knowledge_graph_edges('gene-disease')
+        edges = self.master_edge_list.source_info['gene-disease']['edge_list']
+        self.master_edge_list.memory_limit = 0.0001
+        self.master_edge_list.creates_knowledge_graph_edges('gene-disease')
+        self.assertEqual(self.master_edge_list.source_info['gene-disease']['edge_list'], edges)
+        self.assertTrue(len(glob.glob(self.dir_loc + '/edge_data/tmp*')) == 0)
+
+        return None
+
+    def tests_gets_edge_type_fingerprint(self):
+        """Tests the gets_edge_type_fingerprint method."""
+
+        fingerprint = self.master_edge_list.gets_edge_type_fingerprint('chemical-disease')
+        self.assertIsInstance(fingerprint, str)
+        self.assertEqual(fingerprint, self.master_edge_list.gets_edge_type_fingerprint('chemical-disease'))
+        self.assertNotEqual(fingerprint, self.master_edge_list.gets_edge_type_fingerprint('gene-disease'))
+
+        # change the resource_info row
+        self.master_edge_list.source_info['chemical-disease']['filter_criteria'] = '5;==;1'
+        self.assertNotEqual(fingerprint, self.master_edge_list.gets_edge_type_fingerprint('chemical-disease'))
+
+        return None
+
+    def tests_constructs_edge_list_incremental(self):
+        """Tests the constructs_edge_list method when only stale edge types are rebuilt."""
+
+        # create output from a previous run where both edge types are unchanged
+        file_loc = self.dir_loc + '/resource_info.txt'
+        edge_list = CreatesEdgeList(data_files=self.edge_data_files, source_file=file_loc)
+        fingerprints = {x: edge_list.gets_edge_type_fingerprint(x) for x in self.edge_data_files.keys()}
+        previous = {x: dict(edge_list.source_info[x], edge_list=[['CHEBI_1', 'DOID_1']]) for x in fingerprints}
+        with open(self.dir_loc + '/Master_Edge_List_Fingerprints.json', 'w') as f: json.dump(fingerprints, f)
+        with open(self.dir_loc + '/Master_Edge_List_Dict.json', 'w') as f: json.dump(previous, f)
+
+        # test method
+        self.master_edge_list.runs_creates_knowledge_graph_edges(file_loc, self.edge_data_files, 1, True)
+        with open(self.dir_loc + '/Master_Edge_List_Dict.json', 'r') as f: master_edges = json.load(f)
+        self.assertEqual(master_edges, json.loads(json.dumps(previous)))
+        with open(self.dir_loc + '/Master_Edge_List_Fingerprints.json', 'r') as f:
+            self.assertEqual(json.load(f), fingerprints)
+
+        return None
+
+    def tests_constructs_edge_list_incremental_missing_edges(self):
+        """Tests the constructs_edge_list method when an unchanged edge type is missing from the previous edge list."""
+
+        # create output from a previous run where the unchanged gene-disease edges were not written
+        file_loc = self.dir_loc + '/resource_info.txt'
+        edge_list = CreatesEdgeList(data_files=self.edge_data_files, source_file=file_loc)
+        fingerprints = {x: edge_list.gets_edge_type_fingerprint(x) for x in self.edge_data_files.keys()}
+        previous = {'chemical-disease': dict(edge_list.source_info['chemical-disease'],
+                                             edge_list=[['CHEBI_1', 'DOID_1']])}
+        with open(self.dir_loc + '/Master_Edge_List_Fingerprints.json', 'w') as f: json.dump(fingerprints, f)
+        with open(self.dir_loc + '/Master_Edge_List_Dict.json', 'w') as f: json.dump(previous, f)
+
+        # test method
+        self.master_edge_list.runs_creates_knowledge_graph_edges(file_loc, self.edge_data_files, 1, True)
+        with open(self.dir_loc + '/Master_Edge_List_Dict.json', 'r') as f: master_edges = json.load(f)
+        self.assertEqual(master_edges['chemical-disease'], json.loads(json.dumps(previous['chemical-disease'])))
+        with open(self.dir_loc + '/Master_Edge_List_Build_Report.json', 'r') as f: report = json.load(f)
+        self.assertEqual([x['stage'] for x in report], ['edge_type_fingerprints', 'reuse_previous_edges',
+                                                        'edge_construction', 'write_master_edge_list'])
+        self.assertEqual(report[1]['edge_types'], 1)
 
         return None
 
     def tearDown(self):
         warnings.simplefilter('default', ResourceWarning)
 
+        if os.path.exists(self.dir_loc + '/Master_Edge_List_Fingerprints.json'):
+            os.remove(self.dir_loc + '/Master_Edge_List_Fingerprints.json')
+        for report in glob.glob(self.dir_loc + '/Master_Edge_List_Build_Report.*'): os.remove(report)
+
+        store = self.dir_loc + '/Master_Edge_List_Store'
+        if os.path.exists(store): shutil.rmtree(store)
+
         shutil.copyfile(self.dir_loc + '/edge_data/Master_Edge_List_Dict.json',
                         self.dir_loc + '/Master_Edge_List_Dict.json')
 
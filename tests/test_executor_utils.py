@@ -0,0 +1,178 @@
+import concurrent.futures
+import numpy as np
+import os
+import os.path
+import ray
+import shutil
+import sys
+import tempfile
+import unittest
+
+from mock import patch
+
+from pkt_kg.utils import *
+
+
+class Counter(object):
+    """Actor class used to test the executors."""
+
+    def __init__(self, start, values=None):
+        self.count, self.values = start, values
+
+    def increments(self, n=1):
+        self.count += n; return self.count
+
+    def values_getter(self):
+        return self.values
+
+    def writeable_getter(self):
+        return self.values.flags.writeable
+
+    def writes_lines(self, lines):
+        [self.values.writes_lines.remote(x) for x in lines]; return len(lines)
+
+
+def sums_values(values):
+    """Task function used to test the executors."""
+
+    return sum(values)
+
+
+def reads_shared_array(ref):
+    """Task function used to test that the arrays of a SharedMemoryRef are read-only views of the shared memory."""
+
+    obj = ref.resolves()
+
+    return obj['edge_list'].flags.writeable, obj['edge_list'].ctypes.data % 64, int(obj['edge_list'].sum())
+
+
+def reads_array(array):
+    """Task function used to test that the references passed to a task are resolved by the task."""
+
+    return array.flags.writeable, int(array.sum())
+
+
+class TestExecutorUtils(unittest.TestCase):
+    """Class to test the parallel execution utility methods."""
+
+    def setUp(self):
+        # set-up environment - make temp directory
+        self.dir_loc = tempfile.mkdtemp()
+
+        return None
+
+    def test_gets_executor(self):
+        """Tests the gets_executor method."""
+
+        with patch.dict(os.environ, {'PKT_EXECUTOR': 'ray'}):
+            self.assertIsInstance(gets_executor(), RayExecutor)
+        with patch.dict(os.environ, {'PKT_EXECUTOR': 'LOCAL'}):
+            executor = gets_executor()
+            self.assertIsInstance(executor, LocalExecutor)
+            self.assertIs(gets_executor(), executor)
+        with patch.dict(os.environ, {'PKT_EXECUTOR': 'dask'}):
+            self.assertRaises(ValueError, gets_executor)
+        with patch.object(sys, 'version_info', (3, 6, 2)):
+            self.assertRaises(ValueError, LocalExecutor)
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsInstance(gets_executor(), RayExecutor)
+
+        return None
+
+    def test_local_executor_puts(self):
+        """Tests the puts and gets methods of the LocalExecutor class."""
+
+        executor = LocalExecutor(); obj = {'edge_list': np.arange(10), 'uri': ['a', 'b']}
+        ref = executor.puts(obj); name = ref.name
+        self.assertIsInstance(ref, SharedMemoryRef)
+        self.assertEqual(executor.gets(ref)['uri'], ['a', 'b'])
+        self.assertTrue(np.array_equal(resolves_reference(ref)['edge_list'], np.arange(10)))
+        self.assertEqual(executor.gets([ref, 5])[1:], [5])
+
+        # test that the arrays are stored out-of-band and are not copied by the processes that read them
+        self.assertEqual(len(ref.buffers), 1); self.assertEqual(ref.buffers[0][1], np.arange(10).nbytes)
+        self.assertTrue(resolves_reference(ref)['edge_list'].flags.writeable)  # the owner gets a copy
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
+            self.assertEqual(pool.submit(reads_shared_array, ref).result(), (False, 0, 45))
+
+        # test that the shared memory block is removed with the reference
+        del ref
+        self.assertFalse(os.path.exists('/dev/shm/' + name.lstrip('/')))
+
+        return None
+
+    def test_local_actor(self):
+        """Tests the LocalActor class and the creates_actor and waits methods of the LocalExecutor class."""
+
+        executor = LocalExecutor(); ref = executor.puts([1, 2, 3])
+        actor = executor.creates_actor(Counter, 10, ref)
+        futures = [actor.increments.remote(x) for x in range(1, 5)]
+        self.assertIsInstance(futures[0], concurrent.futures.Future)
+        done, pending = executor.waits(futures, num_returns=2)
+        self.assertEqual(len(done), 2); self.assertEqual(len(done) + len(pending), 4)
+        self.assertEqual(executor.gets(futures), [11, 13, 16, 20])  # calls run in order
+        self.assertEqual(executor.gets(actor.values_getter.remote()), [1, 2, 3])  # arguments are resolved
+        self.assertNotEqual(executor.gets(actor.pool.submit(os.getpid)), os.getpid())
+        actor.shutdown()
+
+        # test that the arrays of an actor's arguments are shared, although the actor's process is forked
+        ref = executor.puts(np.arange(10)); actor = executor.creates_actor(Counter, 0, ref)
+        self.assertFalse(executor.gets(actor.writeable_getter.remote())); actor.shutdown()
+        self.assertTrue(os.path.exists('/dev/shm/' + ref.name.lstrip('/')))
+
+        return None
+
+    def test_shared_file_writer(self):
+        """Tests the SharedFileWriter class."""
+
+        executor = LocalExecutor(); filepath = self.dir_loc + '/triples.nt'
+        writer = executor.creates_file_writer(None, filepath)
+        actors = [executor.creates_actor(Counter, 0, writer) for _ in range(2)]
+        lines = [['<a{}> <b> <c{}> .\n'.format(i, j) for j in range(100)] for i in range(2)]
+        results = executor.gets([actors[i].writes_lines.remote(lines[i]) for i in range(2)])
+        self.assertEqual(results, [100, 100])
+        self.assertEqual(executor.gets(writer.closes.remote()), 200)
+        with open(filepath, 'r') as f: written = f.readlines()
+        self.assertEqual(sorted(written), sorted(lines[0] + lines[1]))
+        self.assertRaises(AttributeError, getattr, writer, 'flushes')
+
+        return None
+
+    def test_local_executor_submits(self):
+        """Tests the submits method of the LocalExecutor class."""
+
+        executor = LocalExecutor()
+        futures = [executor.submits(sums_values, executor.puts([x, x])) for x in range(3)]
+        self.assertEqual(executor.gets(futures), [0, 2, 4])
+
+        # test the task reads the array from shared memory (the driver would have resolved it to a writeable copy)
+        ref = executor.puts(np.arange(10))
+        with patch.object(SharedMemoryRef, 'resolves', side_effect=AssertionError):
+            future = executor.submits(reads_array, ref)
+        self.assertEqual(executor.gets(future), (False, 45))
+        executor.shutdown(); self.assertIsNone(executor.pool)
+
+        return None
+
+    def test_ray_executor(self):
+        """Tests the RayExecutor class."""
+
+        executor = RayExecutor(); ray.init(local_mode=True, ignore_reinit_error=True); executor.starts()
+        ref = executor.puts([1, 2, 3])
+        self.assertIsInstance(ref, ray.ObjectRef)
+        self.assertEqual(resolves_reference(ref), [1, 2, 3])
+        actor = executor.creates_actor(Counter, 10, ref)
+        futures = [actor.increments.remote(x) for x in range(1, 3)]
+        done, pending = executor.waits(futures, num_returns=2)
+        self.assertEqual(len(done), 2); self.assertEqual(len(pending), 0)
+        self.assertEqual(executor.gets(futures), [11, 13])
+        self.assertEqual(executor.gets(executor.submits(sums_values, ref)), 6)
+        executor.shutdown()
+
+        return None
+
+    def tearDown(self):
+        # remove temp directory
+        shutil.rmtree(self.dir_loc)
+
+        return None
@@ -611,6 +611,40 @@ class TestKGUtils(unittest.TestCase):
 
         return None
 
+    def test_encodes_triples(self):
+        """Tests the encodes_triples method."""
+
+        graph = Graph(); graph.add((obo.HP_0000001, RDFS.subClassOf, obo.HP_0000002))
+        graph.add((BNode('N1'), RDFS.label, Literal('bnode')))
+        triples = {(obo.HP_0000001, RDFS.subClassOf, obo.HP_0000003)}
+
+        # test method
+        encoded = encodes_triples([graph, triples, set()])
+        self.assertIsInstance(encoded['terms'], List)
+        self.assertEqual(len(encoded['terms']), 7)  # shared terms are stored once
+        self.assertEqual([x.shape for x in encoded['triples']], [(2, 3), (1, 3), (0, 3)])
+        self.assertEqual({tuple(encoded['terms'][i] for i in x) for x in encoded['triples'][0].tolist()}, set(graph))
+        self.assertEqual({tuple(encoded['terms'][i] for i in x) for x in encoded['triples'][1].tolist()}, triples)
+
+        return None
+
+    def test_merges_encoded_triples(self):
+        """Tests the merges_encoded_triples method."""
+
+        graph1 = Graph(); graph1.add((obo.HP_0000001, RDFS.subClassOf, obo.HP_0000002))
+        graph2 = Graph(); graph2.add((obo.HP_0000001, RDFS.subClassOf, obo.HP_0000002))
+        graph2.add((obo.HP_0000002, RDFS.subClassOf, obo.HP_0000003))
+        encoded = (encodes_triples([x, x]) for x in [graph1, graph2])
+
+        # test method
+        merged = merges_encoded_triples(encoded, [{(obo.HP_0000004, RDF.type, OWL.Class)}, Graph()])
+        self.assertIsInstance(merged[0], Set)
+        self.assertIsInstance(merged[1], Graph)
+        self.assertEqual(merged[0], set(graph2) | {(obo.HP_0000004, RDF.type, OWL.Class)})
+        self.assertEqual(set(merged[1]), set(graph2))
+
+        return None
+
     def test_appends_to_existing_file(self):
         """Tests the appends_to_existing_file method"""
 
@@ -775,3 +809,37 @@ class TestKGUtils(unittest.TestCase):
                           RDFS.subClassOf, URIRef('http://www.ncbi.nlm.nih.gov/gene/4841'))) in result_graph)
 
         return None
+
+    def test_indexed_graph(self):
+        """Tests the IndexedGraph class."""
+
+        graph = Graph(); bnode = BNode('N1234'); literal = Literal('1', datatype=URIRef('http://x.org/int'))
+        graph.add((obo.SO_0000001, RDF.type, OWL.Class)); graph.add((obo.SO_0000001, RDFS.subClassOf, bnode))
+        graph.add((bnode, RDF.type, OWL.Restriction)); graph.add((bnode, OWL.someValuesFrom, obo.SO_0000002))
+        graph.add((obo.SO_0000002, RDFS.label, Literal('gene', lang='en')))
+        graph.add((bnode, OWL.cardinality, literal))
+        indexed_graph = IndexedGraph(graph)
+
+        # test the graph's triples
+        self.assertEqual(len(indexed_graph), 6); self.assertEqual(set(indexed_graph), set(graph))
+        for node in set(graph.subjects()):
+            self.assertEqual(list(indexed_graph.triples((node, None, None))), list(graph.triples((node, None, None))))
+        self.assertIn((obo.SO_0000001, RDF.type, OWL.Class), indexed_graph)
+        self.assertNotIn((obo.SO_0000001, RDF.type, obo.SO_0000002), indexed_graph)
+        self.assertNotIn((obo.SO_0000003, None, None), indexed_graph)
+
+        # test the graph's terms
+        self.assertEqual(set(indexed_graph.objects(bnode)), {OWL.Restriction, obo.SO_0000002, literal})
+        self.assertEqual(list(indexed_graph.objects(bnode, OWL.cardinality)), [literal])
+        self.assertIsInstance(list(indexed_graph.objects(obo.SO_0000001, RDFS.subClassOf))[0], BNode)
+        self.assertEqual(list(indexed_graph.objects(obo.SO_0000002))[0].language, 'en')
+        self.assertEqual(list(indexed_graph.subjects(RDF.type, OWL.Restriction)), [bnode])
+        self.assertEqual(set(indexed_graph.predicates(obo.SO_0000001)), {RDF.type, RDFS.subClassOf})
+        self.assertEqual(indexed_graph.gets_term(indexed_graph.gets_term_id(literal)), literal)
+        self.assertEqual(indexed_graph.gets_term_id(Literal('1')), -1)
+
+        # test that the graph is read from its arrays after it is pickled (i.e. when it is shared)
+        shared_graph = LocalExecutor.puts(indexed_graph).resolves()
+        self.assertEqual(len(shared_graph.terms), 0); self.assertEqual(set(shared_graph), set(graph))
+
+        return None
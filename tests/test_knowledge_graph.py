@@ -2,6 +2,7 @@ import glob
 import json
 import logging
 import networkx  # type: ignore
+import numpy
 import os
 import os.path
 import pandas
@@ -18,6 +19,7 @@ from rdflib.namespace import OWL, RDF, RDFS
 from typing import Dict, List
 
 from pkt_kg.__version__ import __version__
+from pkt_kg.construction_approaches import KGConstructionApproach
 from pkt_kg.knowledge_graph import FullBuild, PartialBuild, PostClosureBuild
 from pkt_kg.metadata import Metadata
 from pkt_kg.utils import *
@@ -168,7 +170,7 @@ class TestKGBuilder(unittest.TestCase):
                 'inverse_dict': self.kg_subclass.inverse_relations_dict, 'node_data': self.kg_subclass.node_data,
                 'ont_cls': self.kg_subclass.ont_classes, 'metadata': None, 'obj_props': self.kg_subclass.obj_properties,
                 'write_loc': self.kg_subclass.write_location}
-        self.inner_class = self.kg_subclass.EdgeConstructor(args)
+        self.inner_class = self.kg_subclass.EdgeConstructor(args); self.inner_class_args = args
 
         # get release
         self.current_release = 'v' + __version__
@@ -323,6 +325,20 @@ class TestKGBuilder(unittest.TestCase):
 
         return None
 
+    def test_class_initialization_edgelist_store(self):
+        """Tests the class initialization for edge_list inputs when a columnar edge list store is available."""
+
+        converts_edge_list_json_to_store(self.dir_loc_resources + '/Master_Edge_List_Dict.json',
+                                         self.dir_loc_resources + '/Master_Edge_List_Store')
+        kg = FullBuild('subclass', 'yes', 'yes', 'yes', 1, self.write_location)
+        self.assertEqual(kg.edge_data, self.dir_loc_resources + '/Master_Edge_List_Store')
+        self.assertIsNone(kg._edge_dict)  # the edges are only loaded when they are first used
+        self.assertIsInstance(kg.edge_dict['gene-phenotype']['edge_list'], numpy.ndarray)
+        self.assertTrue(len(kg.edge_dict['gene-phenotype']['edge_list']) == 10)
+        self.assertEqual(kg.edge_dict['gene-phenotype']['uri'], self.kg_subclass.edge_dict['gene-phenotype']['uri'])
+
+        return None
+
     def test_class_initialization_node_metadata(self):
         """Tests the class initialization for node metadata inputs."""
 
@@ -437,6 +453,151 @@ class TestKGBuilder(unittest.TestCase):
 
         return None
 
+    def test_verifies_object_property_registry(self):
+        """Tests the verifies_object_property method updates the object property registry and counters."""
+
+        obj_props = {URIRef('http://purl.obolibrary.org/obo/RO_0002566')}
+        inner_class = self.kg_subclass.EdgeConstructor({**self.inner_class_args, 'obj_props': obj_props})
+
+        # check existing and new relations
+        inner_class.verifies_object_property(URIRef('http://purl.obolibrary.org/obo/RO_0002566'))
+        self.assertEqual(len(inner_class.graph), 0)
+        for _ in range(3): inner_class.verifies_object_property(URIRef('http://purl.obolibrary.org/obo/RO_0002200'))
+        self.assertEqual(len(inner_class.graph), 1)
+        self.assertIn(URIRef('http://purl.obolibrary.org/obo/RO_0002200'), inner_class.obj_properties)
+        self.assertEqual(len(obj_props), 1)  # input set is not modified
+        self.assertEqual(inner_class.counters_getter(), {'object_properties_checked': 4, 'object_properties_added': 1})
+
+        return None
+
+    def test_creates_edge_constructor_params(self):
+        """Tests the creates_edge_constructor_params method."""
+
+        meta = Metadata(self.kg_subclass.kg_version, self.kg_subclass.write_location, self.kg_subclass.full_kg,
+                        None, {'nodes': {'http://www.ncbi.nlm.nih.gov/gene/2': {'Label': 'A2'},
+                                         'http://www.ncbi.nlm.nih.gov/gene/99': {'Label': 'A99'}}, 'relations': {}})
+        self.kg_subclass.edge_dict = {k: v for k, v in self.kg_subclass.edge_dict.items() if 'edge_list' in v.keys()}
+        args = {**self.inner_class_args, 'ont_cls': {URIRef('http://purl.obolibrary.org/obo/SO_0000162')},
+                'metadata': meta.creates_node_metadata}
+        ray.init(local_mode=True, ignore_reinit_error=True)
+        edges, params = self.kg_subclass.creates_edge_constructor_params(args, meta)
+
+        # check parameters and inner class
+        self.assertEqual(len(edges), len(params))
+        self.assertIsInstance(params[0]['ont_cls'], ray.ObjectRef)
+        inner_class = self.kg_subclass.EdgeConstructor(params[0])
+        self.assertEqual(set(inner_class.edge_dict.keys()), set(x[0] for x in edges[0]))
+        self.assertIsInstance(inner_class.ont_classes, numpy.ndarray)
+        self.assertTrue(inner_class.contains_classes([URIRef('http://purl.obolibrary.org/obo/SO_0000162')]))
+        self.assertFalse(inner_class.contains_classes([URIRef('http://purl.obolibrary.org/obo/SO_0000163')]))
+        node_metadata = inner_class.node_metadata_func.__self__.node_dict['nodes']
+        self.assertNotIn('http://www.ncbi.nlm.nih.gov/gene/99', node_metadata)
+        self.assertEqual(set(inner_class.inverse_rels.keys()), set(inner_class.edge_dict.keys()))
+        ray.shutdown()
+
+        return None
+
+    def test_plans_edge_construction(self):
+        """Tests the plans_edge_construction method."""
+
+        self.kg_subclass.edge_dict = {k: v for k, v in self.kg_subclass.edge_dict.items() if 'edge_list' in v.keys()}
+        self.kg_subclass.cpus = 4; args = {'ont_cls': {URIRef('http://purl.obolibrary.org/obo/SO_0000162')}}
+        plan = self.kg_subclass.plans_edge_construction(args)
+        self.assertEqual(plan['stage'], 'edge_construction')
+        self.assertEqual(plan['planned_workers'], 4)
+        self.assertIsNone(plan['memory_budget_mb'])
+        self.assertEqual(self.kg_subclass.memory_plans, [plan])
+
+        # a budget that only fits the driver and one actor
+        self.kg_subclass.memory_budget = plan['estimated_peak_mb'] - 3 * plan['estimated_worker_mb']
+        self.assertEqual(self.kg_subclass.plans_edge_construction(args)['planned_workers'], 1)
+        self.kg_subclass.memory_budget = 1.0
+        plan = self.kg_subclass.plans_edge_construction(args)
+        self.assertEqual(plan['planned_workers'], 1); self.assertTrue(plan['over_budget'])
+
+        return None
+
+    def test_creates_new_edges_shards(self):
+        """Tests the creates_new_edges method returns the same edges, errors, and statistics when edge types are split
+        into shards."""
+
+        self.kg_subclass.reverse_relation_processor()
+        self.kg_subclass.graph = Graph().parse(self.dir_loc + '/ontologies/so_with_imports.owl')
+        self.kg_subclass.obj_properties = gets_object_properties(self.kg_subclass.graph)
+        self.kg_subclass.ont_classes = gets_ontology_classes(self.kg_subclass.graph)
+        meta = Metadata(self.kg_subclass.kg_version, self.kg_subclass.write_location, self.kg_subclass.full_kg,
+                        None, None)
+        full_kg_owl = '_'.join(self.kg_subclass.full_kg.split('_')[0:-1]) + '_OWL.owl'
+        args = {**self.inner_class_args, 'kg_owl': full_kg_owl, 'metadata': meta.creates_node_metadata,
+                'node_data': None, 'ont_cls': self.kg_subclass.ont_classes,
+                'obj_props': self.kg_subclass.obj_properties}
+        edge_types = [k for k, v in self.kg_subclass.edge_dict.items() if 'edge_list' in v.keys()]
+
+        # test method
+        inner_class = self.kg_subclass.EdgeConstructor(args)
+        for edge_type in edge_types:
+            with patch('builtins.print') as mock_print: inner_class.creates_new_edges(edge_type)
+            if edge_type == 'gene-phenotype': stats = mock_print.call_args[0][0]
+        self.assertEqual(inner_class.edge_stats, dict())
+        inner_classes = [self.kg_subclass.EdgeConstructor(args) for _ in range(2)]
+        shards = shards_edge_lists({k: len(self.kg_subclass.edge_dict[k]['edge_list']) for k in edge_types}, 8, 1)
+        for i, shard in enumerate(shards.keys()): inner_classes[i % 2].creates_new_edges(shard[0], shard[1:])
+        self.assertEqual(set(inner_class.graph), set(inner_classes[0].graph) | set(inner_classes[1].graph))
+        self.assertEqual(set(inner_class.clean_graph),
+                         set(inner_classes[0].clean_graph) | set(inner_classes[1].clean_graph))
+        errors = [x.error_dict_getter() for x in inner_classes]
+        self.assertEqual(inner_class.error_dict, KGConstructionApproach.merges_subclass_errors(errors))
+        shard_stats = sum([x.edge_stats_getter().get('gene-phenotype', []) for x in inner_classes], [])
+        self.assertEqual(len(shard_stats), len([x for x in shards.keys() if x[0] == 'gene-phenotype']))
+        self.assertTrue(len(shard_stats) > 1)
+        self.assertIn(self.kg_subclass.EdgeConstructor.merges_edge_statistics('gene-phenotype', shard_stats), stats)
+
+        return None
+
+    def test_creates_new_edges_edge_list_store(self):
+        """Tests the creates_new_edges method returns the same edges when the edge lists are memory-mapped from the
+        edge list store."""
+
+        self.kg_subclass.reverse_relation_processor()
+        self.kg_subclass.graph = Graph().parse(self.dir_loc + '/ontologies/so_with_imports.owl')
+        self.kg_subclass.obj_properties = gets_object_properties(self.kg_subclass.graph)
+        self.kg_subclass.ont_classes = gets_ontology_classes(self.kg_subclass.graph)
+        meta = Metadata(self.kg_subclass.kg_version, self.kg_subclass.write_location, self.kg_subclass.full_kg,
+                        None, None)
+        full_kg_owl = '_'.join(self.kg_subclass.full_kg.split('_')[0:-1]) + '_OWL.owl'
+        args = {**self.inner_class_args, 'kg_owl': full_kg_owl, 'metadata': meta.creates_node_metadata,
+                'node_data': None, 'ont_cls': self.kg_subclass.ont_classes, 'batch_size': 3,
+                'obj_props': self.kg_subclass.obj_properties, 'rel_dict': self.kg_subclass.relations_dict,
+                'inverse_dict': self.kg_subclass.inverse_relations_dict}
+        edge_types = [k for k, v in self.kg_subclass.edge_dict.items() if 'edge_list' in v.keys()]
+        writes_edge_list_store(self.kg_subclass.edge_dict, self.dir_loc_resources + '/Master_Edge_List_Store')
+        edge_store = reads_edge_list_store(self.dir_loc_resources + '/Master_Edge_List_Store')
+
+        # test method
+        inner_class = self.kg_subclass.EdgeConstructor(args)
+        store_class = self.kg_subclass.EdgeConstructor({**args, 'edge_dict': edge_store})
+        for edge_type in edge_types:
+            with patch('builtins.print'): inner_class.creates_new_edges(edge_type)
+            with patch('builtins.print'): store_class.creates_new_edges(edge_type)
+        self.assertIsInstance(store_class.edge_dict['gene-gene']['edge_list'], numpy.memmap)
+        self.assertEqual(set(inner_class.graph), set(store_class.graph))
+        self.assertEqual(set(inner_class.clean_graph), set(store_class.clean_graph))
+
+        # test shards use the inverse relations determined by the driver instead of checking the whole edge list
+        inverse_rels = {k: self.kg_subclass.EdgeConstructor.gets_inverse_relation(
+            edge_store[k]['edge_relation'], edge_store[k]['edge_list'], args['inverse_dict'], args['rel_dict'])
+            for k in edge_types}
+        shard_class = self.kg_subclass.EdgeConstructor({**args, 'edge_dict': edge_store, 'inverse_rels': inverse_rels})
+        with patch.object(shard_class, 'checks_relations') as checks_relations:
+            for edge_type in edge_types:
+                n = len(edge_store[edge_type]['edge_list'])
+                for shard in [(0, n // 2), (n // 2, n)]:
+                    with patch('builtins.print'): shard_class.creates_new_edges(edge_type, shard)
+        checks_relations.assert_not_called()
+        self.assertEqual(set(inner_class.graph), set(shard_class.graph))
+
+        return None
+
     def test_checks_classes(self):
         """Tests the checks_classes method for class-class edges."""
 
@@ -490,6 +651,29 @@ class TestKGBuilder(unittest.TestCase):
 
         return None
 
+    def test_checks_batch_classes(self):
+        """Tests the checks_batch_classes method."""
+
+        edges = [['CHEBI_81395', 'DOID_12858'], ['CHEBI_81395', 'DOID_1'], ['CHEBI_1', 'DOID_12858']]
+        classes = [URIRef('http://purl.obolibrary.org/obo/CHEBI_81395'),
+                   URIRef('http://purl.obolibrary.org/obo/DOID_12858')]
+        edge_info = {'n1': 'class', 'n2': 'class', 'rel': 'RO_0003302', 'inv_rel': None,
+                     'uri': ['http://purl.obolibrary.org/obo/', 'http://purl.obolibrary.org/obo/']}
+
+        # test class-class edges with a set and a hash set of classes
+        for ont_classes in [set(classes), builds_hash_set(classes)]:
+            self.inner_class.ont_classes = ont_classes
+            self.assertEqual(self.inner_class.checks_batch_classes(edge_info, edges).tolist(), [True, False, False])
+            self.assertEqual(self.inner_class.checks_batch_classes(edge_info, []).tolist(), [])
+
+        # test entity-class and entity-entity edges
+        edge_info['n1'] = 'entity'
+        self.assertEqual(self.inner_class.checks_batch_classes(edge_info, edges).tolist(), [True, False, True])
+        edge_info['n2'] = 'entity'
+        self.assertEqual(self.inner_class.checks_batch_classes(edge_info, edges).tolist(), [True, True, True])
+
+        return None
+
     def test_checks_relations(self):
         """Tests the checks_relations method."""
 
@@ -511,6 +695,20 @@ class TestKGBuilder(unittest.TestCase):
         rel2_check = self.inner_class.checks_relations('RO_0002435', edge_list2)
         self.assertEqual(rel2_check, 'RO_0002435')
 
+        # test 3 - edge list store arrays are checked in batches
+        self.inner_class.batch_size = 3
+        edge_list3 = numpy.array(self.inner_class.edge_dict['gene-gene']['edge_list'], dtype=str)
+        self.assertEqual(self.inner_class.checks_relations('RO_0002435', edge_list3), 'RO_0002435')
+        edge_list4 = numpy.concatenate([edge_list3, edge_list3[:, ::-1]])
+        self.assertIsNone(self.inner_class.checks_relations('RO_0002435', edge_list4))
+
+        # test 4 - the driver determines the inverse relations without verifying them in the graph
+        inverse_rel = self.kg_subclass.EdgeConstructor.gets_inverse_relation
+        self.assertEqual(inverse_rel('RO_0002435', edge_list3, {}, self.kg_subclass.relations_dict, 3), 'RO_0002435')
+        self.assertIsNone(inverse_rel('RO_0002435', edge_list4, {}, self.kg_subclass.relations_dict, 3))
+        self.assertEqual(inverse_rel('RO_0003302', edge_list1, {'RO_0003302': 'RO_0003303'}, None), 'RO_0003303')
+        self.assertIsNone(inverse_rel('RO_0003302', edge_list1, {}, None))
+
         return None
 
     def test_gets_edge_statistics(self):
@@ -588,6 +786,37 @@ class TestKGBuilder(unittest.TestCase):
 
         return None
 
+    def test_creates_new_edges_batch_size(self):
+        """Tests the creates_new_edges method returns the same edges regardless of the batch size."""
+
+        self.kg_subclass.reverse_relation_processor()
+        self.kg_subclass.graph = Graph().parse(self.dir_loc + '/ontologies/so_with_imports.owl')
+        self.kg_subclass.obj_properties = gets_object_properties(self.kg_subclass.graph)
+        self.kg_subclass.ont_classes = gets_ontology_classes(self.kg_subclass.graph)
+        self.kg_subclass.node_dict, self.kg_subclass.node_data = None, None
+        meta = Metadata(self.kg_subclass.kg_version, self.kg_subclass.write_location, self.kg_subclass.full_kg,
+                        self.kg_subclass.node_data, self.kg_subclass.node_dict)
+        full_kg_owl = '_'.join(self.kg_subclass.full_kg.split('_')[0:-1]) + '_OWL.owl'
+        args = {'construction': self.kg_subclass.construct_approach, 'edge_dict': self.kg_subclass.edge_dict,
+                'kg_owl': full_kg_owl, 'rel_dict': self.kg_subclass.relations_dict,
+                'metadata': meta.creates_node_metadata, 'inverse_dict': self.kg_subclass.inverse_relations_dict,
+                'node_data': self.kg_subclass.node_data, 'ont_cls': self.kg_subclass.ont_classes, 'obj_props':
+                    self.kg_subclass.obj_properties, 'write_loc': self.kg_subclass.write_location}
+
+        # test method
+        graphs = []
+        for batch_size in [1, None]:
+            inner_class = self.kg_subclass.EdgeConstructor({**args, 'batch_size': batch_size})
+            for edge_type in [k for k, v in self.kg_subclass.edge_dict.items() if 'edge_list' in v.keys()]:
+                inner_class.creates_new_edges(edge_type)
+            graphs += [inner_class.graph_getter()]
+        self.assertEqual(inner_class.batch_size, 10000)
+        self.assertEqual(set(graphs[0][0]), set(graphs[1][0]))
+        self.assertEqual(set(graphs[0][1]), set(graphs[1][1]))
+        self.assertEqual(len(self.kg_subclass.edge_dict['gene-phenotype']['edge_list']), 10)  # not modified
+
+        return None
+
     def test_creates_new_edges_adding_metadata_to_kg(self):
         """Tests the creates_new_edges method and adds node metadata to the KG."""
 
@@ -770,6 +999,129 @@ class TestKGBuilder(unittest.TestCase):
 
         return None
 
+    def test_gets_input_fingerprint(self):
+        """Tests the gets_input_fingerprint method."""
+
+        fingerprint = self.kg_subclass.gets_input_fingerprint()
+        self.assertEqual(fingerprint, self.kg_subclass.gets_input_fingerprint())
+        self.assertNotEqual(fingerprint, self.kg_instance.gets_input_fingerprint())
+
+        # updating an input file changes the fingerprint, updating the node metadata does not
+        with open(self.dir_loc_resources + '/node_data/node_metadata_dict.pkl', 'ab') as f: f.write(b'\n')
+        self.assertEqual(fingerprint, self.kg_subclass.gets_input_fingerprint())
+        with open(self.dir_loc_resources + '/relations_data/RELATIONS_LABELS.txt', 'a') as f: f.write('\n')
+        self.assertNotEqual(fingerprint, self.kg_subclass.gets_input_fingerprint())
+
+        return None
+
+    def test_checkpoints_stage(self):
+        """Tests the checkpoints_stage method."""
+
+        self.assertFalse(self.kg_subclass.resume)
+        self.assertFalse(self.kg_subclass.checkpoint)
+        self.assertTrue(self.kg_subclass.checkpoint_dir.startswith(self.write_location + '/checkpoints/'))
+        artifact = self.write_location + '/artifact.nt'
+        with open(artifact, 'w') as f: f.write('<https://ex.com/1> <https://ex.com/2> <https://ex.com/3> .\n')
+        self.kg_subclass.checkpoints_stage('graph_split', {'value': 1}, [artifact, artifact + '.missing'])
+
+        # verify the manifest and state
+        with open(self.kg_subclass.checkpoint_dir + '/checkpoint_manifest.json') as f: manifest = json.load(f)
+        self.assertEqual(manifest['fingerprint'], self.kg_subclass.gets_input_fingerprint())
+        self.assertEqual(list(manifest['stages'].keys()), ['graph_split'])
+        self.assertEqual(manifest['stages']['graph_split']['files'],
+                         {artifact: {'size': os.path.getsize(artifact), 'md5': gets_file_md5(artifact)}})
+        with open(self.kg_subclass.checkpoint_dir + '/graph_split.pkl', 'rb') as f:
+            self.assertEqual(pickle.load(f), {'value': 1})
+        self.assertEqual(glob.glob(self.kg_subclass.checkpoint_dir + '/*.tmp'), [])
+
+        # add a second stage
+        self.kg_subclass.checkpoints_stage('edges_built', {'value': 2}, [])
+        with open(self.kg_subclass.checkpoint_dir + '/checkpoint_manifest.json') as f: manifest = json.load(f)
+        self.assertEqual(list(manifest['stages'].keys()), ['graph_split', 'edges_built'])
+
+        return None
+
+    def test_loads_checkpoint(self):
+        """Tests the loads_checkpoint method."""
+
+        stages, artifact = ['graph_split', 'edges_built', 'owlnets_decoded'], self.write_location + '/artifact.nt'
+        triple = '<https://ex.com/1> <https://ex.com/2> <https://ex.com/3> .\n'
+        with open(artifact, 'w') as f: f.write(triple)
+        self.kg_subclass.checkpoints_stage('graph_split', {'value': 1}, [artifact])
+        with open(artifact, 'a') as f: f.write(triple)
+        self.kg_subclass.checkpoints_stage('edges_built', {'value': 2}, [artifact])
+        with open(artifact, 'a') as f: f.write(triple)  # appended by an interrupted stage
+
+        # not resuming removes the checkpoints without fingerprinting the inputs
+        with patch.object(self.kg_subclass, 'gets_input_fingerprint') as fingerprint:
+            self.assertEqual(self.kg_subclass.loads_checkpoint(stages), {})
+        fingerprint.assert_not_called()
+        self.assertFalse(os.path.exists(self.kg_subclass.checkpoint_dir))
+
+        # resume from the last stage and truncate its artifact
+        with open(artifact, 'w') as f: f.write(triple)
+        self.kg_subclass.checkpoints_stage('graph_split', {'value': 1}, [artifact])
+        with open(artifact, 'a') as f: f.write(triple)
+        self.kg_subclass.checkpoints_stage('edges_built', {'value': 2}, [artifact])
+        with open(artifact, 'a') as f: f.write(triple)
+        self.kg_subclass.resume = True
+        self.assertEqual(self.kg_subclass.loads_checkpoint(stages), {'stage': 'edges_built', 'state': {'value': 2}})
+        with open(artifact) as f: self.assertEqual(f.read(), triple * 2)
+
+        # fall back to an earlier stage when a later stage's artifact changed
+        with open(artifact + '.owl', 'w') as f: f.write(triple)
+        self.kg_subclass.checkpoints_stage('owlnets_decoded', {'value': 3}, [artifact + '.owl'])
+        with open(artifact + '.owl', 'w') as f: f.write(triple.replace('1', '4'))
+        self.assertEqual(self.kg_subclass.loads_checkpoint(stages), {'stage': 'edges_built', 'state': {'value': 2}})
+        self.assertFalse(os.path.exists(self.kg_subclass.checkpoint_dir + '/owlnets_decoded.pkl'))
+
+        # changed inputs restart the build
+        with open(self.dir_loc_resources + '/relations_data/RELATIONS_LABELS.txt', 'a') as f: f.write('\n')
+        self.assertEqual(self.kg_subclass.loads_checkpoint(stages), {})
+        self.assertFalse(os.path.exists(self.kg_subclass.checkpoint_dir))
+
+        return None
+
+    def test_writes_build_report(self):
+        """Tests the writes_build_report method."""
+
+        self.assertEqual(self.kg_subclass.build_report, [])
+        with tracks_build_stage(self.kg_subclass.build_report, 'relations') as counts:
+            self.kg_subclass.reverse_relation_processor(); counts['relations'] = len(self.kg_subclass.relations_dict)
+        self.kg_subclass.writes_build_report()
+
+        # verify the report files
+        report_file = self.write_location + self.kg_subclass.full_kg[:-4] + '_Build_Report.json'
+        with open(report_file, 'r') as f: report = json.load(f)
+        self.assertEqual([x['stage'] for x in report], ['relations'])
+        self.assertGreater(report[0]['relations'], 0)
+        self.assertTrue(os.path.exists(report_file[:-5] + '.csv'))
+
+        return None
+
+    def tests_triples_writer(self):
+        """Tests the TriplesWriter class and the writes_lines method."""
+
+        logic, anot = self.inner_class.gets_output_files(self.kg_subclass.write_location, '/KG_v2.0.0_OWL.owl')
+        self.assertTrue(logic.endswith('/KG_v2.0.0_OWL_LogicOnly.nt'))
+        self.assertTrue(anot.endswith('/KG_v2.0.0_OWL_AnnotationsOnly.nt'))
+
+        # test writing to a file
+        lines = '<https://ex.com/1> <https://ex.com/2> <https://ex.com/3> .\n' * 3
+        writer = self.kg_subclass.TriplesWriter(logic)
+        writer.writes_lines(lines); writer.writes_lines('')
+        self.assertEqual(writer.closes(), 3)
+        with open(logic) as f: self.assertEqual(f.read(), lines)
+        writer = self.kg_subclass.TriplesWriter(anot, buffer_size=1); writer.writes_lines(lines); writer.closes()
+        with open(anot) as f: self.assertEqual(f.read(), lines)
+
+        # test writes_lines with a file object
+        with open(logic, 'a') as out: self.inner_class.writes_lines(out, lines)
+        with open(logic) as f: self.assertEqual(len(f.readlines()), 6)
+        self.assertEqual(self.inner_class.pending_writes, [])
+
+        return None
+
     def tests_graph_getter(self):
         """Tests graph_getter method."""
 
@@ -782,6 +1134,20 @@ class TestKGBuilder(unittest.TestCase):
 
         return None
 
+    def tests_encoded_graph_getter(self):
+        """Tests encoded_graph_getter method."""
+
+        self.inner_class.graph.add((URIRef('http://purl.obolibrary.org/obo/SO_0000162'), RDF.type, OWL.Class))
+
+        # verify results
+        results = self.inner_class.encoded_graph_getter()
+        self.assertEqual(len(results['triples']), 2)
+        self.assertEqual(merges_encoded_triples([results], [set(), set()]),
+                         [set(self.inner_class.graph), set(self.inner_class.clean_graph)])
+        self.assertEqual(len(self.inner_class.encoded_graph_getter(False)['triples']), 1)
+
+        return None
+
     def tearDown(self):
         warnings.simplefilter('default', ResourceWarning)
 
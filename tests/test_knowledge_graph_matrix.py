@@ -0,0 +1,202 @@
+import glob
+import json
+import logging
+import os
+import os.path
+import pandas
+import pickle
+import shutil
+import unittest
+import warnings
+
+from pkt_kg.knowledge_graph import MatrixBuild
+
+
+class TestMatrixBuild(unittest.TestCase):
+    """Class to test the MatrixBuild class from the knowledge graph script."""
+
+    def setUp(self):
+        warnings.simplefilter('ignore', ResourceWarning)
+
+        # initialize file location
+        current_directory = os.path.dirname(__file__)
+        dir_loc = os.path.join(current_directory, 'data')
+        self.dir_loc = os.path.abspath(dir_loc)
+
+        # set-up environment - make temp directory
+        dir_loc_resources = os.path.join(current_directory, 'resources')
+        self.dir_loc_resources = os.path.abspath(dir_loc_resources)
+        os.mkdir(self.dir_loc_resources)
+        os.mkdir(self.dir_loc_resources + '/knowledge_graphs')
+        os.mkdir(self.dir_loc_resources + '/relations_data')
+        os.mkdir(self.dir_loc_resources + '/node_data')
+        os.mkdir(self.dir_loc_resources + '/ontologies')
+        os.mkdir(self.dir_loc_resources + '/construction_approach')
+        os.mkdir(self.dir_loc_resources + '/owl_decoding')
+
+        # handle logging
+        self.logs = os.path.abspath(current_directory + '/builds/logs')
+        logging.disable(logging.CRITICAL)
+        if len(glob.glob(self.logs + '/*.log')) > 0: os.remove(glob.glob(self.logs + '/*.log')[0])
+
+        # copy needed data data
+        # node metadata
+        shutil.copyfile(self.dir_loc + '/node_data/node_metadata_dict.pkl',
+                        self.dir_loc_resources + '/node_data/node_metadata_dict.pkl')
+        # ontology data
+        shutil.copyfile(self.dir_loc + '/ontologies/empty_hp_with_imports.owl',
+                        self.dir_loc_resources + '/ontologies/hp_with_imports.owl')
+        # merged ontology data
+        shutil.copyfile(self.dir_loc + '/ontologies/so_with_imports.owl',
+                        self.dir_loc_resources + '/knowledge_graphs/PheKnowLator_MergedOntologies.owl')
+        # relations data
+        shutil.copyfile(self.dir_loc + '/RELATIONS_LABELS.txt',
+                        self.dir_loc_resources + '/relations_data/RELATIONS_LABELS.txt')
+        # inverse relations
+        shutil.copyfile(self.dir_loc + '/INVERSE_RELATIONS.txt',
+                        self.dir_loc_resources + '/relations_data/INVERSE_RELATIONS.txt')
+        # empty master edges
+        shutil.copyfile(self.dir_loc + '/Master_Edge_List_Dict_empty.json',
+                        self.dir_loc_resources + '/Master_Edge_List_Dict_empty.json')
+
+        # create edge list
+        edge_dict = {"gene-phenotype": {"data_type": "entity-class",
+                                        "edge_relation": "RO_0003302",
+                                        "uri": ["http://www.ncbi.nlm.nih.gov/gene/",
+                                                "http://purl.obolibrary.org/obo/"],
+                                        "edge_list": [["2", "SO_0000162"], ["2", "SO_0000196"],
+                                                      ["3", "SO_0000323"], ["9", "SO_0001490"],
+                                                      ["10", "SO_0000301"], ["11", "SO_0001560"],
+                                                      ["12", "SO_0001560"], ["17", "SO_0000444"],
+                                                      ["18", "SO_0002138"], ["20", "SO_0000511"]]},
+                     "gene-gene": {"data_type": "entity-entity",
+                                   "edge_relation": "RO_0002435",
+                                   "uri": ["http://www.ncbi.nlm.nih.gov/gene/",
+                                           "http://www.ncbi.nlm.nih.gov/gene/"],
+                                   "edge_list": [["1", "2"], ["2", "3"], ["3", "18"],
+                                                 ["17", "19"], ["4", "17"], ["5", "11"],
+                                                 ["11", "12"], ["4", "5"]]},
+                     "disease-disease": {"data_type": "class-class",
+                                         "edge_relation": "RO_0002435",
+                                         "uri": ["http://www.ncbi.nlm.nih.gov/gene/",
+                                                 "http://www.ncbi.nlm.nih.gov/gene/"],
+                                         "edge_list": [["DOID_3075", "DOID_1080"], ["DOID_3075", "DOID_4267"],
+                                                       ["DOID_4800", "DOID_10190"], ["DOID_4800", "DOID_80219"],
+                                                       ["DOID_2729", "DOID_1962"], ["DOID_2729", "DOID_5096"],
+                                                       ["DOID_8837", "DOID_6774"], ["DOID_8837", "DOID_8754"]]}
+                     }
+
+        # save data
+        with open(self.dir_loc_resources + '/Master_Edge_List_Dict.json', 'w') as filepath:
+            json.dump(edge_dict, filepath)
+
+        # create subclass mapping data
+        subcls_map = {"1": ['SO_0001217'], "2": ['SO_0001217'], "3": ['SO_0001217'], "4": ['SO_0001217'],
+                      "5": ['SO_0001217'], "11": ['SO_0001217'], "12": ['SO_0001217'], "17": ['SO_0001217'],
+                      "18": ['SO_0001217'], "5096": ['SO_0001217'], "6774": ['SO_0001217'], "19": ['SO_0001217']}
+
+        # save data
+        with open(self.dir_loc_resources + '/construction_approach/subclass_construction_map.pkl', 'wb') as f:
+            pickle.dump(subcls_map, f, protocol=4)
+
+        # set write location
+        self.write_location = self.dir_loc_resources + '/knowledge_graphs'
+
+        # build knowledge graph
+        self.kg = MatrixBuild(constructions=['subclass', 'instance'],
+                              node_data='yes',
+                              inverse_relations=['yes', 'no'],
+                              decode_owl='yes',
+                              cpus=1,
+                              write_location=self.write_location)
+
+        # update class attributes
+        dir_loc_owltools = os.path.join(current_directory, 'utils/owltools')
+        self.kg.owl_tools = os.path.abspath(dir_loc_owltools)
+
+        return None
+
+    def test_class_initialization(self):
+        """Tests initialization of the class."""
+
+        # check build type
+        self.assertEqual(self.kg.gets_build_type(), 'Matrix Build')
+        self.assertFalse(self.kg.gets_build_type() == 'Full Build')
+
+        # check variants
+        self.assertEqual(len(self.kg.variants), 4)
+        self.assertEqual(self.kg.variants[0]['construction'], 'subclass')
+        self.assertEqual(self.kg.variants[0]['inverse_relations'], 'yes')
+        self.assertEqual(self.kg.variants[3]['construction'], 'instance')
+        self.assertEqual(self.kg.variants[3]['inverse_relations'], 'no')
+        self.assertEqual(self.kg.edge_dict, dict())
+        self.assertEqual(self.kg.max_parallel, max(1, os.cpu_count()))
+
+        # check duplicate variants are only built once
+        kg = MatrixBuild(['subclass', 'SUBCLASS'], 'yes', ['yes'], 'yes', 1, self.write_location)
+        self.assertEqual(len(kg.variants), 1)
+
+        return None
+
+    def test_class_initialization_errors(self):
+        """Tests initialization of the class when the variants are not valid."""
+
+        self.assertRaises(ValueError, MatrixBuild, [], 'yes', ['yes'], 'yes', 1, self.write_location)
+        self.assertRaises(ValueError, MatrixBuild, ['subclass'], 'yes', [], 'yes', 1, self.write_location)
+        self.assertRaises(ValueError, MatrixBuild, ['subclass', 'instances'], 'yes', ['yes'], 'yes', 1,
+                          self.write_location)
+        self.assertRaises(ValueError, MatrixBuild, ['subclass'], 'yes', ['yes', 'maybe'], 'yes', 1,
+                          self.write_location)
+
+        return None
+
+    def test_construct_knowledge_graph(self):
+        """Tests the construct_knowledge_graph method."""
+
+        # test the build
+        self.kg.max_parallel = 2
+        self.kg.construct_knowledge_graph()
+        kg_dir = self.dir_loc_resources + '/knowledge_graphs'
+
+        # shared stage output files
+        self.assertTrue(os.path.exists(kg_dir + self.kg.full_kg[:-4] + '_AnnotationsOnly.nt'))
+        self.assertTrue(os.path.exists(kg_dir + self.kg.full_kg[:-4] + '_LogicOnly.nt'))
+        self.assertTrue(os.path.exists(kg_dir + self.kg.full_kg[:-4] + '_Build_Report.json'))
+        with open(kg_dir + self.kg.full_kg[:-4] + '_Build_Report.json', 'r') as f: report = json.load(f)
+        self.assertEqual([x['stage'] for x in report],
+                         ['merge_ontologies', 'node_metadata', 'split_graph', 'build_variants'])
+        self.assertEqual(report[-1]['variants'], 4)
+
+        # variant output files
+        for app in ['subclass', 'instance']:
+            for rel in ['_inverseRelations', '_relationsOnly']:
+                full_kg_owl = '/PheKnowLator_' + self.kg.kg_version + '_full_' + app + rel + '_OWL.owl'
+                shared_logic = kg_dir + self.kg.full_kg[:-4] + '_LogicOnly.nt'
+                f_name = full_kg_owl[:-4] + '_LogicOnly.nt'
+                self.assertTrue(os.path.exists(kg_dir + f_name))
+                self.assertTrue(os.path.getsize(kg_dir + f_name) >= os.path.getsize(shared_logic))
+                f_name = full_kg_owl[:-4] + '.nt'
+                self.assertTrue(os.path.exists(kg_dir + f_name))
+                f_name = full_kg_owl[:-8] + '_OWL_Triples_Integers.txt'
+                self.assertTrue(os.path.exists(kg_dir + f_name))
+                f_name = full_kg_owl[:-8] + '_OWLNETS_Triples_Integers.txt'
+                self.assertTrue(os.path.exists(kg_dir + f_name))
+                f_name = full_kg_owl[:-8] + '_OWLNETS_' + app.upper() + '_purified_Triples_Integers.txt'
+                self.assertTrue(os.path.exists(kg_dir + f_name))
+                f_name = '/PheKnowLator_' + self.kg.kg_version + '_full_' + app + rel + '_noOWL_Build_Report.json'
+                self.assertTrue(os.path.exists(kg_dir + f_name))
+                with open(kg_dir + f_name, 'r') as f: report = json.load(f)
+                self.assertNotIn('merge_ontologies', [x['stage'] for x in report])
+                self.assertIn('edge_construction', [x['stage'] for x in report])
+                build_log = '/construction_approach/subclass_map_log_' + app + rel + '_noOWL.json'
+                self.assertTrue(os.path.exists(self.dir_loc_resources + build_log))
+
+        return None
+
+    def tearDown(self):
+        warnings.simplefilter('default', ResourceWarning)
+
+        # remove resource directory
+        shutil.rmtree(self.dir_loc_resources)
+
+        return None
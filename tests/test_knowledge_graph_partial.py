@@ -136,6 +136,25 @@ class TestPartialBuild(unittest.TestCase):
         f_name = full_kg_owl[:-4] + '.nt'
         self.assertTrue(os.path.exists(self.dir_loc_resources + '/knowledge_graphs/' + f_name))
 
+        # check the build was not checkpointed
+        self.assertFalse(self.kg.checkpoint)
+        self.assertFalse(os.path.exists(self.kg.checkpoint_dir))
+        self.assertIsNone(self.kg.input_fingerprint)
+
+        return None
+
+    def test_construct_knowledge_graph_checkpoints(self):
+        """Tests the construct_knowledge_graph method when the build is checkpointed."""
+
+        kg = PartialBuild('subclass', 'yes', 'yes', 'yes', 1, self.write_location, checkpoint=True)
+        kg.owl_tools = self.kg.owl_tools
+        kg.construct_knowledge_graph()
+
+        # check the checkpoints
+        with open(kg.checkpoint_dir + '/checkpoint_manifest.json') as f: manifest = json.load(f)
+        self.assertEqual(manifest['fingerprint'], kg.gets_input_fingerprint())
+        self.assertEqual(list(manifest['stages'].keys()), ['graph_split', 'edges_built'])
+
         return None
 
     def tearDown(self):
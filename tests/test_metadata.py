@@ -116,6 +116,27 @@ class TestMetadata(unittest.TestCase):
 
         return None
 
+    def test_shards_node_metadata(self):
+        """Tests the shards_node_metadata method."""
+
+        self.metadata.node_data = [self.metadata.node_data[0].replace('.pkl', '_test.pkl')]
+        self.metadata.extract_metadata(self.graph)
+        nodes = ['http://www.ncbi.nlm.nih.gov/gene/1', 'http://www.ncbi.nlm.nih.gov/gene/None']
+        shard = self.metadata.shards_node_metadata(nodes)
+
+        # check the shard only contains metadata for the requested nodes
+        self.assertEqual(list(shard.node_dict['nodes'].keys()), ['http://www.ncbi.nlm.nih.gov/gene/1'])
+        self.assertEqual(shard.node_dict['relations'], self.metadata.node_dict['relations'])
+        self.assertTrue(len(self.metadata.node_dict['nodes']) > 1)
+        self.assertEqual(len(shard.creates_node_metadata(ent=nodes[0:1] * 2, e_type=['entity', 'class'])),
+                         len(self.metadata.creates_node_metadata(ent=nodes[0:1] * 2, e_type=['entity', 'class'])))
+
+        # check that there is nothing to shard without node metadata
+        self.metadata.node_dict = None
+        self.assertIs(self.metadata.shards_node_metadata(nodes), self.metadata)
+
+        return None
+
     def test_creates_node_metadata_relations(self):
         """Tests the creates_node_metadata method."""
 
@@ -11,7 +11,7 @@ from rdflib.namespace import RDF, RDFS, OWL  # type: ignore
 from typing import Dict, List, Set, Tuple
 
 from pkt_kg.owlnets import OwlNets
-from pkt_kg.utils import adds_edges_to_graph
+from pkt_kg.utils import adds_edges_to_graph, connected_components
 
 # set namespace
 obo = Namespace('http://purl.obolibrary.org/obo/')
@@ -239,6 +239,35 @@ class TestOwlNets(unittest.TestCase):
 
         return None
 
+    def test_indexes_node_types(self):
+        """Tests the indexes_node_types method."""
+
+        self.owl_nets.graph = Graph()
+        self.owl_nets.graph.add((obo.SO_0000784, RDF.type, OWL.Class))
+        self.owl_nets.graph.add((URIRef(obo + 'SO_0000784#x'), RDF.type, OWL.Class))
+        self.owl_nets.graph.add((obo.RO_0002606, RDF.type, OWL.ObjectProperty))
+        self.owl_nets.graph.add((obo.IAO_0000115, RDF.type, OWL.AnnotationProperty))
+
+        # run method
+        index = self.owl_nets.indexes_node_types()
+        self.assertEqual(index, {obo.SO_0000784: 5, URIRef(obo + 'SO_0000784#x'): 4, obo.RO_0002606: 6,
+                                 obo.IAO_0000115: 0})
+
+        return None
+
+    def test_creates_prefix_table(self):
+        """Tests the creates_prefix_table method."""
+
+        starts_with_prefix = self.owl_nets.creates_prefix_table(['BFO', 'NCBI_Taxon', ''])
+        self.assertTrue(starts_with_prefix(obo.BFO_0000001))
+        self.assertTrue(starts_with_prefix(URIRef(obo + 'NCBI_Taxon_9606')))
+        self.assertFalse(starts_with_prefix(URIRef(obo + 'NCBI_9606')))
+        self.assertFalse(starts_with_prefix(obo.BFOX_0000001))
+        self.assertFalse(starts_with_prefix(URIRef(obo + '_0000001')))
+        self.assertFalse(starts_with_prefix(URIRef('http://purl.obolibrary.org/BFO_0000001/SO_0000784')))
+
+        return None
+
     def test_removes_edges_with_owl_semantics(self):
         """Tests the removes_edges_with_owl_semantics method."""
 
@@ -346,6 +375,30 @@ class TestOwlNets(unittest.TestCase):
 
         return None
 
+    def test_gets_anonymous_subgraph(self):
+        """Tests the gets_anonymous_subgraph method."""
+
+        # set-up testing data -- a shared owl:unionOf list and a cycle
+        triples = [(BNode('N1'), OWL.unionOf, BNode('N2')), (BNode('N2'), RDF.first, obo.UBERON_0010544),
+                   (BNode('N2'), RDF.rest, BNode('N3')), (BNode('N3'), RDF.first, obo.UBERON_0002374),
+                   (BNode('N3'), RDF.rest, RDF.nil), (BNode('N4'), OWL.someValuesFrom, BNode('N2')),
+                   (BNode('N5'), OWL.someValuesFrom, BNode('N6')), (BNode('N6'), OWL.someValuesFrom, BNode('N5'))]
+        self.owl_nets.graph = adds_edges_to_graph(Graph(), triples)
+
+        # test method
+        matches = self.owl_nets.gets_anonymous_subgraph([BNode('N1')])
+        self.assertEqual(matches, set(triples[0:5]))
+        self.assertEqual(self.owl_nets.gets_anonymous_subgraph([BNode('N4'), BNode('N3')]), set(triples[1:6]))
+        self.assertIn(BNode('N2'), self.owl_nets.anonymous_index['closures'])
+        self.assertEqual(self.owl_nets.gets_anonymous_subgraph([BNode('N5')]), set(triples[6:]))
+        self.assertNotIn(BNode('N5'), self.owl_nets.anonymous_index['closures'])
+
+        # test that the index is reset when the graph is replaced
+        self.owl_nets.graph = adds_edges_to_graph(Graph(), triples[0:1])
+        self.assertEqual(self.owl_nets.gets_anonymous_subgraph([BNode('N1')]), set(triples[0:1]))
+
+        return None
+
     def test_creates_edge_dictionary(self):
         """Tests the creates_edge_dictionary method."""
 
@@ -615,6 +668,28 @@ class TestOwlNets(unittest.TestCase):
 
         return None
 
+    def test_makes_graph_connected_components(self):
+        """Tests the makes_graph_connected method only connects the components that do not contain common_ancestor."""
+
+        # set-up testing data
+        triples = [(obo.SO_0000001, RDFS.subClassOf, obo.SO_0000002),
+                   (obo.SO_0000002, RDFS.subClassOf, obo.BFO_0000001),
+                   (obo.SO_0000003, RDFS.subClassOf, obo.SO_0000004), (obo.SO_0000005, RDFS.subClassOf, obo.SO_0000004),
+                   (obo.SO_0000006, RDFS.subClassOf, obo.SO_0000007), (obo.SO_0000007, RDFS.subClassOf, obo.SO_0000006),
+                   (obo.SO_0000008, obo.RO_0002200, obo.SO_0000003), (obo.SO_0000009, obo.RO_0002200, obo.SO_0000010)]
+        graph = adds_edges_to_graph(Graph(), triples, False)
+
+        # test method
+        connected_graph = self.owl_nets.makes_graph_connected(graph)
+        self.assertEqual(set(connected_graph) - set(triples),
+                         {(obo.SO_0000004, RDFS.subClassOf, obo.BFO_0000001),
+                          (obo.SO_0000006, RDFS.subClassOf, obo.BFO_0000001),
+                          (obo.SO_0000009, RDFS.subClassOf, obo.BFO_0000001),
+                          (obo.SO_0000010, RDFS.subClassOf, obo.BFO_0000001)})
+        self.assertEqual(len(connected_components(connected_graph)), 1)
+
+        return None
+
     def test_purifies_graph_build_none(self):
         """Tests the purifies_graph_build method when kg_construction is None."""
 
@@ -653,6 +728,43 @@ class TestOwlNets(unittest.TestCase):
 
         return None
 
+    def test_purifies_graph_build_ancestors(self):
+        """Tests the purifies_graph_build method when several triples share the same object."""
+
+        graph = Graph()
+        graph.add((obo.SO_0000002, RDFS.subClassOf, obo.SO_0000001))
+        graph.add((obo.SO_0000003, RDFS.subClassOf, obo.SO_0000002))
+        graph.add((obo.SO_0000004, RDFS.subClassOf, obo.SO_0000003))
+        graph.add((obo.SO_0000003, RDFS.label, Literal('region')))
+
+        # test instance purification
+        owl_nets = OwlNets(kg_construct_approach='instance', graph=graph,
+                           write_location=self.write_location, filename=self.kg_filename)
+        purified_graph = owl_nets.purifies_graph_build(graph)
+        self.assertEqual(len(graph), 4)
+        self.assertEqual(set(purified_graph.subject_objects(RDFS.subClassOf)), set())
+        self.assertEqual(set(purified_graph.objects(obo.SO_0000004, RDF.type)),
+                         {obo.SO_0000001, obo.SO_0000002, obo.SO_0000003})
+        self.assertEqual(set(purified_graph.objects(obo.SO_0000003, RDF.type)), {obo.SO_0000001, obo.SO_0000002})
+        self.assertIn((obo.SO_0000003, RDFS.label, Literal('region')), purified_graph)
+        self.assertEqual(len(purified_graph), 7)
+
+        # test subclass purification
+        graph.add((obo.SO_1000001, RDF.type, obo.SO_0000003))
+        graph.add((obo.SO_1000002, RDF.type, obo.SO_0000003))
+        graph.add((obo.SO_1000003, RDF.type, obo.SO_1000001))
+        owl_nets.kg_construct_approach = 'subclass'
+        purified_graph = owl_nets.purifies_graph_build(graph)
+        self.assertEqual(set(purified_graph.subject_objects(RDF.type)), set())
+        for node in [obo.SO_1000001, obo.SO_1000002]:
+            self.assertEqual(set(purified_graph.objects(node, RDFS.subClassOf)),
+                             {obo.SO_0000001, obo.SO_0000002, obo.SO_0000003})
+        self.assertEqual(set(purified_graph.objects(obo.SO_1000003, RDFS.subClassOf)),
+                         {obo.SO_0000001, obo.SO_0000002, obo.SO_0000003, obo.SO_1000001})
+        self.assertEqual(len(purified_graph), 14)
+
+        return None
+
     def test_write_out_results_regular(self):
         """Tests the write_out_results method."""
 